@@ -1,12 +1,31 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
-from fpdf import FPDF
-import os
 # Data Cleaning Imports
 from utils.data_cleaner import DataCleaner as dc
+from utils.csv_loader import load_csv
+from utils.appends import load_append
+from utils.incremental import FileFingerprint
+from utils.shards import SOURCE_COLUMN, load_shards
+from utils.result_cache import ResultCache, content_hash
+from utils.dataset_store import DatasetStore, SessionDataset
+from utils.dtypes import dtype_report
+from utils.imputation import columns_of_dtype
+from utils.export import EXPORT_FORMATS, available_formats, export_frame
+from utils.data_view import FILTER_OPERATORS, PAGE_SIZES, UNARY_OPERATORS, page_of
+from utils.chart_data import pie_data, area_data
+from utils.report import generate_pdf_report
+from utils.validation import COMPARISONS, RULE_KINDS, compile_rules
+from utils.jobs import JobQueue
+from utils.instrumentation import ProfileCollector, JsonLinesHook
+
+# Copy-on-write lets DataCleaner and the undo history share unchanged columns
+# instead of copying the whole frame on every rerun.
+pd.set_option("mode.copy_on_write", True)
 
 # Page Configuration
 st.set_page_config(
@@ -16,144 +35,59 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize session state for DataFrame and uploaded file name
-if 'df' not in st.session_state:
-    st.session_state.df = None
+# Initialize session state for the working data and uploaded file name
+if 'dataset' not in st.session_state:
+    st.session_state.dataset = None
 if 'uploaded_file_name' not in st.session_state:
     st.session_state.uploaded_file_name = None
+if 'upload_key' not in st.session_state:
+    st.session_state.upload_key = None
+if 'schema_issues' not in st.session_state:
+    st.session_state.schema_issues = None
+if 'fingerprint' not in st.session_state:
+    st.session_state.fingerprint = None
 
-# Define the function to generate the PDF report
-def generate_pdf_report(dataframe, file_name="data_report.pdf"):
-    """
-    Generates a PDF report for the given DataFrame with visualizations.
-    """
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-
-    # Title Page
-    pdf.set_font("Arial", style="B", size=16)
-    pdf.cell(0, 10, txt="Data Report", ln=True, align="C")
-    pdf.ln(10)
-
-    # Summary Statistics
-    pdf.set_font("Arial", size=12)
-    pdf.cell(0, 10, txt="Summary Statistics:", ln=True)
-    pdf.ln(5)
-
-    try:
-        summary = dataframe.describe(include="all").transpose()
-        summary.reset_index(inplace=True)
-        summary.columns = ["Feature", "Count", "Mean", "Std", "Min", "25%", "50%", "75%", "Max"]
-
-        for _, row in summary.iterrows():
-            pdf.set_font("Courier", size=10)
-            pdf.cell(0, 10, txt=row.to_string(index=False), ln=True)
-        pdf.ln(10)
-    except Exception as e:
-        pdf.cell(0, 10, txt=f"Error generating summary: {e}", ln=True)
-        pdf.ln(10)
-
-    # Data Preview
-    pdf.cell(0, 10, txt="Data Preview (First 5 Rows):", ln=True)
-    pdf.ln(5)
-    preview_text = dataframe.head().to_string(index=False)
-    pdf.set_font("Courier", size=10)
-    pdf.multi_cell(0, 10, txt=preview_text)
-    pdf.ln(10)
-
-    # Visualizations
-    pdf.cell(0, 10, txt="Visualizations:", ln=True)
-    pdf.ln(5)
-
-    numeric_columns = dataframe.select_dtypes(include=["float64", "int64"]).columns.tolist()
-
-    # Pie Chart
-    try:
-        pie_col = numeric_columns[0] if numeric_columns else None
-        if pie_col:
-            pie_fig = px.pie(dataframe, names=pie_col, title=f"Pie Chart of {pie_col}")
-            pie_file = "pie_chart.png"
-            pie_fig.write_image(pie_file)
-            pdf.image(pie_file, x=10, y=pdf.get_y(), w=180)
-            pdf.ln(90)
-            os.remove(pie_file)
-    except Exception as e:
-        pdf.cell(0, 10, txt=f"Error generating pie chart: {e}", ln=True)
-
-    # Area Plot
-    try:
-        if numeric_columns:
-            plt.figure(figsize=(8, 4))
-            dataframe[numeric_columns].plot(kind="area", alpha=0.5)
-            plt.title("Area Plot")
-            plt.tight_layout()
-            area_plot_file = "area_plot.png"
-            plt.savefig(area_plot_file)
-            plt.close()
-            pdf.image(area_plot_file, x=10, y=pdf.get_y(), w=180)
-            pdf.ln(90)
-            os.remove(area_plot_file)
-    except Exception as e:
-        pdf.cell(0, 10, txt=f"Error generating area plot: {e}", ln=True)
-
-    # Donut Chart
-    try:
-        if numeric_columns:
-            mean_values = dataframe[numeric_columns].mean()
-            donut_data = pd.DataFrame({"Metric": mean_values.index, "Value": mean_values.values})
-            donut_fig = px.pie(donut_data, names="Metric", values="Value", hole=0.4, title="Donut Chart of Averages")
-            donut_file = "donut_chart.png"
-            donut_fig.write_image(donut_file)
-            pdf.image(donut_file, x=10, y=pdf.get_y(), w=180)
-            pdf.ln(90)
-            os.remove(donut_file)
-    except Exception as e:
-        pdf.cell(0, 10, txt=f"Error generating donut chart: {e}", ln=True)
-
-    # Radar Chart
-    try:
-        if numeric_columns:
-            radar_data = dataframe[numeric_columns].mean().reset_index()
-            radar_data.columns = ["Metric", "Value"]
-            radar_data["Normalized"] = (radar_data["Value"] - radar_data["Value"].min()) / (
-                radar_data["Value"].max() - radar_data["Value"].min()
-            )
+@st.cache_resource
+def get_result_cache():
+    # One on-disk cache shared by every session, so repeated uploads and pipelines are instant
+    return ResultCache()
 
-            radar_fig = px.line_polar(
-                radar_data, r="Normalized", theta="Metric", line_close=True, title="Radar Chart of Averages"
-            )
-            radar_file = "radar_chart.png"
-            radar_fig.write_image(radar_file)
-            pdf.image(radar_file, x=10, y=pdf.get_y(), w=180)
-            pdf.ln(90)
-            os.remove(radar_file)
-    except Exception as e:
-        pdf.cell(0, 10, txt=f"Error generating radar chart: {e}", ln=True)
-
-    # Gauge Chart
-    try:
-        if numeric_columns:
-            gauge_col = numeric_columns[0]  # Use the first numeric column for the gauge
-            gauge_value = dataframe[gauge_col].mean()
-            gauge_fig = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=gauge_value,
-                title={'text': f"Gauge of {gauge_col}"},
-                gauge={'axis': {'range': [0, dataframe[gauge_col].max() * 1.1]}}
-            ))
-            gauge_file = "gauge_chart.png"
-            gauge_fig.write_image(gauge_file)
-            pdf.image(gauge_file, x=10, y=pdf.get_y(), w=180)
-            pdf.ln(90)
-            os.remove(gauge_file)
-    except Exception as e:
-        pdf.cell(0, 10, txt=f"Error generating gauge chart: {e}", ln=True)
 
-    # Save the PDF
-    pdf.output(file_name)
+result_cache = get_result_cache()
+
 
+@st.cache_resource
+def get_dataset_store():
+    # Data versions of every session; idle sessions are spilled to memory-mapped files when memory runs over budget
+    return DatasetStore()
+
+
+dataset_store = get_dataset_store()
+
+
+@st.cache_resource
+def get_job_executor():
+    # Worker threads shared by every session's background jobs
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="viswalis-job")
+
+
+if 'jobs' not in st.session_state:
+    st.session_state.jobs = JobQueue(executor=get_job_executor())
+if 'reports' not in st.session_state:
+    st.session_state.reports = {}
+if 'exports' not in st.session_state:
+    st.session_state.exports = {}
+if 'validation_rules' not in st.session_state:
+    st.session_state.validation_rules = []
+if 'validation' not in st.session_state:
+    st.session_state.validation = None
+if 'profile' not in st.session_state:
+    st.session_state.profile = ProfileCollector()
+
+# Every cleaning step is timed into the session's profile, and also logged to a file if VISWALIS_PROFILE_LOG is set
+profile_hooks = [st.session_state.profile]
+if os.environ.get("VISWALIS_PROFILE_LOG"):
+    profile_hooks.append(JsonLinesHook(os.environ["VISWALIS_PROFILE_LOG"]))
 
 # Tabs
 tab1, tab2, tab3, tab4 = st.tabs(["Data Cleaning", "Dashboard", "Report", "Ask AI"])
@@ -164,63 +98,301 @@ st.sidebar.subheader("🧹 Brushing Off the Mess, 🌟 Visualizing Success!", an
 st.sidebar.write("VisWalis simplifies data analysis. Upload a CSV, let us clean it, and explore interactive visualizations.")
 st.sidebar.divider()
 
-# File uploader
-csv_file = st.sidebar.file_uploader("Upload a CSV file", type=["csv"])
+# File uploader; several files sharing a schema are combined into one dataset partitioned by file
+csv_files = st.sidebar.file_uploader(
+    "Upload CSV files", type=["csv"], accept_multiple_files=True,
+    help="Several files are combined into one dataset, with a source_file column naming each row's file.",
+)
+
+# Compute backend used by the cleaning tools
+compute_backend = st.sidebar.selectbox(
+    "Cleaning backend:", ["pandas", "arrow"],
+    help="Arrow uses pyarrow compute kernels, which are faster and leaner on text-heavy data.",
+)
+background_jobs = st.sidebar.toggle(
+    "Run cleaning in the background",
+    help="Cleaning steps run as jobs so the app stays responsive. Results apply to the data they started from.",
+)
+
+# Check if new files are uploaded
+if csv_files:
+    if len(csv_files) == 1:
+        upload_name = csv_files[0].name
+    else:
+        upload_name = f"{len(csv_files)} files ({csv_files[0].name} … {csv_files[-1].name})"
+    upload_key = tuple((csv_file.name, csv_file.size) for csv_file in csv_files)
+    if st.session_state.upload_key != upload_key:
+        load_status = st.sidebar.progress(0.0, text="Loading CSV...")
+
+        def show_load_progress(rows, bytes_read, total_bytes):
+            fraction = bytes_read / total_bytes if total_bytes else 1.0
+            load_status.progress(
+                min(fraction, 1.0),
+                text=f"Parsed {rows:,} rows ({bytes_read / 1e6:,.1f} of {total_bytes / 1e6:,.1f} MB)",
+            )
 
-# Check if a new file is uploaded
-if csv_file:
-    if st.session_state.uploaded_file_name != csv_file.name:
-        st.session_state.df = pd.read_csv(csv_file)
-        st.session_state.uploaded_file_name = csv_file.name
-        alert = f"Loaded new CSV: {csv_file.name}"
+        appended = None
+        if len(csv_files) == 1 and st.session_state.dataset is not None and st.session_state.fingerprint is not None:
+            # A re-upload of the same file with rows added at the end only loads and cleans the new rows
+            appended = load_append(
+                st.session_state.dataset, csv_files[0].getvalue(), st.session_state.fingerprint,
+                backend=compute_backend, store=dataset_store, cache=result_cache,
+            )
+        if appended is not None:
+            st.session_state.dataset, st.session_state.fingerprint, alert = appended
+        elif len(csv_files) == 1:
+            source_key = content_hash(csv_files[0].getvalue())
+        else:
+            # The files' names and order are part of the data, as the source_file column
+            source_key = content_hash("\n".join(
+                f"{csv_file.name}:{content_hash(csv_file.getvalue())}" for csv_file in csv_files
+            ).encode())
+        if appended is None:
+            # Another session working on the same files shares their data
+            loaded_df = dataset_store.load(source_key)
+            if loaded_df is None:
+                loaded_df = result_cache.get(source_key)
+            schema_issues = None
+            if loaded_df is None:
+                if len(csv_files) == 1:
+                    loaded_df = load_csv(csv_files[0], on_progress=show_load_progress)
+                else:
+                    loaded_df, schema_issues = load_shards(csv_files, on_progress=show_load_progress)
+                result_cache.put(source_key, loaded_df)
+            st.session_state.dataset = SessionDataset(loaded_df, source_key, store=dataset_store)
+            st.session_state.schema_issues = schema_issues
+            st.session_state.fingerprint = None
+            if len(csv_files) == 1:
+                st.session_state.fingerprint = FileFingerprint(csv_files[0].getvalue(), len(loaded_df))
+            alert = f"Loaded new CSV: {upload_name}"
+        st.session_state.reports = {}
+        st.session_state.exports = {}
+        st.session_state.validation = None
+        load_status.empty()
+        st.session_state.upload_key = upload_key
+        st.session_state.uploaded_file_name = upload_name
 else:
     st.warning('Please load a CSV File!', icon="⚠️")
 
+# Attach the results of finished background jobs to the data version they were started on
+for job in st.session_state.jobs.finished():
+    st.session_state.jobs.pop(job.id)
+    if job.status == "failed":
+        st.sidebar.error(f"{job.label} failed: {job.error}")
+    elif job.status == "cancelled":
+        st.sidebar.info(f"{job.label} was cancelled.")
+    elif st.session_state.dataset is None or job.version not in [
+        v.key for v in st.session_state.dataset.history.versions
+    ]:
+        st.sidebar.warning(f"{job.label} finished, but its data is no longer loaded.")
+    elif job.kind == "report":
+        st.session_state.reports[job.version] = job.result
+        alert = "PDF report generated successfully!"
+    elif job.kind == "export":
+        # Only the exports of one data version are kept
+        st.session_state.exports = {
+            key: export for key, export in st.session_state.exports.items() if key[0] == job.version
+        }
+        st.session_state.exports[job.version, job.result.format] = job.result
+        alert = f"{job.result.label} export is ready to download."
+    elif job.version == st.session_state.dataset.history.current.key:
+        cleaned_df, cleaned_key, replay_steps = job.result
+        st.session_state.dataset.history.record(cleaned_df, job.label, key=cleaned_key, steps=replay_steps)
+        alert = f"Applied: {job.label}"
+    else:
+        st.sidebar.warning(f"{job.label} finished, but the data changed since it started, so it was discarded.")
+
+
+@st.fragment(run_every="1s")
+def job_panel():
+    # Polls the running jobs; once they are all finished the whole app reruns to pick up the results
+    active = st.session_state.jobs.active()
+    if not active:
+        st.rerun()
+    st.subheader("Background Jobs", anchor=False)
+    for job in active:
+        st.progress(job.progress, text=f"{job.label}: {job.message or job.status}")
+        st.button("Cancel", key=f"cancel_job_{job.id}", on_click=job.cancel)
+
+
+if st.session_state.jobs.active():
+    with st.sidebar:
+        job_panel()
+
+# Filled in at the end of the script, after this run's cleaning steps
+profile_panel = st.sidebar.empty()
+
+# Mark this session active; if its data changed, idle sessions may be spilled to disk to stay within the memory budget
+dataset = st.session_state.dataset
+if dataset is not None:
+    dataset.touch()
 
 
 # Main Content
-if st.session_state.df is not None:
+if dataset is not None:
     with tab1:
         st.header("Data Cleaning", anchor=False)
 
+        # Data combined from several files is cleaned one file partition at a time, in parallel
+        partition_by = SOURCE_COLUMN if SOURCE_COLUMN in dataset.df.columns else None
+
         # Cleaner instance
-        cleaner = dc(st.session_state.df)
+        def make_cleaner(backend):
+            return dc(
+                dataset.df,
+                history=dataset.history,
+                backend=backend,
+                cache=result_cache,
+                data_key=dataset.history.current.key,
+                stats=dataset.stats,
+                hooks=profile_hooks,
+                partition_by=partition_by,
+                track_replay=True,
+            )
+
+        try:
+            cleaner = make_cleaner(compute_backend)
+        except TypeError as error:
+            # e.g. a column mixing numbers and text, which Arrow cannot store
+            st.warning(f"{error} Cleaning with the pandas backend instead.", icon="⚠️")
+            compute_backend = "pandas"
+            cleaner = make_cleaner(compute_backend)
+
+        def apply_cleaning(operation, message):
+            """
+            Apply operation(cleaner) now, or as a background job when background jobs are enabled.
+            Returns the alert to show, or None if the operation failed.
+            """
+            if not background_jobs:
+                try:
+                    operation(cleaner).get_cleaned_data()
+                except (TypeError, ValueError) as error:
+                    # e.g. a fill value that does not fit its column, or the mean of a text column
+                    st.error(str(error), icon="⚠️")
+                    return None
+                return message
+            data_key = dataset.history.current.key
+            worker = dc(
+                dataset.df, lazy=True, backend=compute_backend, cache=result_cache, data_key=data_key,
+                hooks=profile_hooks, partition_by=partition_by, track_replay=True,
+            )
+            operation(worker)
+
+            def clean(on_progress):
+                worker.on_progress = on_progress
+                return worker.get_cleaned_data(), worker.data_key, worker.replay_log
+
+            label = ", ".join(map(repr, worker.plan))
+            st.session_state.jobs.submit(clean, label=label, version=data_key, kind="cleaning")
+            st.rerun()
 
         # Display the CSV title
         st.subheader(f"Loaded CSV: {st.session_state.uploaded_file_name}", anchor=False)
+        if st.session_state.schema_issues is not None and not st.session_state.schema_issues.empty:
+            with st.expander(f"Schema differences between files ({len(st.session_state.schema_issues)})"):
+                st.dataframe(st.session_state.schema_issues, hide_index=True)
 
         # Layout: Two columns (left for DataFrame, right for tools)
         col1, col2 = st.columns([3, 1])
 
         with col1:
-            # Display the current DataFrame
+            # Display one page of the current data; sorting, filtering and slicing run on the server,
+            # so only the visible rows are sent to the browser
             st.subheader("Current Data", anchor=False)
-            st.dataframe(st.session_state.df)
+            current_df = dataset.df
+            column_options = [None, *current_df.columns]
+            sort_col, order_col, size_col = st.columns([2, 1, 1])
+            with sort_col:
+                sort_by = st.selectbox(
+                    "Sort by:", column_options, format_func=lambda col: "(original order)" if col is None else str(col)
+                )
+            with order_col:
+                descending = st.toggle("Descending", disabled=sort_by is None)
+            with size_col:
+                page_size = st.selectbox("Rows per page:", PAGE_SIZES, index=1)
+            filter_col, operator_col, value_col = st.columns([2, 1, 1])
+            with filter_col:
+                filter_by = st.selectbox(
+                    "Filter by:", column_options, format_func=lambda col: "(no filter)" if col is None else str(col)
+                )
+            with operator_col:
+                filter_operator = st.selectbox("Condition:", FILTER_OPERATORS, disabled=filter_by is None)
+            with value_col:
+                filter_value = st.text_input(
+                    "Filter value:", disabled=filter_by is None or filter_operator in UNARY_OPERATORS
+                )
+            filters = ()
+            if filter_by is not None and (filter_value or filter_operator in UNARY_OPERATORS):
+                filters = ((filter_by, filter_operator, filter_value),)
+
+            try:
+                row_positions = dataset.view.rows(
+                    current_df, dataset.history.current.key, sort_by, not descending, filters
+                )
+            except ValueError as error:
+                st.error(str(error), icon="⚠️")
+                filters = ()
+                row_positions = dataset.view.rows(current_df, dataset.history.current.key, sort_by, not descending)
+            total_rows = len(current_df) if row_positions is None else len(row_positions)
+            page_count = max(1, -(-total_rows // page_size))
+            page_number = st.number_input(f"Page (of {page_count:,}):", min_value=1, max_value=page_count, value=1)
+            st.dataframe(
+                page_of(current_df, row_positions, page_number - 1, page_size), use_container_width=True
+            )
+            first_row = min((page_number - 1) * page_size + 1, total_rows)
+            st.caption(
+                f"Rows {first_row:,}-{min(page_number * page_size, total_rows):,} of {total_rows:,}"
+                + (f" (filtered from {len(current_df):,})" if filters else "")
+            )
 
         with col2:
             # Tools Section
             st.subheader("Tools", anchor=False)
             
+            export_format = st.selectbox(
+                "Download format:", available_formats(), format_func=lambda fmt: EXPORT_FORMATS[fmt][0]
+            )
             btn1, btn2 = st.columns([0.5,0.5])
             with btn1:
                 if st.button("Refresh Table"):
-                    st.session_state.df = st.session_state.df # Refresh the CSV
                     alert = "Table is Refreshed!"
-            with btn2: 
-
-                @st.cache_data
-                def convert_df(df):
-                    # IMPORTANT: Cache the conversion to prevent computation on every rerun
-                    return df.to_csv().encode("utf-8")
 
-                csv = convert_df(st.session_state.df)
-
-                st.download_button(
-                    label="Download CSV",
-                    data=csv,
-                    file_name= f"{st.session_state.uploaded_file_name}[cleaned_data].csv",
-                    mime="text/csv",
-                )
+            undo_col, redo_col = st.columns([0.5, 0.5])
+            history = dataset.history
+            with undo_col:
+                if st.button("Undo", disabled=not history.can_undo):
+                    alert = f"Undid: {history.current.label}"
+                    history.undo()
+            with redo_col:
+                if st.button("Redo", disabled=not history.can_redo):
+                    history.redo()
+                    alert = f"Redid: {history.current.label}"
+            spilled_versions = sum(version.spilled for version in history.versions)
+            st.caption(
+                f"History: {len(history.versions)} versions, {history.nbytes() / 1e6:,.1f} MB in memory"
+                + (f", {spilled_versions} on disk" if spilled_versions else "")
+            )
+            with btn2:
+                # Exports are built only on request, per data version and format, a chunk of rows at a time
+                export_version = dataset.history.current.key
+                export = st.session_state.exports.get((export_version, export_format))
+                if export is not None:
+                    st.download_button(
+                        label=f"Download {export.label}",
+                        data=export.read(),
+                        file_name=export.file_name(f"{st.session_state.uploaded_file_name}[cleaned_data]"),
+                        mime=export.mime,
+                    )
+                elif st.button("Prepare Download"):
+                    st.session_state.jobs.submit(
+                        export_frame,
+                        dataset.df,
+                        export_format,
+                        label=f"{EXPORT_FORMATS[export_format][0]} export",
+                        version=export_version,
+                        kind="export",
+                    )
+                    st.rerun()
 
             # Edit Columns Section
             with st.expander("Edit Columns"):
@@ -230,75 +402,276 @@ if st.session_state.df is not None:
                 replace_text = st.text_input("Text to replace in column names:")
                 replacement_text = st.text_input("Replace with:")
                 if st.button("Apply Standardization"):
-                    if standardize_case == "lowercase":
-                        st.session_state.df.columns = (
-                            st.session_state.df.columns
-                            .str.strip()
-                            .str.lower()
-                            .str.replace(replace_text, replacement_text)
-                        )
-                    elif standardize_case == "uppercase":
-                        st.session_state.df.columns = (
-                            st.session_state.df.columns
-                            .str.strip()
-                            .str.upper()
-                            .str.replace(replace_text, replacement_text)
-                        )
-                    elif standardize_case == "sentence case":
-                        st.session_state.df.columns = (
-                            st.session_state.df.columns
-                            .str.strip()
-                            .str.title()
-                            .str.replace(replace_text, replacement_text)
-                        )
-                    alert = "Column names standardized!"
+                    alert = apply_cleaning(
+                        lambda c: c.standardize_columns(
+                            case=standardize_case, replace=replace_text, replacement=replacement_text
+                        ),
+                        "Column names standardized!",
+                    )
 
                 # Drop Column
                 st.subheader("Drop Columns")
-                column_to_drop = st.selectbox("Select column to drop:", st.session_state.df.columns)
+                column_to_drop = st.selectbox("Select column to drop:", dataset.df.columns)
                 if st.button("Drop Column"):
-                    st.session_state.df = st.session_state.df.drop(columns=[column_to_drop])
-                    alert = f"Column '{column_to_drop}' dropped!"
+                    alert = apply_cleaning(
+                        lambda c: c.drop_columns([column_to_drop]), f"Column '{column_to_drop}' dropped!"
+                    )
 
             # Handle Missing Values Section
             with st.expander("Handle Missing Values"):
                 st.subheader("Handle Missing Data")
-                strategy = st.radio("Select strategy to handle missing values:", ["drop", "mean", "median", "mode", "fill"])
+                strategy = st.radio(
+                    "Select strategy to handle missing values:", ["drop", "mean", "median", "mode", "fill", "per column"]
+                )
                 if strategy == "fill":
                     fill_value = st.text_input("Value to fill missing data with:")
-                    column_to_handle = st.selectbox("Select column to handle:", st.session_state.df.columns)
+                    column_to_handle = st.selectbox("Select column to handle:", dataset.df.columns)
+                elif strategy == "per column":
+                    # One strategy per column, applied together in a single pass
+                    missing_counts = dataset.df.isna().sum()
+                    missing_counts = missing_counts[missing_counts > 0]
+                    # Means and medians only exist for numbers, dates and durations, so other columns
+                    # get their own table without them
+                    averageable = missing_counts.index.isin(
+                        columns_of_dtype(dataset.df, ["number", "datetime", "timedelta"])
+                    )
+                    imputation_tables = []
+                    for counts, options, key in (
+                        (missing_counts[averageable], ["skip", "mean", "median", "mode", "fill"], "imputation_table"),
+                        (missing_counts[~averageable], ["skip", "mode", "fill"], "imputation_table_other"),
+                    ):
+                        if counts.empty:
+                            continue
+                        table = st.data_editor(
+                            pd.DataFrame({
+                                "Column": counts.index.astype(str),
+                                "Missing": counts.values,
+                                "Strategy": "skip",
+                                "Fill value": "",
+                            }),
+                            column_config={
+                                "Strategy": st.column_config.SelectboxColumn(options=options, required=True),
+                            },
+                            disabled=["Column", "Missing"],
+                            hide_index=True,
+                            key=key,
+                        )
+                        imputation_tables.append((counts, table))
 
                 if st.button("Apply Missing Value Handling"):
-                    if strategy == "drop":
-                        st.session_state.df = cleaner.handle_missing_values(strategy="drop").get_cleaned_data()
-                    elif strategy == "mean":
-                        st.session_state.df = cleaner.handle_missing_values(strategy="mean").get_cleaned_data()
-                    elif strategy == "median":
-                        st.session_state.df = cleaner.handle_missing_values(strategy="median").get_cleaned_data()
-                    elif strategy == "mode":
-                        st.session_state.df = cleaner.handle_missing_values(strategy="mode").get_cleaned_data()
+                    message = f"Missing values handled using strategy '{strategy}'!"
+                    if strategy in ("drop", "mean", "median", "mode"):
+                        alert = apply_cleaning(lambda c: c.handle_missing_values(strategy=strategy), message)
                     elif strategy == "fill" and fill_value:
-                        st.session_state.df[column_to_handle] = st.session_state.df[column_to_handle].fillna(fill_value)
-                    alert = f"Missing values handled using strategy '{strategy}'!"
+                        alert = apply_cleaning(
+                            lambda c: c.handle_missing_values(
+                                strategy="fill", fill_value=fill_value, columns=[column_to_handle]
+                            ),
+                            message,
+                        )
+                    elif strategy == "per column":
+                        plan = {}
+                        for counts, table in imputation_tables:
+                            for column, (_, row) in zip(counts.index, table.iterrows()):
+                                if row["Strategy"] == "fill" and row["Fill value"]:
+                                    plan[column] = ("fill", row["Fill value"])
+                                elif row["Strategy"] in ("mean", "median", "mode"):
+                                    plan[column] = row["Strategy"]
+                        alert = apply_cleaning(lambda c: c.impute(plan), message)
 
             # Drop Duplicates Section
             with st.expander("Drop Duplicates"):
-                if st.button("Drop Duplicate Rows"):
-                    st.session_state.df = cleaner.drop_duplicates().get_cleaned_data()
-                    alert = "Duplicate rows removed!"
+                match_option = st.radio("Match:", ["Exact", "Near-duplicate text"], horizontal=True)
+                if match_option == "Exact":
+                    duplicate_subset = st.multiselect(
+                        "Columns that identify a duplicate (all columns if empty):", dataset.df.columns
+                    )
+                    keep_option = st.radio("Keep:", ["first", "last", "none"], horizontal=True)
+                    if st.button("Drop Duplicate Rows"):
+                        alert = apply_cleaning(
+                            lambda c: c.drop_duplicates(
+                                subset=duplicate_subset or None,
+                                keep=False if keep_option == "none" else keep_option,
+                            ),
+                            "Duplicate rows removed!",
+                        )
+                else:
+                    text_columns = dataset.df.select_dtypes(include=["object", "string", "category"]).columns
+                    near_columns = st.multiselect(
+                        "Text columns to compare:", text_columns, default=list(text_columns[:1])
+                    )
+                    similarity = st.slider(
+                        "Treat rows as duplicates from this text similarity on:", 0.5, 1.0, 0.8, 0.05
+                    )
+                    if near_columns:
+                        # Dry run: cluster similar rows without touching the data
+                        preview_key = (dataset.history.version_id, tuple(near_columns), similarity)
+                        if st.session_state.get("near_duplicate_preview_key") != preview_key:
+                            st.session_state.near_duplicate_preview = cleaner.preview_near_duplicates(
+                                columns=near_columns, threshold=similarity
+                            )
+                            st.session_state.near_duplicate_preview_key = preview_key
+                        preview = st.session_state.near_duplicate_preview
+                        st.caption(
+                            f"{preview['duplicate_clusters']:,} groups of similar rows; "
+                            f"{preview['rows_removed']:,} of {len(preview['mask']):,} rows would be removed, "
+                            f"keeping the first row of each group."
+                        )
+                        if preview["duplicate_clusters"]:
+                            # Show a few of the groups found
+                            clusters = pd.Series(preview["clusters"])
+                            sizes = clusters.map(clusters.value_counts())
+                            shown = clusters[sizes > 1].drop_duplicates().head(5)
+                            rows = clusters.index[clusters.isin(shown)]
+                            st.dataframe(
+                                dataset.df.iloc[rows][near_columns]
+                                .assign(group=clusters[rows].to_numpy())
+                                .sort_values("group", kind="stable"),
+                                use_container_width=True,
+                            )
+                    if st.button("Drop Near-Duplicate Rows", disabled=not near_columns):
+                        alert = apply_cleaning(
+                            lambda c: c.drop_near_duplicates(columns=near_columns, threshold=similarity),
+                            "Near-duplicate rows removed!",
+                        )
 
             # Remove Outliers Section
             with st.expander("Remove Outliers"):
                 st.subheader("Remove Outliers")
-                column_for_outliers = st.selectbox("Select column to check for outliers:", st.session_state.df.select_dtypes(include=[float, int]).columns)
-                if st.button("Remove Outliers"):
-                    st.session_state.df = cleaner.remove_outliers(columns=[column_for_outliers]).get_cleaned_data()
-                    alert = f"Outliers removed from column '{column_for_outliers}'!"
+                numeric_columns = dataset.df.select_dtypes(include="number").columns  # Includes downcast dtypes
+                columns_for_outliers = st.multiselect(
+                    "Select columns to check for outliers:", numeric_columns, default=list(numeric_columns[:1])
+                )
+                if columns_for_outliers:
+                    # Dry run: count outliers per column without touching the data
+                    preview_key = (dataset.history.version_id, tuple(columns_for_outliers))
+                    if st.session_state.get("outlier_preview_key") != preview_key:
+                        st.session_state.outlier_preview = cleaner.preview_outliers(columns=columns_for_outliers)
+                        st.session_state.outlier_preview_key = preview_key
+                    preview = st.session_state.outlier_preview
+                    st.dataframe(
+                        preview["bounds"][["lower", "upper"]].assign(outliers=preview["counts"]),
+                        use_container_width=True,
+                    )
+                    st.caption(
+                        f"{preview['rows_removed']:,} of {len(preview['mask']):,} rows would be removed."
+                    )
+                if st.button("Remove Outliers", disabled=not columns_for_outliers):
+                    alert = apply_cleaning(
+                        lambda c: c.remove_outliers(columns=columns_for_outliers),
+                        f"Outliers removed from columns {', '.join(map(str, columns_for_outliers))}!",
+                    )
+
+            # Detect Data Types Section
+            with st.expander("Detect Data Types"):
+                st.caption("Finds text columns holding numbers, percentages, currency amounts or dates.")
+                max_failure_rate = st.slider(
+                    "Convert a column when at most this share of its values cannot be parsed:",
+                    0.0, 0.5, 0.05, 0.01,
+                )
+                # Dry run: pick a parser per column and count the values it cannot parse. This parses
+                # every text column, so it only runs on request.
+                preview_key = (dataset.history.version_id, max_failure_rate)
+                if st.button("Detect Types"):
+                    st.session_state.type_preview = cleaner.preview_types(max_failure_rate=max_failure_rate)
+                    st.session_state.type_preview_key = preview_key
+                if st.session_state.get("type_preview_key") == preview_key:
+                    type_preview = st.session_state.type_preview
+                    if type_preview.empty:
+                        st.caption("No text column looks like numbers or dates.")
+                    else:
+                        st.dataframe(type_preview, use_container_width=True)
+                    if st.button("Convert Data Types", disabled=not type_preview["converted"].any()):
+                        alert = apply_cleaning(
+                            lambda c: c.infer_types(max_failure_rate=max_failure_rate), "Data types converted!"
+                        )
+
+            # Validate Data Section
+            with st.expander("Validate Data"):
+                st.caption("Declare rules the data must follow; every rule is checked on each version of the data.")
+                rule_kind = st.selectbox("Rule:", list(RULE_KINDS), format_func=lambda kind: kind.replace("_", " "))
+                rule = {"rule": rule_kind}
+                if rule_kind == "unique":
+                    rule["columns"] = st.multiselect("Columns that identify a row:", current_df.columns)
+                else:
+                    rule["column"] = st.selectbox("Column:", current_df.columns, key="rule_column")
+                if rule_kind == "range":
+                    def parse_bound(text):
+                        # Numbers are compared as numbers; anything else, e.g. a date, is passed on as text
+                        try:
+                            return float(text) if text else None
+                        except ValueError:
+                            return text
+
+                    low_col, high_col = st.columns(2)
+                    rule["min"] = parse_bound(low_col.text_input("Min:"))
+                    rule["max"] = parse_bound(high_col.text_input("Max:"))
+                elif rule_kind == "regex":
+                    rule["pattern"] = st.text_input("Every value must match:", placeholder=r"[A-Z]{2}\d{4}")
+                elif rule_kind == "allowed":
+                    allowed_text = st.text_input("Allowed values, separated by commas:")
+                    allowed = [value.strip() for value in allowed_text.split(",") if value.strip()]
+                    if pd.api.types.is_numeric_dtype(current_df[rule["column"]].dtype):
+                        allowed = pd.to_numeric(pd.Series(allowed, dtype=object), errors="coerce").dropna().tolist()
+                    rule["values"] = allowed
+                elif rule_kind == "compare":
+                    op_col, other_col = st.columns([1, 2])
+                    rule["op"] = op_col.selectbox("Must be:", list(COMPARISONS))
+                    rule["other"] = other_col.selectbox("Than column:", current_df.columns)
+                add_col, clear_col = st.columns(2)
+                if add_col.button("Add Rule"):
+                    try:
+                        compile_rules([rule], current_df.dtypes)
+                        st.session_state.validation_rules = [*st.session_state.validation_rules, rule]
+                    except ValueError as e:
+                        st.error(str(e))
+                if clear_col.button("Clear Rules", disabled=not st.session_state.validation_rules):
+                    st.session_state.validation_rules = []
+
+                validation_rules = st.session_state.validation_rules
+                if validation_rules:
+                    # One validation per data version and rule set; earlier versions are served from the result cache
+                    validation_key = (dataset.history.current.key, repr(validation_rules))
+                    if st.session_state.validation is None or st.session_state.validation[0] != validation_key:
+                        try:
+                            st.session_state.validation = (validation_key, cleaner.validate(validation_rules))
+                        except (ValueError, TypeError) as e:
+                            st.session_state.validation = None
+                            st.error(f"Could not validate the data: {e}")
+                    if st.session_state.validation is not None:
+                        validation_report = st.session_state.validation[1]
+                        st.dataframe(validation_report.summary, use_container_width=True)
+                        violated = [name for name, rows in validation_report.positions.items() if len(rows)]
+                        if violated:
+                            inspected_rule = st.selectbox("Show rows violating:", violated)
+                            st.dataframe(
+                                validation_report.violating_rows(current_df, inspected_rule).head(100),
+                                use_container_width=True,
+                            )
+                        else:
+                            st.caption("All rules pass.")
+
+            # Optimize Memory Section
+            with st.expander("Optimize Memory"):
+                st.caption(f"Current size: {dataset.df.memory_usage(deep=True).sum() / 1e6:,.1f} MB")
+                category_threshold = st.slider(
+                    "Convert text to categories when distinct values are at most this share of values:",
+                    0.0, 1.0, 0.5, 0.05,
+                )
+                if st.button("Optimize Data Types"):
+                    uncompacted_df = dataset.df
+                    alert = apply_cleaning(
+                        lambda c: c.optimize_dtypes(category_threshold=category_threshold), "Data types optimized!"
+                    )
+                    st.session_state.dtype_report = dtype_report(uncompacted_df, dataset.df)
+                if st.session_state.get("dtype_report") is not None:
+                    st.dataframe(st.session_state.dtype_report, use_container_width=True)
 
 
         # Success Alert
         try:
-            st.success(alert)
+            if alert is not None:
+                st.success(alert)
         except NameError:
             pass
 
@@ -307,23 +680,23 @@ with tab2:
     st.header("Dashboard")
     
    
-    if csv_file:
+    if csv_files:
+        column_stats = dataset.column_stats()
+
         # Example Pie Chart
         st.subheader("Pie Chart")
-        column_for_pie = st.selectbox("Select a column for the Pie Chart:", st.session_state.df.columns)
-        pie_chart = px.pie(st.session_state.df, names=column_for_pie)
+        column_for_pie = st.selectbox("Select a column for the Pie Chart:", dataset.df.columns)
+        # Plot the most frequent values only, so the figure size does not grow with the data
+        pie_stats = column_stats[column_for_pie]
+        pie_chart = px.pie(pie_data(pie_stats.top_values, pie_stats.count), names="value", values="count")
         st.plotly_chart(pie_chart)
 
         # Example Area Plot
         st.subheader("Area Plot")
-        sequential_cols = [
-        col for col in st.session_state.df.columns
-        if st.session_state.df[col].dtype in ['object', 'datetime64[ns]']
-        or st.session_state.df[col].is_monotonic_increasing  # Checks for ascending order
-    ]
+        sequential_cols = column_stats.sequential_columns()  # Text, dates and ascending columns
 
         # Detect numeric columns for the Y-axis
-        numeric_cols_for_area = st.session_state.df.select_dtypes(include=['float64', 'int64']).columns
+        numeric_cols_for_area = column_stats.columns_of_kind("numeric")
 
         # X-axis selection
         if sequential_cols:
@@ -333,7 +706,7 @@ with tab2:
             area_x = None
 
         # Y-axis selection (multiple numeric columns allowed)
-        if numeric_cols_for_area.any():
+        if numeric_cols_for_area:
             area_y = st.multiselect("Select Y-axis for Area Plot (e.g., numerical data):", numeric_cols_for_area)
         else:
             st.warning("No numerical columns found for the Y-axis. Area plot cannot be generated.", icon="⚠️")
@@ -341,22 +714,17 @@ with tab2:
 
         # Generate Area Plot if valid selections exist
         if area_x and area_y:
-            # Rescale large Y-values to a readable range (e.g., thousands, millions)
-            df_rescaled = st.session_state.df.copy()
-            for col in area_y:
-                max_val = df_rescaled[col].max()
-                if max_val > 1e6:  # Millions
-                    df_rescaled[col] = df_rescaled[col] / 1e6
-                    df_rescaled.rename(columns={col: f"{col} (in millions)"}, inplace=True)
-                elif max_val > 1e3:  # Thousands
-                    df_rescaled[col] = df_rescaled[col] / 1e3
-                    df_rescaled.rename(columns={col: f"{col} (in thousands)"}, inplace=True)
+            # Downsample to a bounded number of points and rescale large Y-values to a readable range
+            df_rescaled, area_labels = area_data(
+                dataset.df, area_x, area_y,
+                maxima={col: column_stats[col].max for col in area_y},
+            )
 
             # Generate the area plot
             area_plot = px.area(
                 df_rescaled,
                 x=area_x,
-                y=area_y,
+                y=area_labels,
                 title="Area Plot",
                 labels={area_x: "X-Axis (Sequential Data)", "value": "Y-Axis (Scaled)"}
             )
@@ -368,7 +736,7 @@ with tab2:
         st.subheader("Donut Chart")
 
         # Get all numeric columns for selection
-        numeric_cols_for_donut = st.session_state.df.select_dtypes(include=['float64', 'int64']).columns
+        numeric_cols_for_donut = numeric_cols_for_area
 
         # Multi-select for numeric columns to include in the donut chart
         columns_for_donut = st.multiselect(
@@ -379,8 +747,8 @@ with tab2:
         if len(columns_for_donut) == 1:
             # Calculate statistics for the selected column
             selected_column = columns_for_donut[0]
-            mean_value = st.session_state.df[selected_column].mean()
-            median_value = st.session_state.df[selected_column].median()
+            mean_value = column_stats[selected_column].mean
+            median_value = column_stats[selected_column].median
 
             # Create a DataFrame for visualization
             fallback_data = pd.DataFrame({
@@ -403,7 +771,7 @@ with tab2:
         # If more than one column is selected
         elif len(columns_for_donut) > 1:
             # Compute the mean for the selected columns
-            averages = st.session_state.df[columns_for_donut].mean()
+            averages = column_stats.aggregate(columns_for_donut, "mean")
 
             # Create a DataFrame for visualization
             donut_data = pd.DataFrame({
@@ -435,11 +803,11 @@ with tab2:
             # Let user choose aggregation method
             aggregation_method = st.radio("Aggregation Method:", ["Mean", "Median", "Sum"])
             if aggregation_method == "Mean":
-                radar_data = st.session_state.df[radar_cols].mean().reset_index()
+                radar_data = column_stats.aggregate(radar_cols, "mean").reset_index()
             elif aggregation_method == "Median":
-                radar_data = st.session_state.df[radar_cols].median().reset_index()
+                radar_data = column_stats.aggregate(radar_cols, "median").reset_index()
             else:
-                radar_data = st.session_state.df[radar_cols].sum().reset_index()
+                radar_data = column_stats.aggregate(radar_cols, "sum").reset_index()
 
             # Rename the columns properly
             radar_data.columns = ['Metric', 'Value']
@@ -463,15 +831,15 @@ with tab2:
             # Allow the user to choose which metric to display
             gauge_metric = st.radio("Gauge Metric:", ["Mean", "Median", "Max"])
             if gauge_metric == "Mean":
-                gauge_value = st.session_state.df[gauge_col].mean()
+                gauge_value = column_stats[gauge_col].mean
             elif gauge_metric == "Median":
-                gauge_value = st.session_state.df[gauge_col].median()
+                gauge_value = column_stats[gauge_col].median
             elif gauge_metric == "Max":
-                gauge_value = st.session_state.df[gauge_col].max()
+                gauge_value = column_stats[gauge_col].max
 
             # Automatically determine the gauge range
             gauge_min = 0  # Minimum is always 0
-            gauge_max = st.session_state.df[gauge_col].max() * 1.1  # Add 10% buffer to max for better visualization
+            gauge_max = column_stats[gauge_col].max * 1.1  # Add 10% buffer to max for better visualization
 
             # Create the gauge chart
             fig = go.Figure(go.Indicator(
@@ -497,26 +865,60 @@ with tab2:
 with tab3:
     st.header("Report")
 
-    if st.session_state.df is not None:
+    if dataset is not None:
         st.subheader("Generate PDF Report")
 
         # Instructions for the user
         st.write("Click the button below to generate a comprehensive PDF report of your dataset, including summary statistics and visualizations.")
 
+        report_version = dataset.history.current.key
         if st.button("Generate PDF Report"):
-            # Generate the PDF report
-            generate_pdf_report(st.session_state.df)
-
-            # Success message
-            st.success("PDF report generated successfully!")
-
-            # Provide a download button
-            with open("data_report.pdf", "rb") as pdf_file:
-                st.download_button(
-                    label="Download PDF Report",
-                    data=pdf_file.read(),
-                    file_name="data_report.pdf",
-                    mime="application/pdf",
-                )
+            # Build the report in the background, rendering the charts in parallel; the app stays usable meanwhile
+            st.session_state.jobs.submit(
+                generate_pdf_report,
+                dataset.df,
+                stats=dataset.column_stats().snapshot(),
+                # Include the rule violations if the rules were checked on this version
+                validation=(
+                    st.session_state.validation[1].summary
+                    if st.session_state.validation is not None
+                    and st.session_state.validation[0][0] == report_version
+                    else None
+                ),
+                label="PDF report",
+                version=report_version,
+                kind="report",
+            )
+            st.rerun()
+
+        # Provide a download button for the report of the current data version
+        if report_version in st.session_state.reports:
+            st.download_button(
+                label="Download PDF Report",
+                data=st.session_state.reports[report_version],
+                file_name="data_report.pdf",
+                mime="application/pdf",
+            )
     else:
         st.warning("Please upload and clean the data in the first two tabs before generating the report.")
+
+# Per-step timings of this session's cleaning operations
+step_timings = st.session_state.profile.to_frame()
+if not step_timings.empty:
+    with profile_panel.container():
+        with st.expander("Step Timings"):
+            st.dataframe(
+                step_timings.iloc[::-1].assign(
+                    wall_ms=step_timings["wall_seconds"] * 1000,
+                    cpu_ms=step_timings["cpu_seconds"] * 1000,
+                )[["step", "wall_ms", "cpu_ms", "memory_delta_mb", "rows_in", "rows_out", "cells_modified", "cached"]],
+                hide_index=True,
+                column_config={
+                    "wall_ms": st.column_config.NumberColumn("Wall (ms)", format="%.1f"),
+                    "cpu_ms": st.column_config.NumberColumn("CPU (ms)", format="%.1f"),
+                    "memory_delta_mb": st.column_config.NumberColumn("Memory (MB)", format="%+.1f"),
+                },
+            )
+            if st.button("Clear Timings"):
+                st.session_state.profile.clear()
+                st.rerun()
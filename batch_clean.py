@@ -0,0 +1,60 @@
+"""
+Clean many CSV files with a DataCleaner pipeline, without the Streamlit app.
+
+Example:
+    python batch_clean.py pipeline.json "drops/**/*.csv" --output-dir cleaned --format parquet --workers 8
+
+pipeline.json:
+    {"backend": "pandas",
+     "steps": [{"op": "standardize_columns", "case": "lowercase"},
+               {"op": "impute", "plan": {"number": "median", "object": ["fill", "unknown"]}},
+               {"op": "drop_duplicates", "subset": ["id"], "keep": "last"}],
+     "rules": [{"rule": "range", "column": "age", "min": 0, "max": 120},
+               {"rule": "unique", "column": "id"}]}
+"""
+import argparse
+import json
+import sys
+
+from utils.batch import OUTPUT_FORMATS, load_spec, run_batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a DataCleaner pipeline over many CSV files in parallel.")
+    parser.add_argument("spec", help="Path to the JSON pipeline spec.")
+    parser.add_argument("inputs", help="Glob pattern of the input CSV files (quote it; '**' recurses).")
+    parser.add_argument("--output-dir", default="cleaned", help="Where cleaned files are written.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv", help="Output file format.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPUs).")
+    parser.add_argument("--summary", help="Write the per-file summary to this JSON-lines file.")
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+
+    def show(summary):
+        if summary["error"]:
+            print(f"FAILED {summary['file']}: {summary['error']}", file=sys.stderr)
+        else:
+            print(
+                f"{summary['file']}: {summary['rows_in']:,} -> {summary['rows_out']:,} rows, "
+                f"{summary['seconds']:.2f}s, peak {summary['peak_memory_mb']:,.0f} MB"
+            )
+            for name, count in (summary["violations"] or {}).items():
+                if count:
+                    print(f"  {count:,} rows violate {name}")
+
+    summaries = run_batch(args.inputs, spec, args.output_dir, args.format, args.workers, on_result=show)
+    if not summaries:
+        print(f"No files match {args.inputs!r}.", file=sys.stderr)
+        return 1
+    if args.summary:
+        with open(args.summary, "w") as handle:
+            for summary in summaries:
+                handle.write(json.dumps(summary) + "\n")
+    failed = sum(1 for summary in summaries if summary["error"])
+    print(f"{len(summaries) - failed} of {len(summaries)} files cleaned.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+# (name, rows, columns) of the datasets each suite runs on.
+SUITES = {
+    "quick": [("tall", 10 ** 4, 8), ("tall", 10 ** 5, 8), ("wide", 10 ** 3, 1000), ("mixed", 10 ** 5, 12)],
+    "default": [
+        ("tall", 10 ** 4, 8), ("tall", 10 ** 5, 8), ("tall", 10 ** 6, 8),
+        ("wide", 10 ** 4, 1000), ("mixed", 10 ** 6, 12),
+    ],
+    "full": [
+        ("tall", 10 ** 4, 8), ("tall", 10 ** 5, 8), ("tall", 10 ** 6, 8), ("tall", 10 ** 7, 8), ("tall", 10 ** 8, 4),
+        ("wide", 10 ** 4, 1000), ("wide", 10 ** 4, 5000), ("mixed", 10 ** 6, 12), ("mixed", 10 ** 7, 12),
+    ],
+}
+DTYPE_CYCLE = ("float", "int", "category", "text", "datetime", "bool")
+WORDS = np.array(["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta", "iota", "kappa"])
+
+
+def _column(kind, rows, rng):
+    if kind == "float":
+        return rng.normal(100, 15, rows)
+    if kind == "int":
+        return rng.integers(0, 1000, rows)
+    if kind == "category":
+        return WORDS[rng.integers(0, len(WORDS), rows)]
+    if kind == "text":
+        return np.char.add(WORDS[rng.integers(0, len(WORDS), rows)], rng.integers(0, rows, rows).astype(str))
+    if kind == "datetime":
+        return pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 10 ** 8, rows), unit="s")
+    return rng.random(rows) < 0.5
+
+
+def make_dataset(shape="tall", rows=10 ** 5, columns=8, null_rate=0.05, duplicate_rate=0.05,
+                 outlier_rate=0.01, seed=0):
+    """
+    Generate a synthetic DataFrame for benchmarking.
+
+    Parameters:
+    shape (str): 'tall' and 'wide' use numeric columns only, 'mixed' cycles through
+        float, int, category, text, datetime and bool columns.
+    rows (int): The number of rows.
+    columns (int): The number of columns.
+    null_rate (float): The fraction of missing values in every column.
+    duplicate_rate (float): The fraction of rows that are copies of other rows.
+    outlier_rate (float): The fraction of numeric values moved far outside the IQR bounds.
+    seed (int): The random seed.
+
+    Returns:
+    pd.DataFrame: The dataset.
+    """
+    rng = np.random.default_rng(seed)
+    kinds = DTYPE_CYCLE if shape == "mixed" else ("float", "int")
+    data = {}
+    for number in range(columns):
+        kind = kinds[number % len(kinds)]
+        values = pd.Series(_column(kind, rows, rng))
+        if kind in ("float", "int") and outlier_rate:
+            outliers = rng.random(rows) < outlier_rate
+            values = values.astype("float64").mask(outliers, values * 50)
+        if null_rate:
+            values = values.mask(rng.random(rows) < null_rate)
+        data[f"{kind.title()} Column {number}"] = values
+    df = pd.DataFrame(data)
+    if duplicate_rate:
+        # Replace a fraction of the rows with copies of random other rows.
+        positions = np.arange(rows)
+        copies = rng.random(rows) < duplicate_rate
+        positions[copies] = rng.integers(0, rows, int(copies.sum()))
+        df = df.take(positions).reset_index(drop=True)
+    return df
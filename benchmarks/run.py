@@ -0,0 +1,258 @@
+"""
+Benchmark DataCleaner operations, CSV loading, export in every format, and PDF report generation.
+
+Examples:
+    python -m benchmarks.run run --suite quick --output benchmarks/results/current.json
+    python -m benchmarks.run compare benchmarks/results/baseline.json benchmarks/results/current.json
+
+Every benchmark is timed as the best of --repeat runs, then run once more under
+tracemalloc for its peak memory. tracemalloc sees allocations made through
+Python and NumPy (so pandas too) but not pyarrow's own memory pool.
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.datasets import SUITES, make_dataset
+from utils.csv_loader import load_csv
+from utils.data_cleaner import DataCleaner
+from utils.export import available_formats, export_frame
+from utils.quantile_sketch import sketch_chunks
+from utils.report import generate_pdf_report
+
+
+def validation_rules(df):
+    """
+    Return a rule set covering every rule kind for a benchmark dataset.
+    """
+    numeric = df.select_dtypes(include=[np.number]).columns
+    text = df.select_dtypes(include=["object", "string"]).columns
+    rules = [{"rule": "not_null", "column": col} for col in df.columns]
+    rules += [{"rule": "range", "column": col, "min": 0, "max": 100} for col in numeric]
+    rules += [{"rule": "regex", "column": col, "pattern": r"\w+"} for col in text]
+    rules += [{"rule": "unique", "columns": list(df.columns[:2])}]
+    if len(numeric) >= 2:
+        rules.append({"rule": "compare", "column": numeric[0], "op": "<=", "other": numeric[1]})
+    return rules
+
+
+# op name -> function applying it to a DataCleaner.
+CLEANER_OPS = {
+    "standardize_columns": lambda cleaner: cleaner.standardize_columns(),
+    "drop_columns": lambda cleaner: cleaner.drop_columns(list(cleaner.df.columns[:1])),
+    "handle_missing_values[drop]": lambda cleaner: cleaner.handle_missing_values("drop"),
+    "handle_missing_values[mean]": lambda cleaner: cleaner.handle_missing_values("mean"),
+    "handle_missing_values[median]": lambda cleaner: cleaner.handle_missing_values("median"),
+    "handle_missing_values[mode]": lambda cleaner: cleaner.handle_missing_values("mode"),
+    "handle_missing_values[fill]": lambda cleaner: cleaner.handle_missing_values(
+        "fill", fill_value=0, columns=list(cleaner.df.select_dtypes("number").columns)
+    ),
+    "impute": lambda cleaner: cleaner.impute({"number": "median", "object": "mode"}),
+    "drop_duplicates": lambda cleaner: cleaner.drop_duplicates(),
+    "drop_near_duplicates": lambda cleaner: cleaner.drop_near_duplicates(),
+    "remove_outliers": lambda cleaner: cleaner.remove_outliers(),
+    "remove_outliers[sketch]": lambda cleaner: cleaner.remove_outliers(sketches=sketch_chunks([cleaner.df])),
+    "preview_outliers": lambda cleaner: cleaner.preview_outliers(),
+    "infer_types": lambda cleaner: cleaner.infer_types(),
+    "validate": lambda cleaner: cleaner.validate(validation_rules(cleaner.df)),
+    "optimize_dtypes": lambda cleaner: cleaner.optimize_dtypes(),
+}
+BACKENDS = ("pandas", "arrow")
+# PDF charts render a bounded amount of data, but describe() still scans everything.
+REPORT_MAX_ROWS = 10 ** 6
+
+
+def measure(function, repeat=3):
+    """
+    Return the best wall time of function() over repeat runs and its peak traced memory in MB.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak / 1024 ** 2
+
+
+def benchmarks_for(df, csv_path, backends=BACKENDS):
+    """
+    Yield (op, backend, function) for every benchmark on one dataset.
+    """
+    yield "load_csv", None, lambda: load_csv(csv_path)
+    for export_format in available_formats():
+        yield f"export_{export_format}", None, lambda export_format=export_format: export_frame(df, export_format).close()
+    for backend in backends:
+        for op, apply in CLEANER_OPS.items():
+            yield op, backend, lambda apply=apply, backend=backend: apply(DataCleaner(df, backend=backend))
+    if len(df) <= REPORT_MAX_ROWS:
+        yield "generate_pdf_report", None, lambda: generate_pdf_report(df)
+
+
+def run_suite(datasets, repeat=3, backends=BACKENDS, null_rate=0.05, duplicate_rate=0.05, outlier_rate=0.01,
+              ops=None, on_result=None):
+    """
+    Run every benchmark on every dataset.
+
+    Parameters:
+    datasets (list): (shape, rows, columns) tuples.
+    repeat (int): The number of timed runs per benchmark.
+    backends (tuple): The DataCleaner backends to time.
+    null_rate, duplicate_rate, outlier_rate (float): Passed to make_dataset.
+    ops (list): If given, only benchmarks with these op names run.
+    on_result (callable): Called with each result as soon as it is measured.
+
+    Returns:
+    list: One dict per benchmark with dataset, rows, columns, op, backend, seconds and peak_mb.
+    """
+    results = []
+    for shape, rows, columns in datasets:
+        df = make_dataset(shape, rows, columns, null_rate, duplicate_rate, outlier_rate)
+        with tempfile.TemporaryDirectory(prefix="viswalis-bench-") as directory:
+            csv_path = os.path.join(directory, "data.csv")
+            df.to_csv(csv_path, index=False)
+            for op, backend, function in benchmarks_for(df, csv_path, backends):
+                if ops and op not in ops:
+                    continue
+                seconds, peak_mb = measure(function, repeat)
+                result = {"dataset": shape, "rows": rows, "columns": columns, "op": op, "backend": backend,
+                          "seconds": round(seconds, 6), "peak_mb": round(peak_mb, 2)}
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+        del df
+    return results
+
+
+def environment():
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pa.__version__,
+    }
+
+
+def _key(result):
+    return result["dataset"], result["rows"], result["columns"], result["op"], result["backend"]
+
+
+def compare(baseline, current, threshold=0.10, min_seconds=0.005):
+    """
+    Compare two result files and find regressions.
+
+    A benchmark regresses when its time or peak memory grows by more than the
+    threshold. Benchmarks faster than min_seconds in the baseline are only
+    checked for memory, since their timings are mostly noise.
+
+    Parameters:
+    baseline (dict): The stored baseline results.
+    current (dict): The new results.
+    threshold (float): The allowed relative increase, e.g. 0.10 for 10%.
+    min_seconds (float): The smallest baseline time that is checked.
+
+    Returns:
+    list: One dict per benchmark present in both, with the baseline and current
+    values, their ratios and a 'regression' flag.
+    """
+    baseline_results = {_key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = baseline_results.get(_key(result))
+        if before is None:
+            continue
+        time_ratio = result["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        memory_ratio = result["peak_mb"] / before["peak_mb"] if before["peak_mb"] else 1.0
+        regression = memory_ratio > 1 + threshold or (
+            before["seconds"] >= min_seconds and time_ratio > 1 + threshold
+        )
+        rows.append({**dict(zip(("dataset", "rows", "columns", "op", "backend"), _key(result))),
+                     "seconds_before": before["seconds"], "seconds_after": result["seconds"],
+                     "time_ratio": round(time_ratio, 3), "peak_mb_before": before["peak_mb"],
+                     "peak_mb_after": result["peak_mb"], "memory_ratio": round(memory_ratio, 3),
+                     "regression": regression})
+    return rows
+
+
+def _label(result):
+    backend = f" [{result['backend']}]" if result["backend"] else ""
+    return f"{result['dataset']} {result['rows']:,}x{result['columns']:,} {result['op']}{backend}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VisWalis benchmark suite.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and save the results as JSON.")
+    run_parser.add_argument("--suite", choices=SUITES, default="quick", help="Which datasets to generate.")
+    run_parser.add_argument("--dataset", action="append", metavar="SHAPE:ROWS:COLUMNS",
+                            help="A custom dataset, e.g. mixed:1000000:20. Replaces the suite; repeatable.")
+    run_parser.add_argument("--op", action="append", help="Only run this op; repeatable.")
+    run_parser.add_argument("--backend", action="append", choices=BACKENDS, help="Only time this backend.")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (best is kept).")
+    run_parser.add_argument("--null-rate", type=float, default=0.05)
+    run_parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    run_parser.add_argument("--outlier-rate", type=float, default=0.01)
+    run_parser.add_argument("--output", default="benchmarks/results/latest.json", help="Where to save the results.")
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions against a stored baseline.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown.")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.005,
+                                help="Baseline times below this are not checked for speed.")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if args.dataset:
+            datasets = [(shape, int(float(rows)), int(float(columns)))
+                        for shape, rows, columns in (spec.split(":") for spec in args.dataset)]
+        else:
+            datasets = SUITES[args.suite]
+        results = run_suite(
+            datasets, args.repeat, tuple(args.backend or BACKENDS), args.null_rate, args.duplicate_rate,
+            args.outlier_rate, args.op,
+            on_result=lambda result: print(f"{_label(result)}: {result['seconds']:.4f}s, {result['peak_mb']:,.1f} MB"),
+        )
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as handle:
+            json.dump({"environment": environment(), "results": results}, handle, indent=1)
+        print(f"Saved {len(results)} results to {args.output}")
+        return 0
+
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    with open(args.current) as handle:
+        current = json.load(handle)
+    rows = compare(baseline, current, args.threshold, args.min_seconds)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"{flag:>10}  {_label(row)}: time x{row['time_ratio']:.2f}, memory x{row['memory_ratio']:.2f}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"{regressions} regression(s) in {len(rows)} benchmarks.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app runs with copy-on-write, which DataCleaner and the undo history rely on to share columns.
+pd.set_option("mode.copy_on_write", True)
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_cleaner import DataCleaner
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(5)
+    n = 2000
+    df = pd.DataFrame({
+        "Num A": rng.normal(size=n),
+        "int b": rng.integers(0, 20, n),
+        "S": rng.choice(["x", "y", "z", None], n),
+        "f": rng.integers(0, 4, n).astype(float),
+        "d": pd.to_datetime("2020-01-01") + pd.to_timedelta(rng.integers(0, 100, n), "D"),
+        "flag": pd.Series(rng.choice([True, False, None], n), dtype=object),
+        "name": [f"item {number}" for number in rng.permutation(n)],
+        "level": pd.Categorical(rng.choice(["low", "mid", "high", None], n), categories=["mid", "low", "high"]),
+    })
+    df.loc[::13, "Num A"] = np.nan
+    df.loc[::17, "f"] = np.nan
+    df.loc[::5, "Num A"] = 30
+    df.loc[::19, "d"] = pd.NaT
+    df.loc[::23, "name"] = None
+    df.index = df.index[::-1]
+    return df
+
+
+OPERATIONS = {
+    "standardize_columns": lambda c: c.standardize_columns(),
+    "drop_columns": lambda c: c.drop_columns(["S"]),
+    "drop": lambda c: c.handle_missing_values("drop"),
+    "mean": lambda c: c.handle_missing_values("mean"),
+    "median": lambda c: c.handle_missing_values("median"),
+    "mode": lambda c: c.handle_missing_values("mode"),
+    "fill_text": lambda c: c.handle_missing_values("fill", "q", columns=["S"]),
+    "fill_number": lambda c: c.handle_missing_values("fill", 1.5, columns=["Num A", "f"]),
+    "fill_number_text": lambda c: c.handle_missing_values("fill", "5", columns=["Num A", "f"]),
+    "fill_date_text": lambda c: c.handle_missing_values("fill", "2021-02-03", columns=["d"]),
+    "fill_category": lambda c: c.handle_missing_values("fill", "high", columns=["level"]),
+    "fill_new_category": lambda c: c.handle_missing_values("fill", "none", columns=["level"]),
+    "fill_bool_text": lambda c: c.handle_missing_values("fill", "true", columns=["flag"]),
+    "impute": lambda c: c.impute({"number": "median", "S": "mode", "d": "mean", "level": "mode"}),
+    "drop_duplicates": lambda c: c.drop_duplicates(["int b", "S"]),
+    "drop_duplicates_last": lambda c: c.drop_duplicates(["int b", "S"], keep="last"),
+    "drop_duplicates_none": lambda c: c.drop_duplicates(["int b", "f"], keep=False),
+    "drop_near_duplicates": lambda c: c.drop_near_duplicates(["S"]),
+    "remove_outliers": lambda c: c.remove_outliers(),
+    "infer_types": lambda c: c.infer_types(),
+    "optimize_dtypes": lambda c: c.optimize_dtypes(),
+    "chain": lambda c: (
+        c.remove_outliers(["Num A"]).drop_duplicates(["int b"]).handle_missing_values("mean").standardize_columns()
+    ),
+}
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("operation", OPERATIONS)
+def test_backends_agree(frame, operation, lazy):
+    results = [
+        OPERATIONS[operation](DataCleaner(frame, lazy=lazy, backend=backend)).get_cleaned_data()
+        for backend in ("pandas", "arrow")
+    ]
+    pd.testing.assert_frame_equal(results[0], results[1])
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_optimized_dtypes_and_memory_agree(frame, lazy):
+    results = [
+        DataCleaner(frame, lazy=lazy, backend=backend).optimize_dtypes().standardize_columns().get_cleaned_data()
+        for backend in ("pandas", "arrow")
+    ]
+    assert results[0]["name"].dtype == pd.StringDtype("pyarrow")
+    assert results[0].dtypes.to_dict() == results[1].dtypes.to_dict()
+    assert results[0].memory_usage(deep=True).sum() == results[1].memory_usage(deep=True).sum()
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_fill_values_are_converted_to_the_column_type(frame, backend):
+    cleaned = DataCleaner(frame, backend=backend).impute(
+        {"f": ("fill", "5"), "d": ("fill", "2021-02-03"), "S": ("fill", "q")}
+    ).get_cleaned_data()
+    assert cleaned["f"].dtype == "float64" and cleaned.loc[frame["f"].isna(), "f"].eq(5.0).all()
+    assert cleaned["d"].dtype == "datetime64[ns]"
+    assert cleaned.loc[frame["d"].isna(), "d"].eq(pd.Timestamp("2021-02-03")).all()
+    assert cleaned.loc[frame["S"].isna(), "S"].eq("q").all()
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+@pytest.mark.parametrize("column, value", [("d", 0), ("S", 0), ("f", "abc"), ("f", True), ("flag", 1)])
+def test_incompatible_fill_values_are_rejected(frame, backend, column, value):
+    with pytest.raises(TypeError, match=repr(column)):
+        DataCleaner(frame, backend=backend).handle_missing_values("fill", value, columns=[column])
+
+
+def test_arrow_backend_rejects_columns_it_cannot_store():
+    df = pd.DataFrame({"mixed": pd.Series([1, "a", 2.5], dtype=object)})
+    with pytest.raises(TypeError, match="arrow backend cannot store"):
+        DataCleaner(df, backend="arrow")
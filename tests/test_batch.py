@@ -0,0 +1,29 @@
+import os
+
+import pandas as pd
+
+from utils.batch import glob_root, output_path, run_batch
+
+
+def test_glob_root():
+    assert glob_root("drops/**/*.csv") == "drops"
+    assert glob_root("/data/in/*.csv") == "/data/in"
+    assert glob_root("*.csv") == "."
+    assert glob_root("/*.csv") == "/"
+
+
+def test_output_path_keeps_the_path_below_the_root():
+    assert output_path("drops/a/x.csv", "out", "csv", "drops") == os.path.join("out", "a", "x.cleaned.csv")
+    assert output_path("drops/a/x.csv", "out", "csv") == os.path.join("out", "x.cleaned.csv")
+
+
+def test_files_of_the_same_name_do_not_overwrite_each_other(tmp_path):
+    for folder, value in (("a", 1), ("b", 2)):
+        os.makedirs(tmp_path / "drops" / folder)
+        pd.DataFrame({"v": [value, value]}).to_csv(tmp_path / "drops" / folder / "x.csv", index=False)
+    spec = {"steps": [{"op": "drop_duplicates"}]}
+    summaries = run_batch(str(tmp_path / "drops" / "**" / "*.csv"), spec, str(tmp_path / "out"), max_workers=1)
+    assert [summary["error"] for summary in summaries] == [None, None]
+    outputs = [summary["output"] for summary in summaries]
+    assert outputs == [str(tmp_path / "out" / "a" / "x.cleaned.csv"), str(tmp_path / "out" / "b" / "x.cleaned.csv")]
+    assert [pd.read_csv(output)["v"].tolist() for output in outputs] == [[1], [2]]
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.chart_data import area_data, lttb_positions, minmax_positions, sample_positions
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(8)
+    y = np.cumsum(rng.normal(size=10_007))
+    y[1234], y[8765] = 500.0, -500.0
+    y[::97] = np.nan
+    return y
+
+
+@pytest.mark.parametrize("sample", [lttb_positions, minmax_positions])
+@pytest.mark.parametrize("n_out", [4, 5, 100, 1001, 5000])
+def test_downsampling_keeps_the_ends_and_extrema_within_budget(values, sample, n_out):
+    positions = sample(values, n_out)
+    assert len(positions) <= n_out
+    assert positions[0] == 0 and positions[-1] == len(values) - 1
+    assert (np.diff(positions) > 0).all()
+    if n_out >= 100:
+        assert {1234, 8765} <= set(positions)
+
+
+def test_min_max_downsampling_keeps_every_bucket_extreme(values):
+    values = values[~np.isnan(values)]
+    kept = np.zeros(len(values), dtype=bool)
+    kept[minmax_positions(values, 202)] = True
+    size = -(-len(values) // 100)
+    for start in range(0, len(values), size):
+        bucket, chosen = values[start:start + size], values[start:start + size][kept[start:start + size]]
+        assert chosen.max() == bucket.max() and chosen.min() == bucket.min()
+
+
+@pytest.mark.parametrize("sample", [lttb_positions, minmax_positions])
+def test_short_series_are_kept_whole(sample):
+    assert sample(np.arange(10.0), 50).tolist() == list(range(10))
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_area_data_stays_within_the_point_budget(values, method):
+    df = pd.DataFrame({"x": np.arange(len(values)), "a": values, "b": np.arange(len(values)) * 1e4})
+    data, labels = area_data(df, "x", ["a", "b"], max_points=500, method=method)
+    assert len(data) <= 500
+    assert labels == ["a", "b (in millions)"]
+    assert data["x"].iloc[0] == 0 and data["x"].iloc[-1] == len(values) - 1
+    assert data["b (in millions)"].iloc[-1] == pytest.approx(df["b"].iloc[-1] / 1e6)
+    assert len(sample_positions(df, ["a", "b"], 500, method)) == len(data)
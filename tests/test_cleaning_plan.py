@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cleaning_plan import FilterGroup, PlanStep, optimize_plan
+from utils.data_cleaner import DataCleaner
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(2)
+    n = 500
+    df = pd.DataFrame({
+        "a": rng.normal(size=n),
+        "b": rng.normal(size=n),
+        "s": rng.choice(["alpha beta", "alpha beta!", "gamma delta", "epsilon"], n),
+    })
+    df.loc[::7, "a"] = np.nan
+    df.loc[::11, "b"] = np.nan
+    df.loc[::9, "b"] = 25.0
+    return df
+
+
+def _plans(df, backend, record):
+    """
+    Return the recorded plan, its optimized form, and the eager and lazy results of recording it.
+    """
+    eager = record(DataCleaner(df, backend=backend)).get_cleaned_data()
+    cleaner = record(DataCleaner(df, lazy=True, backend=backend))
+    plan = list(cleaner.plan)
+    return plan, optimize_plan(plan), eager, cleaner.get_cleaned_data()
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_steps_after_missing_values_are_dropped_are_skipped(frame, backend):
+    plan, optimized, eager, lazy = _plans(
+        frame, backend, lambda c: c.handle_missing_values("drop").handle_missing_values("mean").impute({"a": "median"})
+    )
+    assert optimized == [FilterGroup([plan[0]])]
+    pd.testing.assert_frame_equal(lazy, eager)
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_filters_move_ahead_of_constant_fills_of_other_columns(frame, backend):
+    plan, optimized, eager, lazy = _plans(
+        frame, backend, lambda c: c.handle_missing_values("fill", 0.0, columns=["a"]).remove_outliers(["b"])
+    )
+    assert optimized == [FilterGroup([plan[1]]), plan[0]]
+    pd.testing.assert_frame_equal(lazy, eager)
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_filters_stay_after_fills_of_the_columns_they_read(frame, backend):
+    plan, optimized, eager, lazy = _plans(
+        frame, backend, lambda c: c.handle_missing_values("fill", 25.0, columns=["b"]).remove_outliers(["b"])
+    )
+    assert optimized == [plan[0], FilterGroup([plan[1]])]
+    pd.testing.assert_frame_equal(lazy, eager)
+    # The filled values are outliers, so filtering first would have kept them.
+    assert not (lazy["b"] == 25.0).any()
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_adjacent_filters_are_fused(frame, backend):
+    plan, optimized, eager, lazy = _plans(
+        frame, backend,
+        lambda c: c.handle_missing_values("drop", columns=["a"]).remove_outliers(["b"]).drop_near_duplicates(["s"]),
+    )
+    assert optimized == [FilterGroup(plan)]
+    pd.testing.assert_frame_equal(lazy, eager)
+
+
+def test_infer_types_resets_cleared_missing_values():
+    steps = [
+        PlanStep("handle_missing_values", strategy="drop", fill_value=None, columns=None),
+        PlanStep("infer_types", columns=None, sample_size=1000, max_failure_rate=0.05),
+        PlanStep("handle_missing_values", strategy="mean", fill_value=None, columns=None),
+    ]
+    optimized = optimize_plan(steps)
+    assert len(optimized) == 3 and optimized[-1] == steps[-1]
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_lazy_matches_eager_when_type_inference_introduces_missing_values(backend):
+    values = [str(number) for number in range(40)]
+    values[7] = "unknown"
+    df = pd.DataFrame({"amount": values + [None], "other": np.arange(41.0)})
+
+    def clean(lazy):
+        cleaner = DataCleaner(df, lazy=lazy, backend=backend)
+        cleaner.handle_missing_values("drop").infer_types().handle_missing_values("mean")
+        return cleaner.get_cleaned_data()
+
+    eager, lazy = clean(False), clean(True)
+    pd.testing.assert_frame_equal(lazy, eager)
+    assert not lazy["amount"].isna().any()
+    assert lazy["amount"].iloc[7] == pytest.approx(np.mean([n for n in range(40) if n != 7]))
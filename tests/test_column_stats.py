@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.column_stats import ColumnStatsIndex
+from utils.data_cleaner import DataCleaner
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(6)
+    n = 1000
+    df = pd.DataFrame({
+        "value": rng.normal(size=n),
+        "count": rng.integers(0, 50, n),
+        "step": np.arange(n),
+        "kind": rng.choice(["a", "b", "c", None], n),
+        "when": pd.to_datetime("2021-01-01") + pd.to_timedelta(rng.integers(0, 400, n), "D"),
+    })
+    df.loc[::13, "value"] = np.nan
+    df.loc[[3, 500], "value"] = [1000.0, -1000.0]
+    return df
+
+
+def assert_same_stats(index, df):
+    """
+    Check every column's statistics in the index against ones computed from scratch.
+    """
+    fresh = ColumnStatsIndex(df)
+    assert list(index.stats) == list(fresh.stats)
+    assert index.index.equals(df.index)
+    for name, expected in fresh.stats.items():
+        actual = index[name]
+        assert actual.dtype == expected.dtype and actual.kind == expected.kind, name
+        assert (actual.count, actual.null_count, actual.is_monotonic) == (
+            expected.count, expected.null_count, expected.is_monotonic
+        ), name
+        for attribute in ("sum", "mean", "min", "max", "median"):
+            got, want = getattr(actual, attribute), getattr(expected, attribute)
+            if pd.isna(want):
+                assert pd.isna(got), (name, attribute)
+            elif isinstance(want, (float, np.floating)):
+                assert got == pytest.approx(want), (name, attribute)
+            else:
+                assert got == want, (name, attribute)
+        assert actual.cardinality == expected.cardinality, name
+        pd.testing.assert_series_equal(actual.top_values, expected.top_values)
+
+
+def test_incremental_updates_match_a_full_recompute(frame):
+    index = ColumnStatsIndex(frame, version="loaded")
+
+    # A filter that removes the extremes of one column and keeps an increasing column increasing.
+    keep = (frame["value"].abs() < 500).to_numpy() | frame["value"].isna().to_numpy()
+    keep[::4] = False
+    filtered = frame[keep]
+    index.remove_rows(filtered, keep, "filtered")
+    assert_same_stats(index, filtered)
+
+    # Replacing one column's values leaves the others' statistics as they are.
+    replaced = filtered.assign(value=filtered["value"].fillna(0.5))
+    unchanged = index["count"]
+    index.sync(replaced, "filled")
+    assert index["count"] is unchanged
+    assert_same_stats(index, replaced)
+
+    # A dtype change with equal values still recomputes the column.
+    converted = replaced.astype({"count": "int8", "kind": "category"})
+    index.sync(converted, "compacted")
+    assert index["count"].dtype == np.int8 and index["kind"].kind == "category"
+    assert_same_stats(index, converted)
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_cleaner_keeps_the_index_up_to_date(frame, backend):
+    index = ColumnStatsIndex(frame, version="loaded")
+    cleaner = DataCleaner(frame, backend=backend, data_key="loaded", stats=index)
+    cleaner.remove_outliers(["value"]).handle_missing_values("mean").drop_columns(["step"]).optimize_dtypes()
+    assert_same_stats(index, cleaner.get_cleaned_data())
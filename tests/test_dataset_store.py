@@ -0,0 +1,60 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dataset_store import DatasetStore, SessionDataset
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DatasetStore(directory=str(tmp_path), memory_budget=0, idle_seconds=0)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "id": pd.array([f"row-{number}" for number in range(2000)], dtype="string[pyarrow]"),
+        "kind": pd.Categorical(rng.choice(["a", "b"], 2000)),
+        "value": rng.normal(size=2000),
+    })
+
+
+def test_spilled_versions_reload_with_their_dtypes(store, frame):
+    session = SessionDataset(frame, "original", store=store)
+    changed = frame.assign(value=frame["value"] * 2)
+    session.history.record(changed, "double", key="doubled")
+    assert session.spill() == 2
+    reloaded = session.df
+    pd.testing.assert_frame_equal(reloaded, changed, check_index_type=True)
+    assert reloaded.memory_usage(deep=True).sum() == changed.memory_usage(deep=True).sum()
+    pd.testing.assert_frame_equal(session.history.undo(), frame, check_index_type=True)
+
+
+def test_spilling_from_another_thread_while_the_session_works(store, frame):
+    session = SessionDataset(frame, "original", store=store)
+    errors = []
+    stop = threading.Event()
+
+    def spill_repeatedly():
+        try:
+            while not stop.is_set():
+                session.spill()
+        except Exception as error:
+            errors.append(error)
+
+    spiller = threading.Thread(target=spill_repeatedly)
+    spiller.start()
+    try:
+        for number in range(30):
+            session.history.record(frame.assign(value=frame["value"] + number), f"step {number}", key=f"v{number}")
+            assert session.column_stats()["value"].count == len(frame)
+            pd.testing.assert_series_equal(session.df["value"], frame["value"] + number)
+            session.history.undo()
+            session.history.redo()
+    finally:
+        stop.set()
+        spiller.join()
+    assert errors == []
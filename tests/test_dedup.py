@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dedup import drop_duplicates_csv, drop_duplicates_partitioned
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(4)
+    n = 1000
+    df = pd.DataFrame({
+        "key": rng.integers(0, 150, n),
+        "name": rng.choice(["a", "b", None], n),
+        "value": rng.normal(size=n),
+    })
+    df.index = pd.Index(rng.permutation(n) * 3)
+    return df
+
+
+@pytest.mark.parametrize("keep", ["first", "last", False])
+@pytest.mark.parametrize("subset", [None, ["key", "name"]])
+def test_partitioned_drop_duplicates_matches_pandas(frame, tmp_path, subset, keep):
+    # Whole rows repeat far apart, so duplicates land in different chunks.
+    df = pd.concat([frame, frame.iloc[::3]])
+    # Small chunks and few partitions make every duplicate group span several chunks.
+    result = drop_duplicates_partitioned(
+        df, subset=subset, keep=keep, n_partitions=4, chunk_rows=97, max_workers=2, spill_dir=str(tmp_path)
+    )
+    pd.testing.assert_frame_equal(result, df.drop_duplicates(subset=subset, keep=keep))
+
+
+def test_csv_drop_duplicates_matches_pandas(frame, tmp_path):
+    source, destination = tmp_path / "in.csv", tmp_path / "out.csv"
+    pd.concat([frame, frame.iloc[::2]]).to_csv(source, index=False)
+    written = drop_duplicates_csv(str(source), str(destination), subset=["key", "name"], keep="last",
+                                  n_partitions=4, max_workers=2, spill_dir=str(tmp_path))
+    expected = pd.read_csv(source).drop_duplicates(subset=["key", "name"], keep="last").reset_index(drop=True)
+    assert written == len(expected)
+    pd.testing.assert_frame_equal(pd.read_csv(destination), expected)
@@ -0,0 +1,118 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.appends import load_append
+from utils.csv_loader import load_csv
+from utils.data_cleaner import DataCleaner
+from utils.dataset_store import SessionDataset
+from utils.incremental import FileFingerprint
+from utils.result_cache import content_hash
+
+
+def _csv(df, header=True):
+    return df.to_csv(index=False, header=header).encode()
+
+
+def _make(rows, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Num A": rng.normal(50, 10, rows).round(2),
+        "Num B": rng.integers(0, 100, rows).astype(float),
+        "Cat": rng.choice(["x", "y", "z"], rows),
+        "Date": pd.Series(pd.date_range("2020-01-01", periods=rows, freq="h")).dt.strftime("%Y-%m-%d"),
+    })
+    df.loc[rng.random(rows) < 0.1, "Num A"] = np.nan
+    df.loc[rng.random(rows) < 0.1, "Num B"] = np.nan
+    df.loc[rng.random(rows) < 0.1, "Cat"] = None
+    return df
+
+
+def _clean_all(df, dataset, backend):
+    cleaner = DataCleaner(df, history=dataset.history, backend=backend, data_key=dataset.history.current.key,
+                          track_replay=True)
+    cleaner.standardize_columns()
+    cleaner.handle_missing_values("mean", columns=["num_a"])
+    cleaner.handle_missing_values("median", columns=["num_b"])
+    cleaner.handle_missing_values("mode", columns=["cat"])
+    cleaner.remove_outliers(["num_a"])
+    cleaner.drop_duplicates()
+    cleaner.infer_types()
+    cleaner.optimize_dtypes()
+    return cleaner.get_cleaned_data()
+
+
+def _load(data, clean):
+    raw = load_csv(io.BytesIO(data))
+    dataset = SessionDataset(raw, content_hash(data))
+    clean(raw, dataset)
+    return dataset, FileFingerprint(data, len(raw))
+
+
+def _optimize(df, dataset):
+    cleaner = DataCleaner(df, history=dataset.history, data_key=dataset.history.current.key, track_replay=True)
+    return cleaner.optimize_dtypes().get_cleaned_data()
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_appended_rows_are_cleaned_like_a_full_reclean(backend):
+    old, new = _make(2000, 1), _make(500, 2)
+    # Appended rows repeating old rows are dropped as duplicates.
+    new.iloc[:5] = old.iloc[100:105].to_numpy()
+    old_data = _csv(old)
+    data = old_data + _csv(new, header=False)
+    dataset, fingerprint = _load(old_data, lambda df, ds: _clean_all(df, ds, backend))
+    cleaned = dataset.df
+
+    appended, _, message = load_append(dataset, data, fingerprint, backend=backend)
+    assert message.startswith("Loaded and cleaned")
+    incremental = appended.df
+    reference_dataset = SessionDataset(load_csv(io.BytesIO(data)), content_hash(data))
+    reference = _clean_all(reference_dataset.df, reference_dataset, backend)
+
+    # The old rows are not revisited, so only the new rows may differ from a full re-clean.
+    pd.testing.assert_frame_equal(incremental.iloc[:len(cleaned)], cleaned, check_dtype=False)
+    assert not incremental.duplicated().any()
+    assert not incremental.isna().any().any()
+    assert len(cleaned) < len(incremental) <= len(cleaned) + len(new) - 5
+    assert incremental.dtypes.to_dict() == reference.dtypes.to_dict()
+
+
+def test_appended_integers_that_overflow_the_optimized_dtype_widen_it():
+    old = pd.DataFrame({"count": np.arange(100), "ratio": np.full(100, 0.5)})
+    new = pd.DataFrame({"count": [1000, 70000], "ratio": [0.1, 0.25]})
+    old_data = _csv(old)
+    dataset, fingerprint = _load(old_data, _optimize)
+    assert dataset.df.dtypes.to_dict() == {"count": np.int8, "ratio": np.float32}
+
+    appended, fingerprint, _ = load_append(dataset, old_data + _csv(new, header=False), fingerprint)
+    result = appended.df
+    assert result["count"].dtype == np.int32
+    assert result["ratio"].dtype == np.float64
+    assert result["count"].tolist() == list(range(100)) + [1000, 70000]
+    assert result["ratio"].tolist() == [0.5] * 100 + [0.1, 0.25]
+
+    # The widened dtypes are what the next append is replayed with.
+    replayed = appended.history.replay_log()[-1].state
+    assert replayed == {"count": np.int32, "ratio": np.float64}
+
+
+def test_appended_values_that_fit_keep_the_optimized_dtype():
+    old = pd.DataFrame({"count": np.arange(100), "ratio": np.full(100, 0.5)})
+    new = pd.DataFrame({"count": [7, -3], "ratio": [0.75, 0.25]})
+    old_data = _csv(old)
+    dataset, fingerprint = _load(old_data, _optimize)
+
+    appended, _, _ = load_append(dataset, old_data + _csv(new, header=False), fingerprint)
+    assert appended.df.dtypes.to_dict() == {"count": np.int8, "ratio": np.float32}
+    assert appended.df["count"].tolist()[-2:] == [7, -3]
+
+
+def test_upload_that_is_not_an_append_is_not_loaded_incrementally():
+    old = _make(100, 1)
+    old_data = _csv(old)
+    dataset, fingerprint = _load(old_data, lambda df, ds: None)
+    changed = _csv(old.iloc[::-1])
+    assert load_append(dataset, changed, fingerprint) is None
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_cleaner import DataCleaner
+from utils.near_dedup import near_duplicate_roots
+
+
+def test_similar_text_is_clustered_with_its_first_row():
+    names = pd.Series(["Acme Corp.", "acme corp", "ACME, Corp!", "Globex Inc", "Initech"])
+    assert near_duplicate_roots([names]).tolist() == [0, 0, 0, 3, 4]
+
+
+def test_rows_without_text_are_not_near_duplicates():
+    names = pd.Series(["Acme Corp", None, np.nan, "", "--", "?!", "Acme Corp", None])
+    roots = near_duplicate_roots([names])
+    assert roots.tolist() == [0, 1, 2, 3, 4, 5, 0, 7]
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_drop_near_duplicates_keeps_rows_with_missing_text(backend):
+    df = pd.DataFrame({
+        "name": ["Acme Corp", None, np.nan, "...", "acme corp.", None],
+        "amount": [1, 2, 3, 4, 5, 6],
+    })
+    cleaned = DataCleaner(df, backend=backend).drop_near_duplicates(["name"]).get_cleaned_data()
+    assert cleaned["amount"].tolist() == [1, 2, 3, 4, 6]
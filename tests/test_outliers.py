@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.outliers import iqr_bounds, outlier_mask, sketch_bounds
+from utils.quantile_sketch import sketch_series
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(9)
+    n = 5000
+    df = pd.DataFrame({"a": rng.normal(size=n), "b": rng.exponential(size=n), "c": rng.integers(0, 10, n)})
+    df.loc[::10, "a"] = np.nan
+    df.loc[[5, 6], "b"] = [50.0, -50.0]
+    return df
+
+
+def test_bounds_match_the_iqr_computed_by_pandas(frame):
+    bounds = iqr_bounds(frame, ["a", "b", "c"])
+    for col in ["a", "b", "c"]:
+        q1, q3 = frame[col].quantile(0.25), frame[col].quantile(0.75)
+        assert bounds.loc[col, "Q1"] == pytest.approx(q1) and bounds.loc[col, "Q3"] == pytest.approx(q3)
+        assert bounds.loc[col, "lower"] == pytest.approx(q1 - 1.5 * (q3 - q1))
+        assert bounds.loc[col, "upper"] == pytest.approx(q3 + 1.5 * (q3 - q1))
+
+
+def test_bounds_on_a_subset_of_rows(frame):
+    rows = np.arange(len(frame)) % 3 == 0
+    bounds = iqr_bounds(frame, ["b"], rows=rows, factor=3)
+    q1, q3 = frame.loc[rows, "b"].quantile([0.25, 0.75])
+    assert bounds.loc["b", "upper"] == pytest.approx(q3 + 3 * (q3 - q1))
+
+
+def test_mask_keeps_rows_within_every_column_bounds_and_missing_values(frame):
+    bounds = iqr_bounds(frame, ["a", "b"])
+    keep, counts = outlier_mask(frame, bounds)
+    expected = np.ones(len(frame), dtype=bool)
+    for col in ["a", "b"]:
+        outside = (frame[col] < bounds.loc[col, "lower"]) | (frame[col] > bounds.loc[col, "upper"])
+        assert counts[col] == outside.sum()
+        expected &= ~outside.to_numpy()
+    np.testing.assert_array_equal(keep, expected)
+    assert keep[frame["a"].isna().to_numpy() & expected].all()
+    assert not keep[[5, 6]].any()
+
+
+def test_sketch_bounds_are_close_to_the_exact_ones(frame):
+    exact = iqr_bounds(frame, ["b"])
+    sketched = sketch_bounds({"b": sketch_series(frame["b"])})
+    spread = exact.loc["b", "Q3"] - exact.loc["b", "Q1"]
+    for column in ["Q1", "Q3", "lower", "upper"]:
+        assert sketched.loc["b", column] == pytest.approx(exact.loc["b", column], abs=0.1 * spread)
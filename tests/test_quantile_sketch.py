@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.quantile_sketch import KLLSketch, sketch_chunks, sketch_series
+
+QUANTILES = np.linspace(0.01, 0.99, 25)
+
+
+@pytest.fixture(scope="module")
+def values():
+    rng = np.random.default_rng(21)
+    values = np.concatenate([rng.lognormal(size=600_000), rng.normal(-5, 1, 400_000)])
+    rng.shuffle(values)
+    return values
+
+
+def rank_errors(sorted_values, estimates):
+    """
+    Return how far the normalized rank of each estimate is from its quantile.
+    """
+    below = np.searchsorted(sorted_values, estimates, side="left")
+    upto = np.searchsorted(sorted_values, estimates, side="right")
+    target = QUANTILES * len(sorted_values)
+    # Any rank between the first and last occurrence of an estimate is its rank.
+    return np.maximum(np.maximum(below - target, target - upto), 0) / len(sorted_values)
+
+
+def test_rank_error_stays_within_the_bound(values):
+    sketch = KLLSketch().update(values)
+    assert not sketch.exact and sketch.count == len(values)
+    assert sketch.nbytes < 4 * sketch.k * 8 * 3
+    assert (rank_errors(np.sort(values), sketch.quantile(QUANTILES)) <= sketch.rank_error).all()
+    assert sketch.quantile(0) == values.min() and sketch.quantile(1) == values.max()
+
+
+def test_merged_chunk_sketches_match_a_single_sketch(values):
+    single = KLLSketch().update(values)
+    merged = KLLSketch()
+    for number, chunk in enumerate(np.array_split(values, 13)):
+        merged.merge(KLLSketch(seed=number).update(chunk))
+    assert (merged.count, merged.min, merged.max) == (single.count, single.min, single.max)
+    ordered = np.sort(values)
+    assert (rank_errors(ordered, merged.quantile(QUANTILES)) <= merged.rank_error).all()
+    # Both estimates are within the bound of the true quantile, so within twice of each other.
+    estimates = np.searchsorted(ordered, [merged.quantile(QUANTILES), single.quantile(QUANTILES)]) / len(values)
+    assert np.abs(estimates[0] - estimates[1]).max() <= 2 * single.rank_error
+
+
+def test_chunked_builders_match_the_data(values):
+    series = pd.Series(values)
+    series[::1000] = np.nan
+    chunked = sketch_series(series, chunk_rows=100_000, max_workers=4)
+    assert chunked.count == series.count()
+    ordered = np.sort(series.dropna().to_numpy())
+    assert (rank_errors(ordered, chunked.quantile(QUANTILES)) <= chunked.rank_error).all()
+
+    frame = pd.DataFrame({"value": series, "label": "x"})
+    sketches = sketch_chunks(frame.iloc[start:start + 250_000] for start in range(0, len(frame), 250_000))
+    assert list(sketches) == ["value"]
+    assert (rank_errors(ordered, sketches["value"].quantile(QUANTILES)) <= chunked.rank_error).all()
+
+
+def test_small_sketches_are_exact():
+    series = pd.Series(np.random.default_rng(3).normal(size=150))
+    merged = KLLSketch().update(series[:60]).merge(KLLSketch().update(series[60:]))
+    assert merged.exact
+    np.testing.assert_allclose(merged.quantile(QUANTILES), series.quantile(QUANTILES).to_numpy())
+    assert np.isnan(KLLSketch().quantile(0.5))
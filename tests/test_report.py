@@ -0,0 +1,56 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.report import _area_plot, generate_pdf_report, render_charts
+
+
+def test_plotly_charts_render_on_the_calling_thread():
+    threads = []
+
+    def plotly_chart(data):
+        threads.append(threading.get_ident())
+        return b"png"
+
+    charts = [("first", plotly_chart, None), ("area", _area_plot, pd.DataFrame({"a": [1, 2, 3]})),
+              ("second", plotly_chart, None)]
+    rendered = render_charts(charts, max_workers=4)
+    assert [name for name, _ in rendered] == ["first", "area", "second"]
+    assert rendered[0][1] == b"png" and rendered[1][1].startswith(b"\x89PNG")
+    assert threads == [threading.get_ident()] * 2
+
+
+def test_charts_are_left_out_when_image_export_is_unavailable():
+    calls = []
+
+    def unavailable(data):
+        calls.append(data)
+        raise RuntimeError("Kaleido requires Google Chrome to be installed.")
+
+    def failing(data):
+        raise ValueError("bad data")
+
+    charts = [("pie", unavailable, 1), ("gauge", unavailable, 2), ("area", _area_plot, pd.DataFrame({"a": [1, 2]}))]
+    rendered = dict(render_charts(charts))
+    assert rendered["pie"] is None and rendered["gauge"] is None
+    assert calls == [1]
+    assert rendered["area"].startswith(b"\x89PNG")
+    assert isinstance(dict(render_charts([("bad", failing, None)]))["bad"], ValueError)
+
+
+def test_a_failing_chart_does_not_leave_out_the_others():
+    def broken(data):
+        raise RuntimeError("figure has no traces")
+
+    def working(data):
+        return b"png"
+
+    rendered = dict(render_charts([("pie", broken, None), ("gauge", working, None)]))
+    assert isinstance(rendered["pie"], RuntimeError)
+    assert rendered["gauge"] == b"png"
+
+
+def test_report_is_generated_whatever_charts_can_be_exported():
+    df = pd.DataFrame({"a": np.arange(50.0), "b": np.arange(50) % 7})
+    assert generate_pdf_report(df).startswith(b"%PDF")
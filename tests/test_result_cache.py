@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cleaning_plan import PlanStep
+from utils.data_cleaner import DataCleaner
+from utils.result_cache import ResultCache, step_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(directory=str(tmp_path))
+
+
+def test_round_trip_keeps_values_and_dtypes(cache):
+    df = pd.DataFrame({
+        "a": np.arange(5, dtype="int32"),
+        "b": [0.5, np.nan, 1.5, 2.0, 3.0],
+        "c": ["x", None, "y", "z", "x"],
+        "d": pd.date_range("2020-01-01", periods=5),
+        "e": pd.Categorical(["u", "v", "u", None, "v"]),
+    }, index=pd.RangeIndex(10, 15))
+    assert cache.put("frame", df)
+    pd.testing.assert_frame_equal(cache.get("frame"), df, check_index_type=True)
+    assert isinstance(cache.get("frame").index, pd.RangeIndex)
+
+
+def test_mixed_object_columns_are_not_cached(cache):
+    df = pd.DataFrame({"d": pd.Series([pd.Timestamp("2020-01-01"), 0], dtype=object)})
+    assert not cache.put("mixed", df)
+    assert cache.get("mixed") is None
+
+
+def test_duplicate_column_labels_are_not_cached(cache):
+    df = pd.DataFrame({"Name": [1, 2], "name ": [3, 4]})
+    cleaned = DataCleaner(df, cache=cache, data_key="source").standardize_columns().get_cleaned_data()
+    assert list(cleaned.columns) == ["name", "name"]
+    assert not cache.put("duplicates", cleaned)
+
+
+def test_keys_depend_on_the_backend():
+    step = PlanStep("drop_duplicates", subset=None, keep="first", partitioned=None)
+    assert step_key("source", step, "pandas") != step_key("source", step, "arrow")
+
+
+def test_results_are_only_served_to_the_backend_that_computed_them(cache):
+    df = pd.DataFrame({"a": [1.0, np.nan, 3.0]})
+    pandas_cleaner = DataCleaner(df, cache=cache, data_key="source").handle_missing_values("mean")
+    arrow_cleaner = DataCleaner(df, cache=cache, data_key="source", backend="arrow").handle_missing_values("mean")
+    assert pandas_cleaner.data_key != arrow_cleaner.data_key
+    assert pandas_cleaner.data_key in cache and arrow_cleaner.data_key in cache
+    pd.testing.assert_frame_equal(pandas_cleaner.get_cleaned_data(), arrow_cleaner.get_cleaned_data())
+
+
+def test_cached_dtype_optimization_keeps_compact_dtypes(cache):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "id": [f"row-{number}" for number in range(3000)],
+        "kind": rng.choice(["a", "b", "c"], 3000),
+        "value": rng.integers(0, 100, 3000),
+    })
+    fresh = DataCleaner(df, cache=cache, data_key="source").optimize_dtypes().get_cleaned_data()
+    cached = DataCleaner(df, cache=cache, data_key="source").optimize_dtypes().get_cleaned_data()
+    assert fresh["id"].dtype == pd.StringDtype("pyarrow")
+    pd.testing.assert_frame_equal(cached, fresh)
+    assert cached.memory_usage(deep=True).sum() == fresh.memory_usage(deep=True).sum()
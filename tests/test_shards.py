@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_cleaner import DataCleaner
+from utils.shards import SOURCE_COLUMN, fill_partitions, load_shards, map_partitions, partition_slices
+
+
+@pytest.fixture
+def files(tmp_path):
+    rng = np.random.default_rng(23)
+    frames = []
+    for number, rows in enumerate([700, 1, 1200, 350]):
+        df = pd.DataFrame({
+            "id": np.arange(rows) + 10_000 * number,
+            "value": rng.normal(size=rows).round(3),
+            "count": rng.integers(0, 9, rows).astype(float),
+            "kind": rng.choice(["a", "b", "c"], rows),
+        })
+        df.loc[df.index % 17 == 3, "value"] = np.nan
+        if number == 2:
+            df.loc[df.index % 5 == 0, "count"] = np.nan
+        frames.append(df)
+    paths = []
+    for number, df in enumerate(frames):
+        # The last file lives in a subdirectory, so files from different folders are combined too.
+        path = tmp_path / f"shard{number}" / "part.csv" if number == 3 else tmp_path / f"part{number}.csv"
+        path.parent.mkdir(exist_ok=True)
+        df.to_csv(path, index=False)
+        paths.append(str(path))
+    return paths, frames
+
+
+def test_shards_load_as_the_concatenated_files(files):
+    paths, frames = files
+    df, issues = load_shards(paths, max_workers=3)
+    expected = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+    pd.testing.assert_frame_equal(df.drop(columns=SOURCE_COLUMN), expected)
+    assert df[SOURCE_COLUMN].cat.categories.tolist() == ["part0.csv", "part1.csv", "part2.csv", "part.csv"]
+    assert df[SOURCE_COLUMN].value_counts(sort=False).tolist() == [len(frame) for frame in frames]
+
+
+def test_partitions_cover_the_rows_in_order(files):
+    df, _ = load_shards(files[0])
+    slices = partition_slices(df[SOURCE_COLUMN], max_rows=300)
+    assert max(part.stop - part.start for part in slices) <= 300
+    assert [part.start for part in slices[1:]] == [part.stop for part in slices[:-1]]
+    assert slices[0].start == 0 and slices[-1].stop == len(df)
+    sums = map_partitions(lambda part: part["value"].sum(), df, slices, max_workers=4)
+    assert sum(sums) == pytest.approx(df["value"].sum())
+    values = {"value": 0.5, "count": -1.0, "kind": "z"}
+    pd.testing.assert_frame_equal(fill_partitions(df, values, slices, max_workers=4), df.fillna(values))
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_sharded_cleaning_matches_unsharded_cleaning(files, lazy):
+    df, _ = load_shards(files[0])
+
+    def clean(partition_by):
+        cleaner = DataCleaner(df, lazy=lazy, partition_by=partition_by)
+        cleaner.handle_missing_values("mean", columns=["value"]).impute({"count": ("fill", 0)})
+        cleaner.remove_outliers(["value"]).handle_missing_values("drop").drop_duplicates(["kind", "count"])
+        return cleaner.get_cleaned_data()
+
+    pd.testing.assert_frame_equal(clean(SOURCE_COLUMN), clean(None))
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+from utils.type_inference import NUMERIC_PATTERNS, infer_column_type, infer_types
+
+
+@pytest.mark.parametrize("text", ["+", "-", "e5", ".", "%", "$", "()", ""])
+def test_values_without_digits_are_not_numbers(text):
+    assert not any(pd.Series([text]).str.fullmatch(pattern).iloc[0] for pattern in NUMERIC_PATTERNS.values())
+
+
+@pytest.mark.parametrize("text, kind", [
+    ("1,200", "number"), ("-3.5", "number"), (".5", "number"), ("1e5", "number"), ("12%", "percent"),
+    ("$1,200.50", "currency"), ("(1,200)", "currency"),
+])
+def test_numbers_are_recognized(text, kind):
+    assert infer_column_type(pd.Series([text] * 10))[0] == kind
+
+
+def test_signs_alone_do_not_make_a_numeric_column():
+    df = pd.DataFrame({"flag": ["+", "-", "+", "-", "e5"] * 20})
+    converted, report = infer_types(df)
+    assert report.empty
+    pd.testing.assert_frame_equal(converted, df)
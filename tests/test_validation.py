@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_cleaner import DataCleaner
+from utils.result_cache import ResultCache
+from utils.validation import compile_rules, validate
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "a": [1.0, 5.0, np.nan, 12.0, 3.0],
+        "b": ["x1", "y2", "zz", None, "x1"],
+        "c": [2.0, 4.0, 1.0, 20.0, 1.0],
+        "d": pd.to_datetime(["2020-01-01", "2021-06-01", None, "2019-12-31", "2020-03-03"]),
+    })
+
+
+RULES = [
+    {"rule": "not_null", "column": "a"},
+    {"rule": "range", "column": "a", "min": 0, "max": 10},
+    {"rule": "regex", "column": "b", "pattern": r"[a-z]\d"},
+    {"rule": "allowed", "column": "b", "values": ["x1", "y2"]},
+    {"rule": "unique", "column": "b"},
+    {"rule": "compare", "column": "a", "op": "<=", "other": "c"},
+    {"rule": "range", "column": "d", "min": "2020-01-01"},
+    {"rule": "range", "column": "b", "max": "y"},
+]
+
+
+def test_rules_flag_the_violating_rows(frame):
+    report = validate(frame, RULES)
+    rows = {name: report.rows(name).tolist() for name in report.summary.index}
+    assert list(rows.values()) == [[2], [3], [2], [2], [0, 4], [1, 4], [3], [1, 2]]
+    assert not report.passed
+
+
+@pytest.mark.parametrize("bound", ["min", "max"])
+def test_numeric_bounds_on_text_columns_are_rejected(frame, bound):
+    with pytest.raises(ValueError, match="'b' is not numeric"):
+        compile_rules([{"rule": "range", "column": "b", bound: 0}], frame.dtypes)
+    with pytest.raises(ValueError, match="'b' is not numeric"):
+        DataCleaner(frame).validate([{"rule": "range", "column": "b", bound: 0}])
+
+
+def test_text_bounds_on_numeric_columns_are_rejected(frame):
+    with pytest.raises(ValueError, match="'a' is numeric"):
+        validate(frame, [{"rule": "range", "column": "a", "min": "zero"}])
+
+
+def test_cached_validation_matches(frame, tmp_path):
+    cache = ResultCache(directory=str(tmp_path))
+    fresh = DataCleaner(frame, cache=cache, data_key="source").validate(RULES)
+    cached = DataCleaner(frame, cache=cache, data_key="source").validate(RULES)
+    pd.testing.assert_frame_equal(cached.summary, fresh.summary)
@@ -0,0 +1,86 @@
+import pandas as pd
+
+from utils.cleaning_plan import PlanStep
+from utils.csv_loader import load_csv_tail
+from utils.data_cleaner import DataCleaner
+from utils.dataset_store import SessionDataset
+from utils.incremental import FileFingerprint, append_rows
+from utils.result_cache import content_hash, step_key
+
+
+def _loaded_rows(dataset, fingerprint, store=None, cache=None):
+    """
+    Return the rows loaded from the fingerprinted file, before any cleaning, or None if they are gone.
+    """
+    initial = dataset.history.versions[0]
+    if initial.key == fingerprint.key:
+        return initial.to_frame()
+    for source in (store, cache):
+        if source is not None:
+            df = source.get(fingerprint.key) if source is cache else source.load(fingerprint.key)
+            if df is not None:
+                return df
+    return None
+
+
+def load_append(dataset, data, fingerprint, backend="pandas", store=None, cache=None):
+    """
+    Load a re-uploaded CSV file that only has rows appended, without re-reading or re-cleaning the old rows.
+
+    Only the bytes after the fingerprinted content are parsed. If every cleaning
+    step recorded since the file was loaded can be replayed incrementally (see
+    DataCleaner.replay), only the new rows are cleaned, with statistics merged
+    from the old and new rows, and appended to the cleaned data. Otherwise the
+    recorded steps are re-run on all the rows. If the steps are not known, only
+    the loaded data is kept.
+
+    Parameters:
+    dataset (SessionDataset): The session's data, loaded from the fingerprinted file.
+    data (bytes): The content of the new upload.
+    fingerprint (FileFingerprint): The fingerprint of the file the data was loaded from.
+    backend (str): The DataCleaner backend the steps are replayed with.
+    store (DatasetStore): If given, the new data is tracked by the store.
+    cache (ResultCache): If given, the new loaded data is cached under its content key.
+
+    Returns:
+    tuple: The new SessionDataset, the new file's FileFingerprint and a description of what was done;
+    or None if the upload is not an append to the file, and has to be loaded from scratch.
+    """
+    offset = fingerprint.append_offset(data)
+    if offset is None:
+        return None
+    loaded = _loaded_rows(dataset, fingerprint, store=store, cache=cache)
+    if loaded is None or len(loaded) != fingerprint.rows:
+        return None
+    tail = load_csv_tail(memoryview(data)[offset:], loaded.iloc[:0], start=fingerprint.rows)
+    if tail is None:
+        return None
+    key = content_hash(data)
+    raw = pd.concat([loaded, tail])
+    if cache is not None:
+        cache.put(key, raw)
+    log = dataset.history.replay_log()
+    appended = SessionDataset(raw, key, store=store)
+    rows = f"{len(tail):,} appended rows"
+
+    if log is None:
+        message = f"Loaded {rows}; the cleaning steps are not known, so they were not re-applied"
+    elif not log:
+        message = f"Loaded {rows}"
+    elif all(entry.incremental for entry in log):
+        worker = DataCleaner(tail, backend=backend)
+        replayed = worker.replay(log)
+        cleaned = append_rows(dataset.df, worker.get_cleaned_data())
+        cleaned_key = step_key(dataset.history.current.key, PlanStep("append_rows", key=key), backend)
+        label = f"Appended {len(tail):,} rows, replaying {len(log)} steps"
+        appended.history.record(cleaned, label, key=cleaned_key, steps=replayed)
+        message = f"Loaded and cleaned {rows}"
+    else:
+        worker = DataCleaner(raw, lazy=True, backend=backend, cache=cache, data_key=key, track_replay=True)
+        for entry in log:
+            getattr(worker, entry.step.name)(**entry.step.params)
+        cleaned = worker.get_cleaned_data()
+        label = f"Re-applied {len(log)} steps"
+        appended.history.record(cleaned, label, key=worker.data_key, steps=worker.replay_log)
+        message = f"Loaded {rows} and re-applied {len(log)} cleaning steps to all rows"
+    return appended, FileFingerprint(data, len(raw)), message
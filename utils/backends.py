@@ -0,0 +1,352 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils.dedup import drop_duplicates_partitioned
+from utils.imputation import (
+    impute_columns, resolve_plan, mode_value, columns_of_dtype, dense_columns, arrow_fill_kind, coerce_fill_value,
+)
+from utils.near_dedup import near_duplicate_roots
+from utils.outliers import iqr_bounds, outlier_mask
+from utils.result_cache import pandas_types
+from utils.shards import map_partitions, partition_slices
+
+
+class PandasBackend:
+    """
+    Runs DataCleaner operations on a NumPy-backed pandas DataFrame.
+    """
+
+    name = "pandas"
+
+    def from_pandas(self, df):
+        return df.copy(deep=False)
+
+    def to_pandas(self, data):
+        return data
+
+    def schema(self, data):
+        """
+        Return an empty DataFrame with the columns and dtypes of the data.
+        """
+        return data.iloc[:0]
+
+    def num_rows(self, data):
+        return len(data)
+
+    def null_count(self, data):
+        return int(data.isna().sum().sum())
+
+    def rename_columns(self, data, names):
+        return data.set_axis(names, axis=1)
+
+    def drop_columns(self, data, columns):
+        return data.drop(columns=columns)
+
+    def not_null_mask(self, data, columns=None):
+        target = data if columns is None else data[columns]
+        return target.notna().all(axis=1).to_numpy()
+
+    def iqr_bounds(self, data, columns, rows=None):
+        return iqr_bounds(data, columns, rows=rows)
+
+    def outlier_mask(self, data, bounds):
+        return outlier_mask(data, bounds)
+
+    def near_duplicate_roots(self, data, columns, threshold, num_perm, rows=None):
+        values = [data[col] if rows is None else data[col][rows] for col in columns]
+        return near_duplicate_roots(values, threshold, num_perm)
+
+    def filter(self, data, mask):
+        return data[mask]
+
+    def impute(self, data, plan, max_workers=None):
+        return impute_columns(data, plan, max_workers=max_workers)
+
+    def drop_duplicates(self, data, subset, keep, partitioned):
+        if partitioned:
+            return drop_duplicates_partitioned(data, subset=subset, keep=keep)
+        return data.drop_duplicates(subset=subset, keep=keep)
+
+
+class PartitionedPandasBackend(PandasBackend):
+    """
+    Runs DataCleaner operations on a pandas DataFrame split into partitions, e.g. by source file.
+
+    Partitions are the runs of equal values of a partition column, see
+    shards.partition_slices. Operations that look at one row at a time (the
+    missing-value and outlier masks and the fills of an imputation) run on every
+    partition in parallel on a thread pool; statistics such as outlier bounds and
+    fill values are still computed over all rows, so the results equal those of
+    PandasBackend. If the partition column is dropped, everything runs unsplit.
+    """
+
+    def __init__(self, partition_by, max_workers=None, max_rows=None):
+        """
+        Parameters:
+        partition_by (str): The partition column.
+        max_workers (int): The thread pool size. If None, the executor default is used.
+        max_rows (int): If given, partitions are split further into slices of at most this many rows.
+        """
+        self.partition_by = partition_by
+        self.max_workers = max_workers
+        self.max_rows = max_rows
+
+    def _partitions(self, data):
+        if self.partition_by not in data.columns:
+            return None
+        return partition_slices(data[self.partition_by], max_rows=self.max_rows)
+
+    def not_null_mask(self, data, columns=None):
+        target = data if columns is None else data[columns]
+        partitions = self._partitions(data)
+        if not partitions:
+            return super().not_null_mask(target)
+        masks = map_partitions(super().not_null_mask, target, partitions, max_workers=self.max_workers)
+        return np.concatenate(masks)
+
+    def outlier_mask(self, data, bounds):
+        partitions = self._partitions(data)
+        if not partitions:
+            return super().outlier_mask(data, bounds)
+        parts = map_partitions(lambda part: outlier_mask(part, bounds), data, partitions, max_workers=self.max_workers)
+        keep = np.concatenate([mask for mask, _ in parts])
+        counts = sum((counts for _, counts in parts[1:]), parts[0][1])
+        return keep, counts
+
+    def impute(self, data, plan, max_workers=None):
+        return impute_columns(data, plan, max_workers=max_workers, partitions=self._partitions(data))
+
+
+class ArrowFrame:
+    """
+    A pyarrow Table together with the pandas index and column labels it stands for.
+
+    Arrow only allows string column names and has no row index, so both are kept
+    here and reattached when converting back to pandas.
+    """
+
+    def __init__(self, table, index, columns):
+        self.table = table
+        self.index = index
+        self.columns = columns
+
+    def positions(self, columns):
+        """
+        Return the table positions of the given column labels.
+        """
+        return [self.columns.get_loc(col) for col in columns]
+
+
+class ArrowBackend:
+    """
+    Runs DataCleaner operations on a pyarrow Table using pyarrow.compute kernels.
+
+    Missing values are Arrow nulls, string columns are stored as Arrow strings
+    instead of Python objects, and per-column kernels run on a thread pool since
+    they release the GIL. Results match the pandas backend.
+    """
+
+    name = "arrow"
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+
+    def from_pandas(self, df):
+        # Arrow has no sparse arrays; its validity bitmaps already store missing values compactly.
+        try:
+            table = pa.Table.from_pandas(dense_columns(df), preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as error:
+            # e.g. an object column mixing numbers and text, which has no single Arrow type
+            reason = "; ".join(map(str, error.args))
+            raise TypeError(f"The arrow backend cannot store this data: {reason}.") from error
+        return ArrowFrame(table, df.index, df.columns)
+
+    def to_pandas(self, data):
+        # Arrow-backed strings, e.g. from optimize_dtypes, stay Arrow-backed.
+        df = data.table.to_pandas(types_mapper=pandas_types)
+        # Arrow types an object column of booleans as bool; once it has no nulls left it would come back
+        # as a bool column, where pandas keeps it object.
+        metadata = data.table.schema.pandas_metadata or {}
+        object_bools = {
+            column["field_name"] for column in metadata.get("columns", [])
+            if column["pandas_type"] == "bool" and column["numpy_type"] == "object"
+        }
+        for position, field in enumerate(data.table.schema):
+            if field.name in object_bools and pa.types.is_boolean(field.type):
+                df.isetitem(position, df.iloc[:, position].astype(object))
+        df.columns = data.columns
+        df.index = data.index
+        return df
+
+    def schema(self, data):
+        df = data.table.schema.empty_table().to_pandas(types_mapper=pandas_types)
+        df.columns = data.columns
+        return df
+
+    def num_rows(self, data):
+        return data.table.num_rows
+
+    def null_count(self, data):
+        return sum(column.null_count for column in data.table.columns)
+
+    def rename_columns(self, data, names):
+        return ArrowFrame(data.table, data.index, pd.Index(names))
+
+    def drop_columns(self, data, columns):
+        table = data.table
+        for position in sorted(data.positions(columns), reverse=True):
+            table = table.remove_column(position)
+        return ArrowFrame(table, data.index, data.columns.drop(columns))
+
+    def _map_columns(self, function, items):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(function, items))
+
+    def not_null_mask(self, data, columns=None):
+        positions = range(data.table.num_columns) if columns is None else data.positions(columns)
+        mask = np.ones(data.table.num_rows, dtype=bool)
+        for position in positions:
+            column = data.table.column(position)
+            if column.null_count:
+                mask &= pc.is_valid(column).to_numpy(zero_copy_only=False)
+        return mask
+
+    def iqr_bounds(self, data, columns, rows=None):
+        selection = None if rows is None or rows.all() else pa.array(rows)
+
+        def quartiles(position):
+            column = data.table.column(position)
+            if selection is not None:
+                column = pc.filter(column, selection)
+            values = pc.quantile(column, q=[0.25, 0.75], interpolation="linear")
+            return values.to_numpy(zero_copy_only=False)
+
+        quartiles = np.array(self._map_columns(quartiles, data.positions(columns)), dtype="float64")
+        bounds = pd.DataFrame(quartiles.reshape(-1, 2), index=pd.Index(columns), columns=["Q1", "Q3"])
+        iqr = bounds["Q3"] - bounds["Q1"]
+        bounds["lower"] = bounds["Q1"] - 1.5 * iqr
+        bounds["upper"] = bounds["Q3"] + 1.5 * iqr
+        return bounds
+
+    def outlier_mask(self, data, bounds):
+        def outside(item):
+            position, lower, upper = item
+            column = data.table.column(position)
+            result = pc.or_(pc.less(column, lower), pc.greater(column, upper))
+            return pc.fill_null(result, False).to_numpy(zero_copy_only=False)
+
+        items = zip(data.positions(bounds.index), bounds["lower"].tolist(), bounds["upper"].tolist())
+        keep = np.ones(data.table.num_rows, dtype=bool)
+        counts = {}
+        for col, outside_mask in zip(bounds.index, self._map_columns(outside, items)):
+            counts[col] = int(outside_mask.sum())
+            keep &= ~outside_mask
+        return keep, pd.Series(counts, dtype="int64")
+
+    def near_duplicate_roots(self, data, columns, threshold, num_perm, rows=None):
+        selection = None if rows is None or rows.all() else pa.array(rows)
+        values = [data.table.column(position) for position in data.positions(columns)]
+        if selection is not None:
+            values = [pc.filter(column, selection) for column in values]
+        return near_duplicate_roots(values, threshold, num_perm, max_workers=self.max_workers)
+
+    def filter(self, data, mask):
+        return ArrowFrame(data.table.filter(pa.array(mask)), data.index[mask], data.columns)
+
+    def _fill_value(self, col, column, strategy, fill_value):
+        """
+        Compute the value a column's nulls are filled with.
+        """
+        if strategy == "fill":
+            return coerce_fill_value(col, arrow_fill_kind(column.type), fill_value)
+        numeric = pa.types.is_integer(column.type) or pa.types.is_floating(column.type)
+        countable = numeric or pa.types.is_string(column.type) or pa.types.is_large_string(column.type)
+        if not (numeric or (strategy == "mode" and countable)):
+            # Temporal, boolean and dictionary columns are rare enough to go through pandas.
+            series = column.to_pandas()
+            return mode_value(series) if strategy == "mode" else getattr(series, strategy)()
+        if strategy == "mean":
+            return pc.mean(column).as_py()
+        if strategy == "median":
+            return pc.quantile(column, q=0.5, interpolation="linear")[0].as_py()
+        counts = pc.value_counts(pc.drop_null(column))
+        if len(counts) == 0:
+            return None
+        values, frequencies = counts.field("values"), counts.field("counts")
+        return pc.min(pc.filter(values, pc.equal(frequencies, pc.max(frequencies)))).as_py()
+
+    def impute(self, data, plan, max_workers=None):
+        resolved = resolve_plan(self.schema(data), plan)
+        positions = dict(zip(resolved, data.positions(resolved)))
+        resolved = {col: entry for col, entry in resolved.items() if data.table.column(positions[col]).null_count}
+        averageable = set(columns_of_dtype(self.schema(data), [np.number, "datetime", "timedelta"]))
+        invalid = [col for col, (strategy, _) in resolved.items() if strategy in ("mean", "median") and col not in averageable]
+        if invalid:
+            raise ValueError(f"Cannot compute the mean or median of non-numeric columns: {invalid}")
+
+        def fill(item):
+            col, (strategy, fill_value) = item
+            column = data.table.column(positions[col])
+            value = self._fill_value(col, column, strategy, fill_value)
+            if value is None or (np.isscalar(value) and pd.isna(value)):
+                return None
+            if pa.types.is_dictionary(column.type):
+                return fill_categories(col, column, value)
+            return pc.fill_null(column, fill_scalar(col, column.type, value))
+
+        def fill_scalar(col, arrow_type, value):
+            try:
+                try:
+                    return pa.scalar(value, type=arrow_type)
+                except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+                    return pa.scalar(value).cast(arrow_type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as error:
+                raise TypeError(f"Cannot fill column {col!r} of type {arrow_type} with {value!r}.") from error
+
+        def fill_categories(col, column, value):
+            # Fill the indices, adding the value as the last category if it is new, so the
+            # categories keep their order, as they do on the pandas backend.
+            array = column.combine_chunks()
+            dictionary = array.dictionary
+            scalar = fill_scalar(col, dictionary.type, value)
+            position = pc.index(dictionary, scalar).as_py()
+            if position == -1:
+                position = len(dictionary)
+                dictionary = pa.concat_arrays([dictionary, pa.array([scalar.as_py()], dictionary.type)])
+            index_type = array.indices.type
+            if position > np.iinfo(index_type.to_pandas_dtype()).max:
+                index_type = pa.int32()
+            indices = pc.fill_null(array.indices.cast(index_type), pa.scalar(position, index_type))
+            return pa.DictionaryArray.from_arrays(indices, dictionary, ordered=array.type.ordered)
+
+        table = data.table
+        filled = self._map_columns(fill, resolved.items())
+        for col, column in zip(resolved, filled):
+            if column is not None:
+                field = table.schema.field(positions[col]).with_type(column.type)
+                table = table.set_column(positions[col], field, column)
+        return ArrowFrame(table, data.index, data.columns)
+
+    def drop_duplicates(self, data, subset, keep, partitioned):
+        # Arrow's hash aggregation is already multithreaded, so partitioned is not needed here.
+        positions = range(data.table.num_columns) if subset is None else data.positions(subset)
+        keys = {f"key_{number}": data.table.column(position) for number, position in enumerate(positions)}
+        keys["row"] = pa.array(np.arange(data.table.num_rows))
+        groups = pa.table(keys).group_by([name for name in keys if name != "row"], use_threads=False).aggregate(
+            [("row", "min"), ("row", "max"), ("row", "count")]
+        )
+        if keep == "first":
+            rows = groups.column("row_min")
+        elif keep == "last":
+            rows = groups.column("row_max")
+        else:
+            rows = pc.filter(groups.column("row_min"), pc.equal(groups.column("row_count"), 1))
+        rows = np.sort(rows.to_numpy())
+        return ArrowFrame(data.table.take(rows), data.index.take(rows), data.columns)
+
+
+BACKENDS = {"pandas": PandasBackend, "arrow": ArrowBackend}
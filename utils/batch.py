@@ -0,0 +1,194 @@
+import glob
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.csv_loader import load_csv
+from utils.data_cleaner import DataCleaner
+from utils.export import EXPORT_FORMATS, write_export
+
+PIPELINE_OPS = (
+    "standardize_columns", "drop_columns", "handle_missing_values", "impute", "drop_duplicates",
+    "drop_near_duplicates", "remove_outliers", "infer_types", "optimize_dtypes",
+)
+OUTPUT_FORMATS = tuple(EXPORT_FORMATS)
+OUTPUT_CHUNK_ROWS = 100_000
+
+
+def load_spec(source):
+    """
+    Load and validate a pipeline spec.
+
+    A spec is a JSON object with an optional 'backend' ('pandas' or 'arrow') and a
+    'steps' list. Each step names a DataCleaner method under 'op', and the other
+    keys are its arguments, e.g. {"op": "drop_duplicates", "subset": ["id"]}.
+    Imputation fills are written as ["fill", value]. An optional 'rules' list of
+    validation rules (see validation.ValidationRule) is checked on the cleaned data.
+
+    Parameters:
+    source (str or dict): A path to a JSON file, or the spec itself.
+
+    Returns:
+    dict: The spec.
+    """
+    if isinstance(source, dict):
+        spec = source
+    else:
+        with open(source) as handle:
+            spec = json.load(handle)
+    if not isinstance(spec.get("steps"), list):
+        raise ValueError("A pipeline spec needs a 'steps' list.")
+    for number, step in enumerate(spec["steps"], start=1):
+        if step.get("op") not in PIPELINE_OPS:
+            raise ValueError(f"Step {number}: unknown op {step.get('op')!r}. Options are {', '.join(PIPELINE_OPS)}.")
+    if not isinstance(spec.get("rules", []), list):
+        raise ValueError("The 'rules' of a pipeline spec must be a list.")
+    return spec
+
+
+def apply_spec(cleaner, spec):
+    """
+    Record the steps of a spec on a DataCleaner.
+
+    Returns:
+    DataCleaner: The cleaner.
+    """
+    for step in spec["steps"]:
+        params = {key: value for key, value in step.items() if key != "op"}
+        getattr(cleaner, step["op"])(**params)
+    return cleaner
+
+
+def glob_root(pattern):
+    """
+    Return the directory a glob pattern searches from: its leading path components without wildcards.
+    """
+    parts = pattern.replace(os.sep, "/").split("/")[:-1]
+    root = []
+    for part in parts:
+        if any(char in part for char in "*?["):
+            break
+        root.append(part)
+    return "/".join(root) or ("/" if pattern.startswith("/") else ".")
+
+
+def output_path(path, output_dir, output_format, root=None):
+    """
+    Return where the cleaned version of a file is written.
+
+    The file keeps its path relative to root under output_dir, so files of the
+    same name in different subdirectories do not overwrite each other.
+
+    Parameters:
+    path (str): The input file.
+    output_dir (str): Where the cleaned files are written.
+    output_format (str): One of OUTPUT_FORMATS.
+    root (str): The directory the inputs were found in, see glob_root. If None, only the file name is kept.
+    """
+    relative = os.path.basename(path) if root is None else os.path.relpath(path, root)
+    stem = os.path.splitext(relative)[0]
+    return os.path.join(output_dir, f"{stem}.cleaned.{output_format}")
+
+
+def write_output(df, path, output_format, chunk_rows=OUTPUT_CHUNK_ROWS):
+    """
+    Write a frame to a file in one of OUTPUT_FORMATS a chunk of rows at a time.
+
+    A partly written file is removed if writing fails.
+    """
+    try:
+        with open(path, "wb") as handle:
+            write_export(df, handle, output_format, chunk_rows)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+def _peak_memory_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 ** 2 if sys.platform == "darwin" else 1024)
+
+
+def clean_file(path, spec, output_dir, output_format="csv", root=None):
+    """
+    Load, clean and write one CSV file.
+
+    Errors are reported in the summary instead of being raised, so one bad file
+    does not stop a batch.
+
+    Parameters:
+    path (str): The input CSV file.
+    spec (dict): The pipeline spec.
+    output_dir (str): Where the cleaned file is written.
+    output_format (str): One of OUTPUT_FORMATS.
+    root (str): The directory the input was found in, see output_path.
+
+    Returns:
+    dict: A summary with the file, rows and columns in and out, seconds, peak memory
+    in MB of the worker process, the output path, the violations of each of the
+    spec's rules, if any, and the error, if any.
+    """
+    summary = {"file": path, "rows_in": None, "rows_out": None, "columns_in": None, "columns_out": None,
+               "seconds": None, "peak_memory_mb": None, "output": None, "violations": None, "error": None}
+    start = time.perf_counter()
+    try:
+        df = load_csv(path)
+        summary["rows_in"], summary["columns_in"] = df.shape
+        cleaner = DataCleaner(df, lazy=True, backend=spec.get("backend", "pandas"))
+        del df
+        cleaned = apply_spec(cleaner, spec).get_cleaned_data()
+        summary["rows_out"], summary["columns_out"] = cleaned.shape
+        if spec.get("rules"):
+            violations = cleaner.validate(spec["rules"]).summary["violations"]
+            summary["violations"] = {name: int(count) for name, count in violations.items()}
+        destination = output_path(path, output_dir, output_format, root)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        write_output(cleaned, destination, output_format)
+        summary["output"] = destination
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    summary["peak_memory_mb"] = round(_peak_memory_mb(), 1)
+    return summary
+
+
+def run_batch(pattern, spec, output_dir, output_format="csv", max_workers=None, on_result=None):
+    """
+    Clean every file matching a glob pattern on a process pool.
+
+    Each worker process cleans a single file and then exits, so the peak memory
+    of every summary belongs to that file alone and memory is returned to the
+    system between files. Outputs keep their path relative to the pattern's
+    leading directory, e.g. drops/a/x.csv matched by 'drops/**/*.csv' is
+    written to output_dir/a/x.cleaned.csv.
+
+    Parameters:
+    pattern (str): A glob pattern for the input CSV files; '**' matches subdirectories.
+    spec (dict): The pipeline spec, see load_spec.
+    output_dir (str): Where the cleaned files are written. Created if missing.
+    output_format (str): One of OUTPUT_FORMATS.
+    max_workers (int): The number of worker processes. If None, one per CPU.
+    on_result (callable): Called with each file's summary as soon as it finishes.
+
+    Returns:
+    list: The per-file summaries, in input order.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Invalid output format. Options are {', '.join(OUTPUT_FORMATS)}.")
+    paths = sorted(glob.glob(pattern, recursive=True))
+    root = glob_root(pattern)
+    os.makedirs(output_dir, exist_ok=True)
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=max_workers, max_tasks_per_child=1) as pool:
+        futures = {pool.submit(clean_file, path, spec, output_dir, output_format, root): path for path in paths}
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries[futures[future]] = summary
+            if on_result is not None:
+                on_result(summary)
+    return [summaries[path] for path in paths]
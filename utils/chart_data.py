@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_TOP_K = 10
+DEFAULT_MAX_POINTS = 2000
+OTHER_LABEL = "Other"
+
+
+def pie_data(counts, total=None, top_k=DEFAULT_TOP_K, other_label=OTHER_LABEL):
+    """
+    Turn value counts into pie chart input with at most top_k slices plus one "Other" slice.
+
+    Parameters:
+    counts (pd.Series): Value counts, most frequent first, e.g. from value_counts().
+    total (int): The number of non-missing values. If None, the sum of counts is used.
+    top_k (int): The number of values shown as their own slice.
+    other_label (str): The label of the slice that groups the remaining values.
+
+    Returns:
+    pd.DataFrame: 'value' and 'count' columns, at most top_k + 1 rows.
+    """
+    top = counts.head(top_k)
+    data = pd.DataFrame({"value": top.index.astype(str), "count": top.to_numpy()})
+    total = counts.sum() if total is None else total
+    rest = total - top.sum()
+    if rest > 0:
+        data.loc[len(data)] = [other_label, rest]
+    return data
+
+
+def _selection_values(y):
+    """
+    Return a column as floats for choosing sample points, with missing values as 0.
+    """
+    return np.nan_to_num(np.asarray(y, dtype="float64"), nan=0.0)
+
+
+def lttb_positions(y, n_out):
+    """
+    Choose the rows that best preserve the shape of a series, with Largest-Triangle-Three-Buckets.
+
+    The row position is used as the X coordinate, so any X axis works.
+
+    Parameters:
+    y (array-like): The values.
+    n_out (int): The number of points to keep, at least 3.
+
+    Returns:
+    np.ndarray: The sorted positions of the kept rows.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    y = _selection_values(y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    positions = np.empty(n_out, dtype=np.int64)
+    positions[0], positions[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], max(edges[bucket + 1], edges[bucket] + 1)
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        # The third triangle corner is the average of the next bucket.
+        next_x = (stop + next_stop - 1) / 2
+        next_y = y[stop:next_stop].mean() if next_stop > stop else y[-1]
+        xs = np.arange(start, stop)
+        areas = np.abs(
+            (previous - next_x) * (y[start:stop] - y[previous]) - (previous - xs) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        positions[bucket + 1] = previous
+    return positions
+
+
+def minmax_positions(y, n_out):
+    """
+    Choose the first and last rows, and the minimum and maximum of each of (n_out - 2) / 2 equal buckets.
+
+    Parameters:
+    y (array-like): The values.
+    n_out (int): The maximum number of points to keep, at least 4.
+
+    Returns:
+    np.ndarray: The sorted positions of the kept rows.
+    """
+    n = len(y)
+    # The first and last rows are always kept, on top of two rows per bucket.
+    buckets = (n_out - 2) // 2
+    if n_out >= n or buckets < 1:
+        return np.arange(n)
+    y = _selection_values(y)
+    size = -(-n // buckets)
+    # Rounding the size up can leave fewer buckets than asked for, none of them empty.
+    buckets = -(-n // size)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = offsets + np.nanargmin(blocks, axis=1)
+    highs = offsets + np.nanargmax(blocks, axis=1)
+    return np.unique(np.concatenate([lows, highs, [0, n - 1]]))
+
+
+def scale_for(max_value):
+    """
+    Return the divisor and column label suffix that bring a maximum into a readable range.
+    """
+    if max_value > 1e6:
+        return 1e6, " (in millions)"
+    if max_value > 1e3:
+        return 1e3, " (in thousands)"
+    return 1, ""
+
+
+def sample_positions(df, y_columns, max_points=DEFAULT_MAX_POINTS, method="lttb"):
+    """
+    Choose at most about max_points rows that preserve the shape of the given columns.
+
+    Each column picks its own sample points with its share of max_points, and
+    the union of those rows is returned.
+
+    Parameters:
+    df (pd.DataFrame): The data, in X axis order.
+    y_columns (list): The columns whose shape is preserved.
+    max_points (int): The number of rows to aim for.
+    method (str): 'lttb' (Largest-Triangle-Three-Buckets) or 'minmax' (min/max per bucket).
+
+    Returns:
+    np.ndarray: The sorted positions of the chosen rows.
+    """
+    if method not in ("lttb", "minmax"):
+        raise ValueError("method must be 'lttb' or 'minmax'.")
+    sample = lttb_positions if method == "lttb" else minmax_positions
+    share = max(max_points // max(len(y_columns), 1), 4)
+    return np.unique(np.concatenate(
+        [sample(df[col].to_numpy(), share) for col in y_columns] or [np.arange(0)]
+    ))
+
+
+def area_data(df, x, y_columns, max_points=DEFAULT_MAX_POINTS, method="lttb", maxima=None):
+    """
+    Build area plot input with a bounded number of rows, rescaling large columns.
+
+    Only the X column and the selected Y columns of the sampled rows are copied.
+
+    Parameters:
+    df (pd.DataFrame): The data, in X axis order.
+    x (str): The X axis column.
+    y_columns (list): The Y axis columns.
+    max_points (int): The maximum number of rows in the result.
+    method (str): 'lttb' (Largest-Triangle-Three-Buckets) or 'minmax' (min/max per bucket).
+    maxima (dict): The maximum of each Y column, e.g. from a ColumnStatsIndex. Computed if None.
+
+    Returns:
+    tuple: The plot DataFrame and the names of its Y columns after rescaling.
+    """
+    positions = sample_positions(df, y_columns, max_points, method)
+    data = df.iloc[positions][[x] + [col for col in y_columns if col != x]]
+    labels = []
+    for col in y_columns:
+        max_value = maxima[col] if maxima is not None else df[col].max()
+        divisor, suffix = scale_for(max_value)
+        labels.append(f"{col}{suffix}")
+        if divisor != 1:
+            data[f"{col}{suffix}"] = data[col] / divisor
+    return data, labels
@@ -0,0 +1,201 @@
+import pandas as pd
+
+from utils.imputation import DTYPE_GROUPS
+
+
+class PlanStep:
+    """
+    A single recorded DataCleaner operation: the method name and its arguments.
+    """
+
+    def __init__(self, name, **params):
+        self.name = name
+        self.params = params
+
+    def __eq__(self, other):
+        return isinstance(other, PlanStep) and (self.name, self.params) == (other.name, other.params)
+
+    def __repr__(self):
+        args = ", ".join(f"{key}={value!r}" for key, value in self.params.items())
+        return f"{self.name}({args})"
+
+
+class FilterGroup:
+    """
+    Adjacent row filters fused into one step, evaluated as a single boolean mask.
+    """
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+
+    def __eq__(self, other):
+        return isinstance(other, FilterGroup) and self.steps == other.steps
+
+    def __repr__(self):
+        return "filter[" + " & ".join(repr(step) for step in self.steps) + "]"
+
+
+def is_filter(step):
+    """
+    Return True if the step only removes rows and never changes values.
+    """
+    if step.name in ("remove_outliers", "drop_near_duplicates"):
+        return True
+    return step.name == "handle_missing_values" and step.params.get("strategy") == "drop"
+
+
+def is_imputation(step):
+    """
+    Return True if the step fills missing values in place.
+    """
+    if step.name == "impute":
+        return True
+    return step.name == "handle_missing_values" and step.params.get("strategy") != "drop"
+
+
+def _is_constant_fill(step):
+    """
+    Return True if the imputation fills every column with a fixed value.
+    """
+    if step.name == "impute":
+        return all(isinstance(value, (tuple, list)) and value[0] == "fill" for value in step.params["plan"].values())
+    return step.params.get("strategy") == "fill"
+
+
+def _columns_read(step):
+    """
+    Return the columns a filter inspects, or None if it may inspect any column.
+    """
+    columns = step.params.get("columns")
+    return None if columns is None else set(columns)
+
+
+def _columns_written(step):
+    """
+    Return the columns an imputation writes, or None if it may write any column.
+    """
+    if step.name == "impute":
+        keys = set(step.params["plan"])
+        return None if keys & set(DTYPE_GROUPS) else keys
+    columns = step.params.get("columns")
+    return None if columns is None else set(columns)
+
+
+def _clears_missing(step):
+    """
+    Return True if no missing values can remain anywhere after the step.
+    """
+    if step.name != "handle_missing_values" or step.params.get("columns") is not None:
+        return False
+    strategy = step.params.get("strategy")
+    fill_value = step.params.get("fill_value")
+    return strategy == "drop" or (strategy == "fill" and fill_value is not None and not pd.isna(fill_value))
+
+
+def _introduces_missing(step):
+    """
+    Return True if the step can turn values into missing values, e.g. type inference on unparseable text.
+    """
+    return step.name == "infer_types"
+
+
+def _is_noop(step, previous, missing_cleared):
+    """
+    Return True if the step cannot change the data given the steps before it.
+    """
+    if step.name == "impute" and (missing_cleared or not step.params["plan"]):
+        return True
+    if step.name == "handle_missing_values":
+        if missing_cleared:
+            return True
+        if step.params.get("strategy") == "fill" and step.params.get("fill_value") is None:
+            return True
+    if step.name in ("remove_outliers", "drop_near_duplicates") and step.params.get("columns") is not None:
+        if len(step.params["columns"]) == 0:
+            return True
+    # Renaming, de-duplication, dtype compaction and type inference are idempotent when repeated back to back.
+    if step.name in ("drop_duplicates", "optimize_dtypes", "infer_types") and step == previous:
+        return True
+    if step.name == "standardize_columns" and step == previous:
+        replace = step.params.get("replace")
+        replacement = step.params.get("replacement") or ""
+        return not replace or (replace not in replacement and replacement == replacement.strip())
+    return False
+
+
+def _commutes(filter_step, imputation):
+    """
+    Return True if running the filter before the imputation gives the same result.
+
+    Only constant fills qualify: mean, median and mode depend on which rows are
+    present. The filter must also not read any column the fill writes.
+    """
+    if not _is_constant_fill(imputation):
+        return False
+    read = _columns_read(filter_step)
+    written = _columns_written(imputation)
+    return read is not None and written is not None and not (read & written)
+
+
+def optimize_plan(steps):
+    """
+    Rewrite a recorded plan into an equivalent plan that makes fewer passes over the data.
+
+    The optimizer drops steps that cannot change the data, moves row filters
+    ahead of constant fills they commute with so fewer rows are filled, and fuses
+    runs of adjacent row filters into a single FilterGroup.
+
+    Parameters:
+    steps (list): The recorded PlanStep objects, in call order.
+
+    Returns:
+    list: The optimized steps, a mix of PlanStep and FilterGroup objects.
+    """
+    # 1. Skip steps that do nothing.
+    kept = []
+    missing_cleared = False
+    for step in steps:
+        if _is_noop(step, kept[-1] if kept else None, missing_cleared):
+            continue
+        kept.append(step)
+        missing_cleared = (missing_cleared or _clears_missing(step)) and not _introduces_missing(step)
+
+    # 2. Push filters ahead of the imputations they commute with.
+    reordered = []
+    for step in kept:
+        position = len(reordered)
+        if is_filter(step):
+            while position > 0 and is_imputation(reordered[position - 1]) and _commutes(step, reordered[position - 1]):
+                position -= 1
+        reordered.insert(position, step)
+
+    # 3. Fuse adjacent filters into one mask.
+    optimized = []
+    for step in reordered:
+        if is_filter(step):
+            if optimized and isinstance(optimized[-1], FilterGroup):
+                optimized[-1].steps.append(step)
+            else:
+                optimized.append(FilterGroup([step]))
+        else:
+            optimized.append(step)
+    return optimized
+
+
+def format_plan(steps, optimized=None):
+    """
+    Render a plan, and optionally its optimized form, as readable text.
+
+    Parameters:
+    steps (list): The recorded steps.
+    optimized (list): The optimized steps, if they should be shown as well.
+
+    Returns:
+    str: One numbered line per step.
+    """
+    lines = ["Recorded plan:"]
+    lines += [f"  {number}. {step!r}" for number, step in enumerate(steps, start=1)] or ["  (empty)"]
+    if optimized is not None:
+        lines.append(f"Optimized plan ({len(optimized)} pass{'es' if len(optimized) != 1 else ''}):")
+        lines += [f"  {number}. {step!r}" for number, step in enumerate(optimized, start=1)] or ["  (empty)"]
+    return "\n".join(lines)
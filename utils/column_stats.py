@@ -0,0 +1,231 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from utils.history import _same_data
+from utils.quantile_sketch import sketch_series
+
+TOP_VALUES = 10
+# The median of numeric columns at least this long is estimated with a quantile sketch.
+APPROX_QUANTILE_ROWS = 10_000_000
+ORDERED_KINDS = ("numeric", "bool", "datetime", "timedelta")
+
+
+def dtype_kind(dtype):
+    """
+    Classify a dtype as 'numeric', 'bool', 'datetime', 'timedelta', 'category' or 'object'.
+    """
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        return "timedelta"
+    if isinstance(dtype, pd.CategoricalDtype):
+        return "category"
+    return "object"
+
+
+class ColumnStats:
+    """
+    Summary statistics of one column.
+
+    Counts, sum, min/max and monotonicity are computed up front. Median,
+    cardinality and top values are computed on first use and then cached.
+    The median of a numeric column of APPROX_QUANTILE_ROWS rows or more is
+    estimated from a KLL sketch built a chunk at a time, rather than from a
+    full copy of the column.
+    """
+
+    def __init__(self, series):
+        self.series = series
+        self.dtype = series.dtype
+        self.kind = dtype_kind(series.dtype)
+        self.count = int(series.count())
+        self.null_count = len(series) - self.count
+        self.sum = series.sum() if self.kind == "numeric" else None
+        self.min = self.max = np.nan
+        if self.kind in ORDERED_KINDS and self.count:
+            self.min, self.max = series.min(), series.max()
+        self.is_monotonic = series.is_monotonic_increasing
+        self._median = None
+        self._cardinality = None
+        self._top_values = None
+
+    @property
+    def mean(self):
+        if self.kind != "numeric" or not self.count:
+            return np.nan
+        return self.sum / self.count
+
+    @property
+    def median(self):
+        if self._median is None:
+            series = self.series
+            if self.kind == "numeric" and len(series) >= APPROX_QUANTILE_ROWS:
+                self._median = sketch_series(series).quantile(0.5)
+                return self._median
+            if isinstance(series.dtype, pd.SparseDtype):
+                series = series.sparse.to_dense()
+            self._median = series.median() if self.kind in ("numeric", "datetime", "timedelta") else np.nan
+        return self._median
+
+    @property
+    def cardinality(self):
+        if self._cardinality is None:
+            self._cardinality = int(self.series.nunique())
+        return self._cardinality
+
+    @property
+    def top_values(self):
+        if self._top_values is None:
+            self._top_values = self.series.value_counts().head(TOP_VALUES)
+        return self._top_values
+
+    def without_rows(self, series, removed):
+        """
+        Return the statistics after rows were filtered out, without a full recompute.
+
+        Parameters:
+        series (pd.Series): The column after the filter.
+        removed (pd.Series): The values of the rows that were removed.
+
+        Returns:
+        ColumnStats: The updated statistics. This object is left unchanged.
+        """
+        stats = copy.copy(self)
+        stats._remove_rows(series, removed)
+        return stats
+
+    def _remove_rows(self, series, removed):
+        removed_count = int(removed.count())
+        self.count -= removed_count
+        self.null_count -= len(removed) - removed_count
+        if self.kind == "numeric":
+            self.sum -= removed.sum()
+        if self.kind in ORDERED_KINDS and removed_count:
+            # Min and max only need a rescan if the removed rows held one of them.
+            if not self.count:
+                self.min = self.max = np.nan
+            elif removed.min() <= self.min or removed.max() >= self.max:
+                self.min, self.max = series.min(), series.max()
+        if not self.is_monotonic:
+            # Any subsequence of an increasing column is increasing; otherwise recheck.
+            self.is_monotonic = series.is_monotonic_increasing
+        self.series = series
+        self._median = self._cardinality = self._top_values = None
+
+
+class ColumnStatsIndex:
+    """
+    Per-column statistics of a DataFrame, kept for one data version at a time.
+
+    sync() recomputes only the columns whose data changed since the last version,
+    and remove_rows() updates every column incrementally after a row filter, so
+    reading statistics never needs a pass over the data.
+    """
+
+    def __init__(self, df=None, version=None):
+        """
+        Initialize the index, optionally building it for a DataFrame.
+
+        Parameters:
+        df (pd.DataFrame): The data to index.
+        version (str): An identifier of the data version, e.g. its content key.
+        """
+        self.version = None
+        self.index = None
+        self.stats = {}
+        if df is not None:
+            self.sync(df, version)
+
+    def __getitem__(self, column):
+        return self.stats[column]
+
+    def sync(self, df, version):
+        """
+        Bring the index up to date with a new version of the data.
+
+        Columns backed by the same data as before keep their statistics.
+
+        Parameters:
+        df (pd.DataFrame): The new version of the data.
+        version (str): Its identifier.
+        """
+        same_index = self.index is not None and (df.index is self.index or df.index.equals(self.index))
+        stats = {}
+        for position, name in enumerate(df.columns):
+            series = df.iloc[:, position]
+            old = self.stats.get(name)
+            if same_index and old is not None and _same_data(old.series, series):
+                stats[name] = old
+            else:
+                stats[name] = ColumnStats(series)
+        self.stats = stats
+        self.index = df.index
+        self.version = version
+
+    def remove_rows(self, df, keep, version):
+        """
+        Update the index after a row filter that kept only some rows and changed no values.
+
+        Parameters:
+        df (pd.DataFrame): The filtered data.
+        keep (np.ndarray): Boolean mask over the previous rows of the rows that were kept.
+        version (str): The identifier of the filtered data.
+        """
+        stats = {}
+        for position, name in enumerate(df.columns):
+            old = self.stats.get(name)
+            if old is None:
+                stats[name] = ColumnStats(df.iloc[:, position])
+            else:
+                stats[name] = old.without_rows(df.iloc[:, position], old.series[~keep])
+        self.stats = stats
+        self.index = df.index
+        self.version = version
+
+    def clear(self):
+        """
+        Drop every statistic, e.g. to release the columns they reference; the next sync() rebuilds them.
+        """
+        self.stats = {}
+        self.index = None
+        self.version = None
+
+    def snapshot(self):
+        """
+        Return a copy of the index that later updates do not affect, e.g. for use on another thread.
+        """
+        return copy.copy(self)
+
+    def columns_of_kind(self, *kinds):
+        """
+        Return the names of the columns of the given kinds, in column order.
+        """
+        return [name for name, stats in self.stats.items() if stats.kind in kinds]
+
+    def sequential_columns(self):
+        """
+        Return the columns usable as an ordered X axis: text, categories, dates and increasing columns.
+        """
+        return [
+            name for name, stats in self.stats.items()
+            if stats.kind in ("object", "category", "datetime") or stats.is_monotonic
+        ]
+
+    def aggregate(self, columns, method):
+        """
+        Return a Series with the mean, median, sum or max of each given column.
+
+        Parameters:
+        columns (list): The columns.
+        method (str): 'mean', 'median', 'sum' or 'max'.
+
+        Returns:
+        pd.Series: One value per column, indexed by column name.
+        """
+        return pd.Series({name: getattr(self.stats[name], method) for name in columns}, dtype="float64")
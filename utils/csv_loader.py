@@ -0,0 +1,243 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+# Size of each block handed to the Arrow CSV reader. The first block doubles
+# as the sample the column types are inferred from.
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+class _CountingReader:
+    """
+    A thin file wrapper that counts how many bytes the CSV reader has consumed.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def readable(self):
+        return True
+
+    def close(self):
+        pass
+
+    @property
+    def closed(self):
+        return False
+
+
+def _total_size(source):
+    """
+    Return the size in bytes of an uploaded file or a seekable file object.
+    """
+    size = getattr(source, "size", None)
+    if size is not None:
+        return size
+    position = source.tell()
+    source.seek(0, 2)
+    size = source.tell()
+    source.seek(position)
+    return size
+
+
+def _open_source(source):
+    """
+    Open a path for binary reading or rewind an already open file object.
+
+    Returns:
+    tuple: The binary file object and whether the caller is responsible for closing it.
+    """
+    if isinstance(source, str):
+        return open(source, "rb"), True
+    source.seek(0)
+    return source, False
+
+
+def open_csv_reader(handle, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Open a streaming Arrow CSV reader over a binary file object.
+
+    The schema is inferred once from the first block and pinned for the rest
+    of the file, so later blocks are parsed straight into the known types.
+
+    Parameters:
+    handle (file-like): The open binary file, positioned at the start of the CSV.
+    block_size (int): The number of bytes parsed per block.
+
+    Returns:
+    tuple: The pyarrow CSV reader, the byte-counting wrapper and the total size in bytes.
+    """
+    total_bytes = _total_size(handle)
+    counter = _CountingReader(handle)
+    reader = pa_csv.open_csv(
+        counter,
+        read_options=pa_csv.ReadOptions(block_size=block_size, use_threads=True),
+        # Match pd.read_csv, which treats empty strings as missing in text columns too.
+        convert_options=pa_csv.ConvertOptions(strings_can_be_null=True),
+    )
+    return reader, counter, total_bytes
+
+
+def _to_pandas(table):
+    """
+    Convert an Arrow table or batch to pandas with the dtypes pd.read_csv would produce.
+    """
+    return table.to_pandas(date_as_object=False, coerce_temporal_nanoseconds=True)
+
+
+def iter_csv_batches(source, block_size=DEFAULT_BLOCK_SIZE, on_progress=None):
+    """
+    Stream a CSV file as Arrow record batches.
+
+    Parameters:
+    source (str or file-like): The CSV path or an uploaded file object.
+    block_size (int): The number of bytes parsed per block.
+    on_progress (callable): Called as on_progress(rows, bytes_read, total_bytes) after each batch.
+
+    Yields:
+    pa.RecordBatch: The parsed batches, all sharing the schema inferred from the first block.
+    """
+    handle, should_close = _open_source(source)
+    try:
+        reader, counter, total_bytes = open_csv_reader(handle, block_size=block_size)
+        rows = 0
+        for batch in reader:
+            rows += batch.num_rows
+            if on_progress is not None:
+                on_progress(rows, min(counter.bytes_read, total_bytes), total_bytes)
+            yield batch
+    finally:
+        if should_close:
+            handle.close()
+
+
+def iter_csv_chunks(source, block_size=DEFAULT_BLOCK_SIZE, on_progress=None):
+    """
+    Stream a CSV file as a sequence of pandas DataFrames with consistent dtypes.
+
+    Parameters:
+    source (str or file-like): The CSV path or an uploaded file object.
+    block_size (int): The number of bytes parsed per chunk.
+    on_progress (callable): Called as on_progress(rows, bytes_read, total_bytes) after each chunk.
+
+    Yields:
+    pd.DataFrame: One DataFrame per parsed block.
+    """
+    for batch in iter_csv_batches(source, block_size=block_size, on_progress=on_progress):
+        yield _to_pandas(batch)
+
+
+def load_csv(source, block_size=DEFAULT_BLOCK_SIZE, on_progress=None):
+    """
+    Load a CSV file into a DataFrame using the multithreaded pyarrow parser.
+
+    The file is parsed block by block into Arrow memory, which is far more compact
+    than the decoded pandas objects, and converted to pandas once at the end while
+    releasing the Arrow buffers. If a later block does not fit the schema inferred
+    from the first one, the file is re-read by pandas with whole-file inference.
+
+    Parameters:
+    source (str or file-like): The CSV path or an uploaded file object.
+    block_size (int): The number of bytes parsed per block.
+    on_progress (callable): Called as on_progress(rows, bytes_read, total_bytes) after each block.
+
+    Returns:
+    pd.DataFrame: The loaded DataFrame.
+    """
+    handle, should_close = _open_source(source)
+    try:
+        try:
+            reader, counter, total_bytes = open_csv_reader(handle, block_size=block_size)
+            names = reader.schema.names
+            if len(set(names)) != len(names):
+                # pandas mangles duplicate headers ("a", "a.1"); let it do so.
+                raise pa.ArrowInvalid("Duplicate column names in CSV header.")
+
+            batches = []
+            rows = 0
+            for batch in reader:
+                batches.append(batch)
+                rows += batch.num_rows
+                if on_progress is not None:
+                    on_progress(rows, min(counter.bytes_read, total_bytes), total_bytes)
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+            del batches
+        except pa.ArrowInvalid:
+            handle.seek(0)
+            df = pd.read_csv(handle)
+            if on_progress is not None:
+                total_bytes = _total_size(handle)
+                on_progress(len(df), total_bytes, total_bytes)
+            return df
+    finally:
+        if should_close:
+            handle.close()
+
+    return table.to_pandas(
+        date_as_object=False,
+        coerce_temporal_nanoseconds=True,
+        split_blocks=True,
+        self_destruct=True,
+    )
+
+
+def _arrow_type(dtype):
+    """
+    Return the Arrow type a CSV column must parse as to match a pandas dtype, or None to infer it.
+    """
+    if not isinstance(dtype, np.dtype):
+        return None
+    if dtype.kind == "O":
+        return pa.string()
+    if dtype.kind in "iufb":
+        return pa.from_numpy_dtype(dtype)
+    if dtype.kind == "M":
+        return pa.timestamp("ns")
+    return None
+
+
+def load_csv_tail(source, like, start=0, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Load rows appended to a CSV file, parsing only the new bytes.
+
+    The appended bytes have no header, so the columns are taken from the rows
+    loaded before, and each column is parsed with the type it had there, so the
+    old and new rows can be concatenated.
+
+    Parameters:
+    source (bytes or file-like): The appended bytes, starting at a line boundary.
+    like (pd.DataFrame): The rows loaded from the file before, or an empty frame with their columns and dtypes.
+    start (int): The index of the first appended row, i.e. the number of rows loaded before.
+    block_size (int): The number of bytes parsed per block.
+
+    Returns:
+    pd.DataFrame: The appended rows, indexed from start; or None if they do not fit the columns or types.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    names = [str(col) for col in like.columns]
+    types = {name: _arrow_type(dtype) for name, dtype in zip(names, like.dtypes)}
+    try:
+        table = pa_csv.read_csv(
+            source,
+            read_options=pa_csv.ReadOptions(block_size=block_size, use_threads=True, column_names=names),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={name: dtype for name, dtype in types.items() if dtype is not None},
+                strings_can_be_null=True,
+            ),
+        )
+    except pa.ArrowInvalid:
+        return None
+    df = _to_pandas(table)
+    df.columns = like.columns
+    df.index = pd.RangeIndex(start, start + len(df))
+    return df
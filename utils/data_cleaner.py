@@ -1,93 +1,690 @@
+import time
+
 import pandas as pd
 import numpy as np
 
+from utils.backends import BACKENDS, PartitionedPandasBackend
+from utils.cleaning_plan import PlanStep, FilterGroup, is_filter, is_imputation, optimize_plan, format_plan
+from utils.imputation import columns_of_dtype
+from utils.incremental import ReplayStep, apply_replay, capture_step, replay_step
+from utils.dtypes import DEFAULT_CATEGORY_THRESHOLD, DEFAULT_SPARSE_THRESHOLD, optimize_dtypes
+from utils.instrumentation import OperationTimer
+from utils.near_dedup import DEFAULT_NUM_PERM, DEFAULT_THRESHOLD, cluster_ids
+from utils.outliers import sketch_bounds
+from utils.type_inference import DEFAULT_MAX_FAILURE_RATE, SAMPLE_SIZE, infer_types
+from utils.result_cache import step_key
+from utils.validation import ValidationReport, compile_rules, validate
+
+MISSING_VALUE_STRATEGIES = ("drop", "mean", "median", "mode", "fill")
+COLUMN_CASES = ("lowercase", "uppercase", "sentence case")
+# Frames with at least this many rows are de-duplicated by the partitioned, multi-process engine.
+PARTITIONED_DEDUP_ROWS = 5_000_000
+
+
 class DataCleaner:
     """
     A utility class for cleaning and preprocessing data in a Pandas DataFrame.
+
+    By default every method is applied immediately. With lazy=True the calls are
+    only recorded, and the whole plan is optimized and executed in as few passes
+    as possible when get_cleaned_data() is called.
+
+    Operations never modify the frame in place, so the cleaner starts from a
+    shallow copy of the input and only the columns an operation touches are
+    materialized. With pandas copy-on-write enabled, construction is free.
+
+    The computations themselves are delegated to a backend: 'pandas' works on the
+    DataFrame directly, while 'arrow' converts it once to a pyarrow Table and uses
+    pyarrow.compute kernels. Both produce the same results.
+
+    Given a ResultCache and the content key of the input data, every result is
+    cached under a key chained from the input key and the operations applied, so
+    repeating a pipeline, or any prefix of it, on the same data is a cache hit.
+
+    Given a ColumnStatsIndex, it is kept in step with the data: row filters
+    update it incrementally and other operations recompute only changed columns.
+
+    Given an on_progress(fraction, message) callback, progress is reported before
+    and after every executed step; the callback may raise to abort the run.
+
+    Every executed step, and every step served from the cache, is passed to each
+    of the hooks as a dict with its wall and CPU time, resident memory change,
+    rows and columns in and out, and the number of cells modified.
     """
 
-    def __init__(self, df):
+    def __init__(self, df, lazy=False, history=None, backend="pandas", cache=None, data_key=None, stats=None,
+                 on_progress=None, hooks=None, partition_by=None, track_replay=False):
         """
         Initialize the DataCleaner with a Pandas DataFrame.
 
         Parameters:
         df (pd.DataFrame): The DataFrame to clean.
+        lazy (bool): Record operations and run them together in get_cleaned_data().
+        history (CleaningHistory): If given, every executed operation is recorded in it for undo/redo.
+        backend (str): The compute backend, 'pandas' or 'arrow'.
+        cache (ResultCache): If given together with data_key, results are looked up and stored in it.
+        data_key (str): The content key of df, e.g. from result_cache.content_hash.
+        stats (ColumnStatsIndex): If given, it is updated after every executed operation.
+        on_progress (callable): Called with the fraction of the work done and a message.
+        hooks (list): Callables receiving an entry for every operation, see utils.instrumentation.
+        partition_by (str): A column splitting the rows into partitions, e.g. shards.SOURCE_COLUMN;
+            row-wise operations then run on the partitions in parallel. Only used by the
+            pandas backend, as the Arrow kernels are multithreaded already.
+        track_replay (bool): Keep every executed step, with the mergeable statistics of its
+            input, in replay_log, so it can be replayed on rows appended later (see replay).
+            With a history, the steps are handed to it with each recorded version instead.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Invalid backend. Options are {', '.join(BACKENDS)}.")
+        if partition_by is not None and backend == "pandas":
+            self.backend = PartitionedPandasBackend(partition_by)
+        else:
+            self.backend = BACKENDS[backend]()
+        self.data = self.backend.from_pandas(df)
+        self.lazy = lazy
+        self.plan = []
+        self.history = history
+        self.cache = cache
+        self.data_key = data_key
+        self.stats = stats
+        self.on_progress = on_progress
+        self.hooks = list(hooks or [])
+        self.dtype_report = None
+        self.type_report = None
+        self.validation_report = None
+        self.replay_log = [] if track_replay else None
+
+    @property
+    def df(self):
+        """
+        The current data as a pandas DataFrame.
         """
-        self.df = df.copy()
+        return self.backend.to_pandas(self.data)
 
-    def standardize_columns(self):
+    @df.setter
+    def df(self, df):
+        self.data = self.backend.from_pandas(df)
+
+    def standardize_columns(self, case="lowercase", replace=" ", replacement="_"):
         """
         Standardize column names by removing leading/trailing spaces,
-        converting to lowercase, and replacing spaces with underscores.
+        converting the case, and replacing text (by default spaces with underscores).
+
+        Parameters:
+        case (str): The case for column names. Options are 'lowercase', 'uppercase' or 'sentence case'.
+        replace (str): The text to replace in column names. If empty or None, nothing is replaced.
+        replacement (str): The text to replace it with.
+
+        Returns:
+        self
         """
-        self.df.columns = (
-            self.df.columns
-            .str.strip()
-            .str.lower()
-            .str.replace(" ", "_")
-        )
-        return self
+        if case not in COLUMN_CASES:
+            raise ValueError("Invalid case for column names.")
+        return self._submit(PlanStep("standardize_columns", case=case, replace=replace, replacement=replacement))
+
+    def drop_columns(self, columns):
+        """
+        Drop the given columns from the DataFrame.
+
+        Parameters:
+        columns (list): List of column names to drop.
+
+        Returns:
+        self
+        """
+        return self._submit(PlanStep("drop_columns", columns=list(columns)))
 
-    def handle_missing_values(self, strategy="drop", fill_value=None):
+    def handle_missing_values(self, strategy="drop", fill_value=None, columns=None, sketches=None):
         """
         Handle missing values in the DataFrame.
 
         Parameters:
         strategy (str): The strategy for handling missing values. Options are 'mean', 'median', 'mode', 'drop' or 'fill'.
         fill_value (any): The value to fill when strategy is 'fill'.
+        columns (list): Columns to handle. If None, all columns are used.
+        sketches (dict): For the 'median' strategy, column name -> KLLSketch to take the medians
+            from instead of the data, e.g. sketches of a whole file built chunk by chunk. The
+            medians are then filled as constants. If columns is None, the sketched columns are filled.
 
         Returns:
         self
         """
-        if strategy =="drop":
-            self.df.dropna(axis=0, how='any', inplace=True)
-        elif strategy == "mean":
-            self.df.fillna(self.df.mean(), inplace=True)
-        elif strategy == "median":
-            self.df.fillna(self.df.median(), inplace=True)
-        elif strategy == "mode":
-            self.df.fillna(self.df.mode().iloc[0], inplace=True)
-        elif strategy == "fill":
-            if fill_value is not None:
-                self.df.fillna(fill_value, inplace=True)
-        else:
+        if strategy not in MISSING_VALUE_STRATEGIES:
             raise ValueError("Invalid strategy for handling missing values.")
-        return self
+        if sketches is not None:
+            if strategy != "median":
+                raise ValueError("Sketches can only be used with the 'median' strategy.")
+            columns = list(sketches) if columns is None else columns
+            return self.impute({col: ("fill", sketches[col].quantile(0.5)) for col in columns})
+        return self._submit(
+            PlanStep("handle_missing_values", strategy=strategy, fill_value=fill_value, columns=columns)
+        )
+
+    def impute(self, plan, max_workers=None):
+        """
+        Fill missing values with a separate strategy per column or dtype group.
 
-    def drop_duplicates(self):
+        All statistics are computed in one batched pass on a thread pool, and the
+        frame is filled with a single fillna call.
+
+        Parameters:
+        plan (dict): Maps column names or dtype groups ('number', 'datetime', 'timedelta',
+            'bool', 'category', 'object') to 'mean', 'median', 'mode' or ('fill', value).
+            Column names take precedence over dtype groups.
+        max_workers (int): The thread pool size. If None, the executor default is used.
+
+        Returns:
+        self
+        """
+        return self._submit(PlanStep("impute", plan=dict(plan), max_workers=max_workers))
+
+    def drop_duplicates(self, subset=None, keep="first", partitioned=None):
         """
         Drop duplicate rows from the DataFrame.
+
+        Parameters:
+        subset (list): Columns that identify duplicates. If None, all columns are used.
+        keep (str or bool): Which duplicate to keep: 'first', 'last' or False to drop all of them.
+        partitioned (bool): Hash-partition the rows to disk and de-duplicate the partitions in
+            worker processes. If None, this is done for frames of PARTITIONED_DEDUP_ROWS rows or more.
+
+        Returns:
+        self
         """
-        self.df.drop_duplicates(inplace=True)
-        return self
+        if keep not in ("first", "last", False):
+            raise ValueError("keep must be 'first', 'last' or False.")
+        return self._submit(
+            PlanStep("drop_duplicates", subset=None if subset is None else list(subset), keep=keep,
+                     partitioned=partitioned)
+        )
 
-    def remove_outliers(self, columns=None):
+    def remove_outliers(self, columns=None, sketches=None):
         """
         Remove outliers from the specified numeric columns using the IQR method.
 
+        The bounds of all columns are computed on the same rows, and a row is
+        removed if it is an outlier in any of the columns.
+
         Parameters:
         columns (list): List of column names to check for outliers. If None, all numeric columns are used.
+        sketches (dict): Column name -> KLLSketch to take the quartiles from instead of the data,
+            e.g. sketches of a whole file built chunk by chunk, so that every chunk is filtered
+            with the same bounds. If columns is None, the sketched columns are checked.
 
         Returns:
         self
         """
-        if columns is None:
-            columns = self.df.select_dtypes(include=[np.number]).columns
-
-        for col in columns:
-            Q1 = self.df[col].quantile(0.25)
-            Q3 = self.df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            self.df = self.df[
-                ~((self.df[col] < (Q1 - 1.5 * IQR)) | (self.df[col] > (Q3 + 1.5 * IQR)))
-            ]
-        return self
+        if sketches is None:
+            return self._submit(PlanStep("remove_outliers", columns=columns))
+        columns = list(sketches) if columns is None else list(columns)
+        return self._submit(
+            PlanStep("remove_outliers", columns=columns, sketches={col: sketches[col] for col in columns})
+        )
+
+    def drop_near_duplicates(self, columns=None, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM):
+        """
+        Drop rows whose text nearly matches an earlier row, keeping the first row of each cluster.
+
+        Text is compared after lowercasing and collapsing punctuation and whitespace,
+        by the estimated Jaccard similarity of its 3-byte shingles, and similar rows
+        are clustered transitively; see near_dedup.near_duplicate_roots.
+
+        Parameters:
+        columns (list): The columns compared, joined per row. If None, all text and categorical columns are used.
+        threshold (float): The similarity, between 0 and 1, from which rows count as near-duplicates.
+        num_perm (int): The MinHash signature length; longer is more accurate and slower.
+
+        Returns:
+        self
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be between 0 and 1.")
+        return self._submit(
+            PlanStep("drop_near_duplicates", columns=None if columns is None else list(columns),
+                     threshold=threshold, num_perm=num_perm)
+        )
+
+    def optimize_dtypes(self, category_threshold=DEFAULT_CATEGORY_THRESHOLD,
+                        sparse_threshold=DEFAULT_SPARSE_THRESHOLD):
+        """
+        Shrink the memory of the data by converting every column to its most compact exact dtype.
+
+        Integers are downcast, float64 becomes float32 where lossless, mostly missing
+        float columns become sparse, repetitive text becomes categorical and other text
+        becomes Arrow strings. The per-column bytes before and after are kept in
+        dtype_report. With the arrow backend, sparse columns are stored dense.
+
+        Parameters:
+        category_threshold (float): Text columns whose distinct values are at most this
+            fraction of their values become categoricals.
+        sparse_threshold (float): Float columns with at least this fraction of missing
+            values become sparse. Use a value above 1 to disable.
+
+        Returns:
+        self
+        """
+        return self._submit(
+            PlanStep("optimize_dtypes", category_threshold=category_threshold, sparse_threshold=sparse_threshold)
+        )
+
+    def infer_types(self, columns=None, max_failure_rate=DEFAULT_MAX_FAILURE_RATE, sample_size=SAMPLE_SIZE):
+        """
+        Convert text columns holding numbers, percentages, currency amounts or dates to those types.
+
+        A parser, and for dates an explicit format, is chosen once per column from a
+        sample of its values; then each column is parsed with one vectorized call,
+        in parallel across columns. The per-column kind, format and failure rate
+        are kept in type_report.
+
+        Parameters:
+        columns (list): The columns to inspect. If None, all text columns are.
+        max_failure_rate (float): Columns where a larger share of the values fails to parse are left as text.
+        sample_size (int): The number of values sampled per column.
+
+        Returns:
+        self
+        """
+        return self._submit(
+            PlanStep("infer_types", columns=None if columns is None else list(columns),
+                     max_failure_rate=max_failure_rate, sample_size=sample_size)
+        )
+
+    def preview_types(self, columns=None, max_failure_rate=DEFAULT_MAX_FAILURE_RATE, sample_size=SAMPLE_SIZE):
+        """
+        Show what infer_types would convert without changing the data.
+
+        The preview is computed on the current data and ignores any pending lazy plan.
+
+        Returns:
+        pd.DataFrame: One row per column a parser was found for, see type_inference.infer_types.
+        """
+        return infer_types(self.df, columns, sample_size, max_failure_rate)[1]
+
+    def validate(self, rules, max_workers=None):
+        """
+        Check the data against declared rules without changing it.
+
+        The rules (non-null, ranges, regular expressions, allowed values,
+        uniqueness and cross-column comparisons, see validation.ValidationRule)
+        are compiled into batched vectorized checks evaluated in one pass. With a
+        cache and data_key, the violations are cached per data version, so the
+        same rules on the same data are only evaluated once. The report is also
+        kept in validation_report.
+
+        The validation runs on the current data and ignores any pending lazy plan.
+
+        Parameters:
+        rules (list): The rules, as dicts.
+        max_workers (int): The thread pool size for evaluating the rules.
+
+        Returns:
+        ValidationReport: The violation counts and row positions of every rule.
+        """
+        key = None
+        if self.cache is not None and self.data_key is not None:
+            key = step_key(self.data_key, PlanStep("validate", rules=list(rules)))
+            cached = self.cache.get(key)
+            if cached is not None:
+                compiled, _ = compile_rules(rules, self.backend.schema(self.data).dtypes)
+                self.validation_report = ValidationReport.from_frame(
+                    compiled, cached, self.backend.num_rows(self.data)
+                )
+                return self.validation_report
+        self.validation_report = validate(self.df, rules, max_workers=max_workers)
+        if key is not None:
+            self.cache.put(key, self.validation_report.to_frame())
+        return self.validation_report
+
+    def preview_outliers(self, columns=None, sketches=None):
+        """
+        Show what remove_outliers would do without changing or copying the data.
+
+        The preview is computed on the current data and ignores any pending lazy plan.
+
+        Parameters:
+        columns (list): List of column names to check for outliers. If None, all numeric columns are used.
+        sketches (dict): Column name -> KLLSketch to take the quartiles from, see remove_outliers.
+
+        Returns:
+        dict: 'bounds' (pd.DataFrame of quartiles and bounds per column), 'counts'
+        (pd.Series of outliers per column), 'mask' (np.ndarray of rows that would be kept)
+        and 'rows_removed' (int).
+        """
+        if sketches is None:
+            bounds = self.backend.iqr_bounds(self.data, self._outlier_columns(columns))
+        else:
+            bounds = sketch_bounds({col: sketches[col] for col in (sketches if columns is None else columns)})
+        mask, counts = self.backend.outlier_mask(self.data, bounds)
+        return {"bounds": bounds, "counts": counts, "mask": mask, "rows_removed": int(len(mask) - mask.sum())}
+
+    def preview_near_duplicates(self, columns=None, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM):
+        """
+        Show which rows drop_near_duplicates would group together, without changing the data.
+
+        The preview is computed on the current data and ignores any pending lazy plan.
+
+        Parameters:
+        columns (list): The columns compared. If None, all text and categorical columns are used.
+        threshold (float): The similarity from which rows count as near-duplicates.
+        num_perm (int): The MinHash signature length.
+
+        Returns:
+        dict: 'clusters' (np.ndarray of a cluster id per row, numbered in order of
+        first appearance), 'mask' (np.ndarray of rows that would be kept),
+        'duplicate_clusters' (int, clusters of more than one row) and 'rows_removed' (int).
+        """
+        roots = self._near_duplicate_roots(columns, threshold, num_perm)
+        mask = roots == np.arange(len(roots))
+        clusters = cluster_ids(roots)
+        sizes = np.bincount(clusters)
+        return {
+            "clusters": clusters,
+            "mask": mask,
+            "duplicate_clusters": int((sizes > 1).sum()),
+            "rows_removed": int(len(mask) - mask.sum()),
+        }
+
+    def replay(self, log):
+        """
+        Replay steps recorded on earlier data (see track_replay) on rows appended to it.
+
+        This cleaner's data holds only the appended rows. Steps that treat every row
+        on its own run as they are. Steps depending on statistics of all the rows
+        use their recorded statistics merged with those of the new rows: means from
+        sums and counts, medians and IQR bounds from merged quantile sketches, modes
+        from summed value counts. Duplicates are found by row hash, against the rows
+        kept so far and within the new rows. Type inference reuses the recorded
+        parsers, and dtype optimization the recorded dtypes, widened where new values
+        do not fit them. The old rows are never
+        revisited, so the statistics are only updated for the rows added.
+
+        Parameters:
+        log (list): The ReplayStep entries recorded on the earlier data.
+
+        Returns:
+        list: The ReplayStep entries with the merged statistics, to replay on the next append.
+        """
+        blocked = [entry.step for entry in log if not entry.incremental]
+        if blocked:
+            raise ValueError(f"These steps can only be replayed on the whole data: {blocked}")
+        replayed = []
+        for entry in log:
+            step, state = replay_step(entry, self.df)
+            if step is None:
+                self.df, state = apply_replay(entry, self.df)
+            else:
+                self._run(FilterGroup([step]) if is_filter(step) else step)
+            replayed.append(ReplayStep(entry.step, state))
+        self._update_stats()
+        return replayed
+
+    def explain(self):
+        """
+        Describe the recorded plan and the optimized plan it will run as.
+
+        Returns:
+        str: The plan, one step per line.
+        """
+        return format_plan(self.plan, optimize_plan(self.plan))
 
     def get_cleaned_data(self):
         """
-        Return the cleaned DataFrame.
+        Return the cleaned DataFrame, running any recorded plan first.
 
         Returns:
         pd.DataFrame: The cleaned DataFrame.
         """
+        if self.plan:
+            steps = self.plan
+            if self.cache is not None and self.data_key is not None:
+                done, key, cached = self.cache.longest_prefix(self.data_key, steps, backend=self.backend.name)
+                if cached is not None:
+                    if self.replay_log is not None:
+                        # The statistics of steps served from the cache are unknown.
+                        self.replay_log.extend(ReplayStep(step, incremental=False) for step in steps[:done])
+                    self.df, self.data_key, steps = cached, key, steps[done:]
+            optimized = optimize_plan(steps)
+            for number, step in enumerate(optimized):
+                self._report(number / len(optimized), f"Running {step!r}")
+                self._run(step)
+            self._report(1.0, f"Ran {len(self.plan)} cleaning steps")
+            if steps and self.data_key is not None:
+                for step in steps:
+                    self.data_key = step_key(self.data_key, step, self.backend.name)
+                if self.cache is not None:
+                    self.cache.put(self.data_key, self.df)
+            self._record(f"{len(self.plan)} cleaning steps")
+            self._update_stats()
+            self.plan = []
         return self.df
+
+    def _submit(self, step):
+        """
+        Record the step in lazy mode, otherwise run it right away.
+        """
+        if self.lazy:
+            self.plan.append(step)
+            return self
+
+        parent_key = self.data_key
+        key = None if parent_key is None else step_key(parent_key, step, self.backend.name)
+        cached = None if key is None or self.cache is None else self.cache.get(key)
+        keep = None
+        self._report(0.0, f"Running {step!r}")
+        if cached is not None:
+            before = self.df if self.replay_log is not None else None
+            if self.hooks:
+                shape = self._shape()
+                with OperationTimer() as timer:
+                    self.df = cached
+                self._emit(step, timer, shape, cached=True)
+            else:
+                self.df = cached
+            if before is not None:
+                self.replay_log.append(capture_step(step, before, cached))
+        else:
+            keep = self._run(FilterGroup([step]) if is_filter(step) else step)
+            if key is not None and self.cache is not None:
+                self.cache.put(key, self.df)
+        self.data_key = key
+        self._record(repr(step))
+        self._update_stats(keep, parent_key)
+        self._report(1.0, f"Ran {step!r}")
+        return self
+
+    def _report(self, fraction, message):
+        """
+        Pass progress to the on_progress callback, if any.
+        """
+        if self.on_progress is not None:
+            self.on_progress(fraction, message)
+
+    def _record(self, label):
+        """
+        Record the current frame in the undo history, sharing its unchanged columns.
+
+        With the arrow backend this converts the data to pandas and back on every step.
+        """
+        if self.history is not None:
+            steps = self.replay_log
+            if steps is not None:
+                self.replay_log = []
+            self.df = self.history.record(self.df, label, key=self.data_key, steps=steps)
+
+    def _update_stats(self, keep=None, parent_key=None):
+        """
+        Bring the column statistics index up to date with the current data.
+
+        Parameters:
+        keep (np.ndarray): If the last step was a row filter, the mask of the rows it kept.
+        parent_key (str): The key of the data the filter was applied to.
+        """
+        if self.stats is None:
+            return
+        if keep is not None and self.stats.version == parent_key and self.stats.index is not None:
+            self.stats.remove_rows(self.df, keep, self.data_key)
+        else:
+            self.stats.sync(self.df, self.data_key)
+
+    def _shape(self, nulls=False):
+        """
+        Return the number of rows, columns and, if asked for, missing values of the current data.
+        """
+        columns = len(self.backend.schema(self.data).columns)
+        missing = self.backend.null_count(self.data) if nulls else None
+        return self.backend.num_rows(self.data), columns, missing
+
+    def _emit(self, step, timer, shape_in, cached=False):
+        """
+        Pass the measurements of one operation to every hook.
+        """
+        rows_in, columns_in, missing_in = shape_in
+        rows_out, columns_out, missing_out = self._shape(nulls=missing_in is not None)
+        # Removed rows and columns count as modified cells, as do filled missing values.
+        cells = (rows_in - rows_out) * columns_in + rows_out * (columns_in - columns_out)
+        if missing_in is not None:
+            cells += missing_in - missing_out
+        entry = {
+            "step": repr(step),
+            "op": "filter" if isinstance(step, FilterGroup) else step.name,
+            "backend": self.backend.name,
+            "cached": cached,
+            "wall_seconds": timer.wall_seconds,
+            "cpu_seconds": timer.cpu_seconds,
+            "memory_delta_mb": timer.memory_delta / 1024 ** 2,
+            "rows_in": rows_in,
+            "rows_out": rows_out,
+            "columns_in": columns_in,
+            "columns_out": columns_out,
+            "cells_modified": int(cells),
+            "timestamp": time.time(),
+        }
+        for hook in self.hooks:
+            hook(entry)
+
+    def _run(self, step):
+        """
+        Execute a single plan step against the current data, measuring it if there are hooks.
+
+        Returns:
+        np.ndarray: For a group of filters, the mask of the rows kept, otherwise None.
+        """
+        if not self.hooks:
+            return self._execute(step)
+        shape = self._shape(nulls=not isinstance(step, FilterGroup) and is_imputation(step))
+        with OperationTimer() as timer:
+            keep = self._execute(step)
+        self._emit(step, timer, shape)
+        return keep
+
+    def _execute(self, step):
+        """
+        Execute a single plan step against the current data.
+        """
+        if isinstance(step, FilterGroup):
+            return self._apply_filters(step.steps)
+        before = self.df if self.replay_log is not None else None
+        getattr(self, f"_{step.name}")(**step.params)
+        if before is not None:
+            self.replay_log.append(capture_step(step, before, self.df, type_report=self.type_report))
+
+    def _apply_filters(self, steps):
+        """
+        Evaluate a group of row filters as one boolean mask and slice the frame once.
+
+        Each filter only sees the rows the earlier filters kept, exactly as if
+        they had been applied one after another.
+        """
+        keep = np.ones(self.backend.num_rows(self.data), dtype=bool)
+        before = self.df if self.replay_log is not None else None
+        for step in steps:
+            if before is not None:
+                self.replay_log.append(capture_step(step, before, None, rows=keep.copy()))
+            keep &= self._row_mask(step, keep)
+        if not keep.all():
+            self.data = self.backend.filter(self.data, keep)
+        return keep
+
+    def _row_mask(self, step, keep):
+        """
+        Return the boolean mask of rows a filter step keeps.
+
+        Parameters:
+        step (PlanStep): A 'drop' handle_missing_values, remove_outliers or drop_near_duplicates step.
+        keep (np.ndarray): The rows kept by the filters evaluated so far.
+        """
+        columns = step.params.get("columns")
+        if step.name == "handle_missing_values":
+            return self.backend.not_null_mask(self.data, columns)
+        if step.name == "drop_near_duplicates":
+            roots = self._near_duplicate_roots(columns, step.params["threshold"], step.params["num_perm"], rows=keep)
+            mask = np.ones(len(keep), dtype=bool)
+            mask[keep] = roots == np.arange(len(roots))
+            return mask
+
+        sketches = step.params.get("sketches")
+        if sketches is not None:
+            # Sketched bounds are fixed, whatever rows are left.
+            bounds = sketch_bounds(sketches)
+        else:
+            bounds = self.backend.iqr_bounds(self.data, self._outlier_columns(columns), rows=keep)
+        mask, _ = self.backend.outlier_mask(self.data, bounds)
+        return mask
+
+    def _outlier_columns(self, columns):
+        """
+        Resolve the columns checked for outliers, defaulting to every numeric column.
+        """
+        if columns is None:
+            return list(columns_of_dtype(self.backend.schema(self.data), [np.number]))
+        return list(columns)
+
+    def _near_duplicate_roots(self, columns, threshold, num_perm, rows=None):
+        """
+        Return, for every row (of the given rows), the position of the first row of its near-duplicate cluster.
+        """
+        if columns is None:
+            columns = columns_of_dtype(self.backend.schema(self.data), ["object", "string", "category"])
+        if len(columns) == 0:
+            return np.arange(self.backend.num_rows(self.data) if rows is None else int(rows.sum()))
+        return self.backend.near_duplicate_roots(self.data, list(columns), threshold, num_perm, rows=rows)
+
+    def _standardize_columns(self, case, replace, replacement):
+        columns = self.backend.schema(self.data).columns.str.strip()
+        if case == "lowercase":
+            columns = columns.str.lower()
+        elif case == "uppercase":
+            columns = columns.str.upper()
+        else:
+            columns = columns.str.title()
+        if replace:
+            columns = columns.str.replace(replace, replacement, regex=False)
+        self.data = self.backend.rename_columns(self.data, columns)
+
+    def _drop_columns(self, columns):
+        self.data = self.backend.drop_columns(self.data, columns)
+
+    def _handle_missing_values(self, strategy, fill_value, columns):
+        if strategy == "fill" and fill_value is None:
+            return
+        schema = self.backend.schema(self.data)
+        if columns is None and strategy in ("mean", "median"):
+            columns = columns_of_dtype(schema, [np.number, "datetime", "timedelta"])
+        elif columns is None:
+            columns = schema.columns
+        entry = ("fill", fill_value) if strategy == "fill" else strategy
+        self._impute({col: entry for col in columns}, max_workers=None)
+
+    def _optimize_dtypes(self, category_threshold, sparse_threshold):
+        self.df, self.dtype_report = optimize_dtypes(self.df, category_threshold, sparse_threshold)
+
+    def _infer_types(self, columns, max_failure_rate, sample_size):
+        self.df, self.type_report = infer_types(self.df, columns, sample_size, max_failure_rate)
+
+    def _impute(self, plan, max_workers):
+        self.data = self.backend.impute(self.data, plan, max_workers=max_workers)
+
+    def _drop_duplicates(self, subset, keep, partitioned):
+        if partitioned is None:
+            partitioned = self.backend.num_rows(self.data) >= PARTITIONED_DEDUP_ROWS
+        self.data = self.backend.drop_duplicates(self.data, subset, keep, partitioned)
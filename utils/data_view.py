@@ -0,0 +1,214 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+FILTER_OPERATORS = ("contains", "==", "!=", ">", ">=", "<", "<=", "is missing", "is not missing")
+# Operators that take no value.
+UNARY_OPERATORS = ("is missing", "is not missing")
+PAGE_SIZES = (25, 50, 100, 250, 1000)
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+DEFAULT_MAX_ENTRIES = 32
+
+
+def _positions(values):
+    """
+    Return row positions in the smallest integer dtype that can index the frame.
+    """
+    values = np.asarray(values)
+    return values.astype(np.int32) if len(values) < 2 ** 31 else values.astype(np.int64)
+
+
+def _parse_value(series, value):
+    """
+    Convert a filter value typed as text to the type of a column.
+    """
+    dtype = series.dtype
+    try:
+        if pd.api.types.is_bool_dtype(dtype):
+            return value.strip().lower() in ("true", "1", "yes")
+        if pd.api.types.is_numeric_dtype(dtype):
+            return float(value)
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            timestamp = pd.Timestamp(value)
+            tz = getattr(dtype, "tz", None)
+            if tz is not None and timestamp.tzinfo is None:
+                timestamp = timestamp.tz_localize(tz)
+            return timestamp
+        if pd.api.types.is_timedelta64_dtype(dtype):
+            return pd.Timedelta(value)
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"{value!r} is not a valid value for column {series.name!r}: {error}") from None
+    return value
+
+
+def _contains(series, text):
+    """
+    Return a case-insensitive substring match of a column; categoricals only search their categories.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        matches = series.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        codes = series.cat.codes.to_numpy()
+        return np.append(np.asarray(matches, dtype=bool), False)[codes]
+    matches = series.astype("string").str.contains(text, case=False, regex=False)
+    return matches.fillna(False).to_numpy(dtype=bool)
+
+
+def filter_mask(series, operator, value=None):
+    """
+    Evaluate a filter condition on a column as a vectorized boolean mask.
+
+    Parameters:
+    series (pd.Series): The column.
+    operator (str): One of FILTER_OPERATORS.
+    value (str): The value to compare with, as typed; converted to the column's type.
+
+    Returns:
+    np.ndarray: True for the rows matching the condition. Missing values only match 'is missing'.
+    """
+    if operator == "is missing":
+        return series.isna().to_numpy()
+    if operator == "is not missing":
+        return series.notna().to_numpy()
+    if operator == "contains":
+        return _contains(series, str(value))
+    if operator not in FILTER_OPERATORS:
+        raise ValueError(f"Invalid filter operator {operator!r}. Options are {', '.join(FILTER_OPERATORS)}.")
+    value = _parse_value(series, value)
+    compare = {
+        "==": series.__eq__, "!=": series.__ne__, ">": series.__gt__,
+        ">=": series.__ge__, "<": series.__lt__, "<=": series.__le__,
+    }[operator]
+    try:
+        result = compare(value)
+    except TypeError:
+        raise ValueError(f"Column {series.name!r} cannot be compared with {value!r}.") from None
+    mask = result.to_numpy() if result.dtype == bool else result.fillna(False).to_numpy(dtype=bool)
+    return mask & series.notna().to_numpy()
+
+
+def sort_order(series, ascending=True):
+    """
+    Return the row positions of a column in sorted order, stable and with missing values last.
+
+    Columns whose values cannot be compared with each other, e.g. mixed text and
+    numbers, are sorted by their text representation.
+    """
+    positional = series.reset_index(drop=True)
+    try:
+        ordered = positional.sort_values(ascending=ascending, kind="stable", na_position="last")
+    except TypeError:
+        ordered = positional.astype(str).where(positional.notna()).sort_values(
+            ascending=ascending, kind="stable", na_position="last"
+        )
+    return _positions(ordered.index)
+
+
+class DataView:
+    """
+    Server-side sorting, filtering and paging of a frame, so only the visible rows are rendered.
+
+    The row order of every sort and the matching rows of every filter are cached
+    per data version, least recently used first out. Turning a page, or returning
+    to a sort or filter of a version already seen, then only slices an array of
+    row positions instead of touching the data.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the view.
+
+        Parameters:
+        max_bytes (int): The maximum total size of the cached position arrays.
+        max_entries (int): The maximum number of cached arrays.
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+
+    def _cached(self, key, compute):
+        positions = self._cache.get(key)
+        if positions is not None:
+            self._cache.move_to_end(key)
+            return positions
+        positions = compute()
+        self._cache[key] = positions
+        total = sum(cached.nbytes for cached in self._cache.values())
+        while len(self._cache) > 1 and (len(self._cache) > self.max_entries or total > self.max_bytes):
+            _, evicted = self._cache.popitem(last=False)
+            total -= evicted.nbytes
+        return positions
+
+    def sort_positions(self, df, version, column, ascending=True):
+        """
+        Return the row positions of a frame sorted by one column, see sort_order.
+        """
+        return self._cached(("sort", version, column, ascending), lambda: sort_order(df[column], ascending))
+
+    def filter_positions(self, df, version, filters):
+        """
+        Return the positions of the rows matching every (column, operator, value) filter, in row order.
+        """
+        def compute():
+            mask = np.ones(len(df), dtype=bool)
+            for column, operator, value in filters:
+                mask &= filter_mask(df[column], operator, value)
+            return _positions(np.flatnonzero(mask))
+
+        return self._cached(("filter", version, tuple(filters)), compute)
+
+    def rows(self, df, version, sort_by=None, ascending=True, filters=()):
+        """
+        Return the positions of the rows to show, in display order.
+
+        Parameters:
+        df (pd.DataFrame): The data.
+        version (str): An identifier of the data version, e.g. its content key.
+        sort_by (str): The column to sort by, or None for the original order.
+        ascending (bool): The sort direction.
+        filters (tuple): (column, operator, value) conditions that must all hold, see filter_mask.
+
+        Returns:
+        np.ndarray: The row positions, or None for all rows in their original order.
+        """
+        filters = tuple(filters)
+        if sort_by is None and not filters:
+            return None
+        if not filters:
+            return self.sort_positions(df, version, sort_by, ascending)
+        matching = self.filter_positions(df, version, filters)
+        if sort_by is None:
+            return matching
+
+        def compute():
+            order = self.sort_positions(df, version, sort_by, ascending)
+            keep = np.zeros(len(df), dtype=bool)
+            keep[matching] = True
+            return order[keep[order]]
+
+        return self._cached(("rows", version, sort_by, ascending, filters), compute)
+
+    def clear(self):
+        """
+        Drop every cached position array.
+        """
+        self._cache.clear()
+
+
+def page_of(df, positions, page, page_size):
+    """
+    Return one page of rows.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    positions (np.ndarray): The row positions in display order, or None for all rows in order.
+    page (int): The page number, starting at 0.
+    page_size (int): The number of rows per page.
+
+    Returns:
+    pd.DataFrame: The rows of the page, with their original index labels.
+    """
+    start = page * page_size
+    if positions is None:
+        return df.iloc[start:start + page_size]
+    return df.take(positions[start:start + page_size])
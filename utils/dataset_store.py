@@ -0,0 +1,314 @@
+import os
+import tempfile
+import threading
+import time
+import weakref
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from utils.column_stats import ColumnStatsIndex
+from utils.data_view import DataView
+from utils.history import CleaningHistory
+from utils.result_cache import pandas_types
+
+DEFAULT_STORE_DIR = os.environ.get("VISWALIS_STORE_DIR", os.path.join(tempfile.gettempdir(), "viswalis-sessions"))
+DEFAULT_MEMORY_BUDGET = int(float(os.environ.get("VISWALIS_MEMORY_BUDGET_MB", 1024)) * 1024 ** 2)
+DEFAULT_IDLE_SECONDS = 60
+
+
+def _to_table(df):
+    """
+    Convert a frame to an Arrow table that maps back into NumPy without copying where possible.
+
+    Float columns keep NaN as a value rather than turning it into a null, so they
+    convert back zero-copy like other numeric columns without nulls.
+    """
+    # A RangeIndex is kept in the metadata instead of being materialized as a column.
+    table = pa.Table.from_pandas(df, preserve_index=None)
+    # from_pandas puts the data columns first, in frame order, and the index columns after them.
+    for position, dtype in enumerate(df.dtypes):
+        if isinstance(dtype, np.dtype) and dtype.kind == "f":
+            values = pa.array(df.iloc[:, position].to_numpy(), from_pandas=False)
+            table = table.set_column(position, table.field(position), values)
+    return table
+
+
+class DatasetStore:
+    """
+    Data versions of every session, spilled to memory-mapped Arrow IPC (Feather) files.
+
+    Files are named by content key and written once, uncompressed so they can be
+    mapped. Sessions working on identical data therefore share one file and one
+    mapping, and a frame one session has loaded is handed to the others as is;
+    copy-on-write keeps them from affecting each other. A file is removed once no
+    version references it any more.
+
+    The store also enforces a memory budget across sessions: whenever the columns
+    that tracked sessions hold in memory exceed it, the sessions idle the longest
+    are spilled until the total fits again.
+    """
+
+    def __init__(self, directory=DEFAULT_STORE_DIR, memory_budget=DEFAULT_MEMORY_BUDGET,
+                 idle_seconds=DEFAULT_IDLE_SECONDS):
+        """
+        Initialize the store.
+
+        Parameters:
+        directory (str): Where the files are kept. Created if missing.
+        memory_budget (int): The bytes sessions may hold in memory before idle ones are spilled.
+        idle_seconds (float): How long a session must have been inactive before it can be spilled.
+        """
+        self.directory = directory
+        self.memory_budget = memory_budget
+        self.idle_seconds = idle_seconds
+        self._lock = threading.RLock()
+        self._tables = {}
+        self._references = {}
+        self._frames = weakref.WeakValueDictionary()
+        self._sessions = weakref.WeakSet()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.arrow")
+
+    def __contains__(self, key):
+        return key in self._frames or os.path.exists(self._path(key))
+
+    def share(self, key, df):
+        """
+        Register a frame in use under its content key, so sessions loading that key get this frame.
+
+        Returns:
+        pd.DataFrame: The frame already registered under the key, or df.
+        """
+        with self._lock:
+            shared = self._frames.get(key)
+            if shared is None:
+                self._frames[key] = shared = df
+            return shared
+
+    def load(self, key):
+        """
+        Return the frame stored under a content key.
+
+        A frame some session already has in memory is shared. Otherwise the file is
+        mapped, and numeric columns without nulls are views of the mapping rather
+        than copies. Arrow-backed string columns load back as such, see
+        result_cache.pandas_types.
+
+        Parameters:
+        key (str): The content key.
+
+        Returns:
+        pd.DataFrame: The frame, or None if the key is not stored.
+        """
+        with self._lock:
+            df = self._frames.get(key)
+            if df is not None:
+                return df
+            table = self._tables.get(key)
+            if table is None:
+                try:
+                    table = feather.read_table(self._path(key), memory_map=True)
+                except (FileNotFoundError, pa.ArrowInvalid):
+                    return None
+                if key in self._references:
+                    self._tables[key] = table
+            df = table.to_pandas(split_blocks=True, types_mapper=pandas_types)
+            self._frames[key] = df
+            return df
+
+    def put(self, key, df, owner=None):
+        """
+        Write a frame to its file, unless a file with that content key already exists.
+
+        Frames Arrow cannot represent exactly (non-string or duplicate column labels,
+        mixed-type object columns or sparse columns) are not stored.
+
+        Parameters:
+        key (str): The content key of the frame.
+        df (pd.DataFrame): The frame.
+        owner (object): If given, the file is kept at least until owner is garbage collected.
+
+        Returns:
+        bool: True if the frame is stored.
+        """
+        if not all(isinstance(col, str) for col in df.columns):
+            return False
+        path = self._path(key)
+        with self._lock:
+            if owner is not None:
+                self._references[key] = self._references.get(key, 0) + 1
+            exists = os.path.exists(path)
+        if not exists and not self._write(path, df):
+            if owner is not None:
+                self._release(key)
+            return False
+        if owner is not None:
+            weakref.finalize(owner, self._release, key)
+        return True
+
+    def _write(self, path, df):
+        try:
+            table = _to_table(df)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError, ValueError):
+            return False
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(handle)
+        try:
+            feather.write_feather(table, temporary, compression="uncompressed")
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return True
+
+    def _release(self, key):
+        """
+        Drop one reference to a file, removing the file when it was the last.
+        """
+        with self._lock:
+            count = self._references.get(key, 0) - 1
+            if count > 0:
+                self._references[key] = count
+                return
+            self._references.pop(key, None)
+            self._tables.pop(key, None)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                # Already gone, or still mapped on a platform that cannot delete mapped files.
+                pass
+
+    def track(self, session):
+        """
+        Include a session in the memory budget; it is dropped when garbage collected.
+        """
+        with self._lock:
+            self._sessions.add(session)
+
+    def memory_usage(self):
+        """
+        Return the bytes held in memory by all tracked sessions, counting shared columns once.
+        """
+        seen = set()
+        with self._lock:
+            sessions = list(self._sessions)
+        return sum(session.nbytes(seen) for session in sessions)
+
+    def enforce_budget(self, active=None):
+        """
+        Spill the sessions idle the longest until the memory held by sessions fits the budget.
+
+        Parameters:
+        active (SessionDataset): The session currently running, which is never spilled.
+
+        Returns:
+        int: The number of sessions spilled.
+        """
+        with self._lock:
+            sessions = sorted(self._sessions, key=lambda session: session.last_active, reverse=True)
+        # Measure the most recently active sessions first, so columns they share with idle ones count
+        # towards them; spilling an idle session only frees what it holds alone.
+        seen = set()
+        sizes = [(session, session.nbytes(seen)) for session in sessions]
+        total = sum(size for _, size in sizes)
+        now = time.monotonic()
+        spilled = 0
+        for session, size in reversed(sizes):
+            if total <= self.memory_budget:
+                break
+            if session is active or not size or now - session.last_active < self.idle_seconds:
+                continue
+            session.spill()
+            total -= size
+            spilled += 1
+        return spilled
+
+
+class SessionDataset:
+    """
+    One session's working data: its undo history, and the current frame, column
+    statistics and data view indexes derived from it.
+
+    These are rebuilt from the history on demand, so a DatasetStore can spill an
+    idle session by dropping them and spilling the history's versions to disk.
+    """
+
+    def __init__(self, df, key, label="Loaded data", store=None):
+        """
+        Initialize the session's data.
+
+        Parameters:
+        df (pd.DataFrame): The initial data.
+        key (str): Its content key.
+        label (str): A description of the initial version.
+        store (DatasetStore): If given, the session is tracked by the store's memory
+            budget and its data shared with sessions loading the same key.
+        """
+        self.store = store
+        self.history = CleaningHistory(df, label=label, key=key)
+        self.stats = ColumnStatsIndex()
+        self.view = DataView()
+        self.last_active = time.monotonic()
+        self._frame = None
+        self._frame_version = None
+        self._checked_version = None
+        if store is not None:
+            store.share(key, self.df)
+            store.track(self)
+
+    @property
+    def df(self):
+        """
+        The current version of the data.
+        """
+        with self.history.lock:
+            frame = self._frame
+            if frame is None or self._frame_version != self.history.version_id:
+                frame = self._frame = self.history.current.to_frame()
+                self._frame_version = self.history.version_id
+            return frame
+
+    def column_stats(self):
+        """
+        Return the column statistics of the current version; only changed columns are recomputed.
+        """
+        with self.history.lock:
+            stats = self.stats
+            key = self.history.current.key
+            if stats.version != key:
+                stats.sync(self.df, key)
+            return stats
+
+    def touch(self):
+        """
+        Mark the session as active, and enforce the store's memory budget if the data changed since the last check.
+        """
+        self.last_active = time.monotonic()
+        if self.store is not None and self._checked_version != self.history.version_id:
+            self._checked_version = self.history.version_id
+            self.store.enforce_budget(active=self)
+
+    def nbytes(self, seen=None):
+        """
+        Return the memory held by the session's data, see CleaningHistory.nbytes.
+        """
+        return self.history.nbytes(seen, deep=True)
+
+    def spill(self):
+        """
+        Move the session's data from memory to the store; it is loaded back when next used.
+
+        Returns:
+        int: The number of history versions spilled.
+        """
+        with self.history.lock:
+            # The statistics and view indexes are replaced rather than cleared, as the session's own
+            # thread may still be using them; they are released once it lets go of them.
+            self._frame = None
+            self.stats = ColumnStatsIndex()
+            self.view = DataView()
+            return self.history.spill(self.store)
@@ -0,0 +1,161 @@
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from utils.csv_loader import iter_csv_chunks
+
+DEFAULT_PARTITIONS = 16
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def _row_hashes(keys):
+    """
+    Hash each row of the key columns, treating 0.0 and -0.0 as equal like duplicated() does.
+    """
+    float_positions = [i for i, dtype in enumerate(keys.dtypes) if dtype.kind == "f"]
+    if float_positions:
+        keys = keys.copy(deep=False)
+        for position in float_positions:
+            keys.isetitem(position, keys.iloc[:, position] + 0.0)
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def partition_to_disk(chunks, directory, subset=None, n_partitions=DEFAULT_PARTITIONS):
+    """
+    Hash every row and spill its key columns into on-disk buckets by hash.
+
+    Rows with equal keys always hash to the same bucket, so each bucket can be
+    de-duplicated on its own. Each chunk writes at most one file per bucket,
+    holding the key columns and the global position of each row.
+
+    Parameters:
+    chunks (iterable): DataFrames with the same columns, in row order.
+    directory (str): Where the bucket files are written.
+    subset (list): The key columns. If None, all columns are used.
+    n_partitions (int): The number of buckets.
+
+    Returns:
+    list: For each bucket, the list of its file paths in chunk order.
+    """
+    buckets = [[] for _ in range(n_partitions)]
+    offset = 0
+    for chunk_number, chunk in enumerate(chunks):
+        keys = chunk if subset is None else chunk[subset]
+        hashes = _row_hashes(keys)
+        bucket_of_row = hashes % n_partitions
+        # A stable sort keeps rows in their original order inside each bucket.
+        order = np.argsort(bucket_of_row, kind="stable")
+        bounds = np.searchsorted(bucket_of_row[order], np.arange(n_partitions + 1))
+        for bucket in range(n_partitions):
+            rows = order[bounds[bucket]:bounds[bucket + 1]]
+            if len(rows) == 0:
+                continue
+            path = os.path.join(directory, f"bucket-{bucket:04d}-{chunk_number:06d}.pkl")
+            with open(path, "wb") as handle:
+                pickle.dump((rows + offset, keys.iloc[rows]), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            buckets[bucket].append(path)
+        offset += len(chunk)
+    return buckets
+
+
+def _dedup_bucket(paths, keep):
+    """
+    Return the global positions of the rows a bucket keeps.
+    """
+    positions, keys = [], []
+    for path in paths:
+        with open(path, "rb") as handle:
+            rows, piece = pickle.load(handle)
+        positions.append(rows)
+        keys.append(piece)
+    duplicated = pd.concat(keys, ignore_index=True).duplicated(keep=keep).to_numpy()
+    return np.concatenate(positions)[~duplicated]
+
+
+def deduplicated_positions(chunks, subset=None, keep="first", n_partitions=DEFAULT_PARTITIONS,
+                           max_workers=None, spill_dir=None):
+    """
+    Find the rows that survive de-duplication without holding all keys in memory at once.
+
+    Parameters:
+    chunks (iterable): DataFrames with the same columns, in row order.
+    subset (list): The key columns. If None, all columns are used.
+    keep (str or bool): Which duplicate to keep: 'first', 'last' or False to drop all of them.
+    n_partitions (int): The number of on-disk buckets.
+    max_workers (int): The number of worker processes. If None, one per CPU.
+    spill_dir (str): Where the temporary bucket files go. If None, the system temp directory.
+
+    Returns:
+    np.ndarray: The sorted positions of the rows to keep.
+    """
+    with tempfile.TemporaryDirectory(prefix="dedup-", dir=spill_dir) as directory:
+        buckets = [paths for paths in partition_to_disk(chunks, directory, subset, n_partitions) if paths]
+        if not buckets:
+            return np.array([], dtype=np.int64)
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            kept = list(pool.map(_dedup_bucket, buckets, repeat(keep)))
+    return np.sort(np.concatenate(kept))
+
+
+def drop_duplicates_partitioned(df, subset=None, keep="first", n_partitions=DEFAULT_PARTITIONS,
+                                chunk_rows=DEFAULT_CHUNK_ROWS, max_workers=None, spill_dir=None):
+    """
+    Drop duplicate rows by de-duplicating hash partitions in parallel worker processes.
+
+    The result is identical to df.drop_duplicates(subset=subset, keep=keep), with
+    the original row order and index preserved.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    subset (list): The key columns. If None, all columns are used.
+    keep (str or bool): Which duplicate to keep: 'first', 'last' or False to drop all of them.
+    n_partitions (int): The number of on-disk buckets.
+    chunk_rows (int): The number of rows hashed and spilled at a time.
+    max_workers (int): The number of worker processes. If None, one per CPU.
+    spill_dir (str): Where the temporary bucket files go.
+
+    Returns:
+    pd.DataFrame: The de-duplicated data.
+    """
+    chunks = (df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows))
+    positions = deduplicated_positions(chunks, subset, keep, n_partitions, max_workers, spill_dir)
+    return df.take(positions)
+
+
+def drop_duplicates_csv(source, destination, subset=None, keep="first", n_partitions=DEFAULT_PARTITIONS,
+                        max_workers=None, spill_dir=None):
+    """
+    De-duplicate a CSV file that may be larger than memory into a new CSV file.
+
+    The file is streamed twice: once to partition the keys to disk and find the
+    surviving rows, and once to write those rows out in their original order.
+
+    Parameters:
+    source (str): The input CSV path.
+    destination (str): The output CSV path.
+    subset (list): The key columns. If None, all columns are used.
+    keep (str or bool): Which duplicate to keep: 'first', 'last' or False to drop all of them.
+    n_partitions (int): The number of on-disk buckets.
+    max_workers (int): The number of worker processes. If None, one per CPU.
+    spill_dir (str): Where the temporary bucket files go.
+
+    Returns:
+    int: The number of rows written.
+    """
+    positions = deduplicated_positions(
+        iter_csv_chunks(source), subset, keep, n_partitions, max_workers, spill_dir
+    )
+    offset = 0
+    written = 0
+    for chunk_number, chunk in enumerate(iter_csv_chunks(source)):
+        start, stop = np.searchsorted(positions, [offset, offset + len(chunk)])
+        kept = chunk.take(positions[start:stop] - offset)
+        kept.to_csv(destination, mode="w" if chunk_number == 0 else "a", header=chunk_number == 0, index=False)
+        written += len(kept)
+        offset += len(chunk)
+    return written
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_CATEGORY_THRESHOLD = 0.5
+DEFAULT_SPARSE_THRESHOLD = 0.9
+
+
+def _downcast_integer(series):
+    """
+    Return an integer column in the smallest signed integer dtype that holds all its values.
+    """
+    if series.empty:
+        return series
+    low, high = series.min(), series.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return series.astype(dtype)
+    return series
+
+
+def _downcast_float(series):
+    """
+    Return a float64 column as float32 if that loses no value, otherwise unchanged.
+    """
+    values = series.to_numpy()
+    narrow = values.astype(np.float32)
+    with np.errstate(over="ignore", invalid="ignore"):
+        exact = (narrow.astype(np.float64) == values) | (np.isnan(values) & np.isnan(narrow))
+    return series.astype(np.float32) if exact.all() else series
+
+
+def _compact_text(series, category_threshold):
+    """
+    Return a text column as a categorical if few values repeat often, otherwise as Arrow strings.
+    """
+    count = series.count()
+    if count == 0:
+        return series
+    if series.nunique() <= category_threshold * count:
+        return series.astype("category")
+    return series.astype(pd.StringDtype("pyarrow"))
+
+
+def compact_column(series, category_threshold=DEFAULT_CATEGORY_THRESHOLD, sparse_threshold=DEFAULT_SPARSE_THRESHOLD):
+    """
+    Return a column in the most compact dtype that represents it exactly.
+
+    Parameters:
+    series (pd.Series): The column.
+    category_threshold (float): Text columns whose distinct values are at most this
+        fraction of their non-missing values become categoricals; others become Arrow strings.
+    sparse_threshold (float): Numeric columns with at least this fraction of missing
+        values become sparse. Use a value above 1 to disable.
+
+    Returns:
+    pd.Series: The compacted column, or the input itself if nothing smaller applies.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.SparseDtype) or isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_bool_dtype(dtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+        return _downcast_integer(series)
+    if pd.api.types.is_float_dtype(dtype) and isinstance(dtype, np.dtype):
+        if len(series) and series.isna().mean() >= sparse_threshold:
+            return series.astype(pd.SparseDtype(_downcast_float(series).dtype, np.nan))
+        return _downcast_float(series) if dtype == np.float64 else series
+    if dtype == object and pd.api.types.infer_dtype(series, skipna=True) == "string":
+        return _compact_text(series, category_threshold)
+    return series
+
+
+def optimize_dtypes(df, category_threshold=DEFAULT_CATEGORY_THRESHOLD, sparse_threshold=DEFAULT_SPARSE_THRESHOLD):
+    """
+    Shrink a DataFrame's memory by converting every column to its most compact exact dtype.
+
+    Integers are downcast to the smallest signed width that fits, float64 becomes
+    float32 where that is lossless, mostly missing float columns become sparse,
+    repetitive text becomes categorical and other text becomes Arrow strings.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    category_threshold (float): See compact_column.
+    sparse_threshold (float): See compact_column.
+
+    Returns:
+    tuple: The compacted DataFrame (unchanged columns are shared, not copied) and a
+    report DataFrame with the dtype and bytes of every column before and after.
+    """
+    columns = {position: compact_column(df.iloc[:, position], category_threshold, sparse_threshold)
+               for position in range(df.shape[1])}
+    result = pd.DataFrame(columns, index=df.index, copy=False)
+    result.columns = df.columns
+    return result, dtype_report(df, result)
+
+
+def dtype_report(before, after):
+    """
+    Compare the dtype and memory of every column between two versions of a frame with the same columns.
+
+    Parameters:
+    before (pd.DataFrame): The frame before a dtype conversion.
+    after (pd.DataFrame): The frame after it.
+
+    Returns:
+    pd.DataFrame: One row per column with dtype_before, dtype_after, bytes_before,
+    bytes_after and bytes_saved.
+    """
+    rows = []
+    for position, name in enumerate(after.columns):
+        old, new = before.iloc[:, position], after.iloc[:, position]
+        bytes_before = old.memory_usage(index=False, deep=True)
+        # A column whose dtype did not change was not converted, so it was not measured twice.
+        bytes_after = bytes_before if new.dtype == old.dtype else new.memory_usage(index=False, deep=True)
+        rows.append((name, str(old.dtype), str(new.dtype), bytes_before, bytes_after))
+    report = pd.DataFrame(rows, columns=["column", "dtype_before", "dtype_after", "bytes_before", "bytes_after"])
+    report["bytes_saved"] = report["bytes_before"] - report["bytes_after"]
+    return report.set_index("column")
@@ -0,0 +1,181 @@
+import importlib.util
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.imputation import dense_columns
+
+# format -> (label, file extension, MIME type)
+EXPORT_FORMATS = {
+    "csv": ("CSV", "csv", "text/csv"),
+    "csv.gz": ("CSV (gzip)", "csv.gz", "application/gzip"),
+    "csv.zst": ("CSV (zstd)", "csv.zst", "application/zstd"),
+    "parquet": ("Parquet", "parquet", "application/vnd.apache.parquet"),
+    "feather": ("Feather", "feather", "application/vnd.apache.arrow.file"),
+    "xlsx": ("Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+EXPORT_CHUNK_ROWS = 100_000
+# Exports larger than this are moved from memory to a temporary file on disk.
+SPOOL_MAX_BYTES = 32 * 1024 ** 2
+# Excel sheets hold at most 1,048,576 rows, one of which is the header.
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def available_formats():
+    """
+    Return the export formats whose dependencies are installed; Excel needs openpyxl.
+    """
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "xlsx" or importlib.util.find_spec("openpyxl") is not None]
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield start, df.iloc[start:start + chunk_rows]
+
+
+def _write_csv(df, handle, codec, chunk_rows, on_progress):
+    # Each chunk is compressed on its own; concatenated gzip members and zstd frames decode as one stream.
+    for start, chunk in _chunks(df, chunk_rows):
+        data = chunk.to_csv(index=False, header=start == 0).encode("utf-8")
+        handle.write(data if codec is None else pa.compress(data, codec=codec, asbytes=True))
+        on_progress(start + len(chunk))
+
+
+def _write_arrow(df, handle, export_format, chunk_rows, on_progress):
+    df = dense_columns(df)
+    # The schema is inferred from the whole frame, since one chunk may hold only nulls.
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(handle, schema)
+    else:
+        writer = pa.ipc.new_file(handle, schema, options=pa.ipc.IpcWriteOptions(compression="lz4"))
+    with writer:
+        for start, chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            on_progress(start + len(chunk))
+
+
+def _excel_values(chunk):
+    """
+    Return a chunk as object columns holding only values openpyxl can write.
+    """
+    columns = {}
+    for position in range(chunk.shape[1]):
+        series = chunk.iloc[:, position]
+        if isinstance(series.dtype, pd.DatetimeTZDtype):
+            # Excel has no time zones.
+            series = series.dt.tz_localize(None)
+        series = series.astype(object)
+        columns[position] = series.where(series.notna(), None)
+    return pd.DataFrame(columns, index=chunk.index)
+
+
+def _write_excel(df, handle, chunk_rows, on_progress):
+    from openpyxl import Workbook
+
+    # A write-only workbook streams rows to temporary files instead of keeping every cell in memory.
+    workbook = Workbook(write_only=True)
+    header = [str(col) for col in df.columns]
+    sheet = None
+    for start, chunk in _chunks(df, chunk_rows):
+        for row_number, row in enumerate(_excel_values(chunk).itertuples(index=False, name=None), start=start):
+            if row_number % EXCEL_MAX_ROWS == 0:
+                number = row_number // EXCEL_MAX_ROWS + 1
+                sheet = workbook.create_sheet("Data" if number == 1 else f"Data ({number})")
+                sheet.append(header)
+            sheet.append(row)
+        on_progress(start + len(chunk))
+    if sheet is None:
+        workbook.create_sheet("Data").append(header)
+    workbook.save(handle)
+
+
+def write_export(df, handle, export_format, chunk_rows=EXPORT_CHUNK_ROWS, on_progress=None):
+    """
+    Write a frame to a binary file object a chunk of rows at a time, without its index.
+
+    Only one chunk is ever formatted in memory, so the memory needed does not grow
+    with the size of the output.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    handle (file-like): Where the output is written.
+    export_format (str): One of EXPORT_FORMATS.
+    chunk_rows (int): The number of rows formatted at a time.
+    on_progress (callable): Called with (fraction, message) after every chunk.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {export_format!r}. Options are {', '.join(EXPORT_FORMATS)}.")
+    label = EXPORT_FORMATS[export_format][0]
+
+    def report(rows):
+        if on_progress is not None:
+            on_progress(rows / len(df) if len(df) else 1.0, f"Wrote {rows:,} of {len(df):,} rows as {label}")
+
+    if export_format.startswith("csv"):
+        codec = {"csv": None, "csv.gz": "gzip", "csv.zst": "zstd"}[export_format]
+        _write_csv(df, handle, codec, chunk_rows, report)
+    elif export_format == "xlsx":
+        _write_excel(df, handle, chunk_rows, report)
+    else:
+        _write_arrow(df, handle, export_format, chunk_rows, report)
+
+
+class Export:
+    """
+    A finished export, held in a spooled temporary file.
+    """
+
+    def __init__(self, file, export_format):
+        self.file = file
+        self.format = export_format
+        self.size = file.tell()
+
+    @property
+    def label(self):
+        return EXPORT_FORMATS[self.format][0]
+
+    @property
+    def mime(self):
+        return EXPORT_FORMATS[self.format][2]
+
+    def file_name(self, stem):
+        """
+        Return the download name of the export for a file name stem.
+        """
+        return f"{stem}.{EXPORT_FORMATS[self.format][1]}"
+
+    def read(self):
+        """
+        Return the exported bytes.
+        """
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self):
+        self.file.close()
+
+
+def export_frame(df, export_format, chunk_rows=EXPORT_CHUNK_ROWS, spool_bytes=SPOOL_MAX_BYTES, on_progress=None):
+    """
+    Export a frame to a spooled temporary file, which stays in memory while small and moves to disk when large.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    export_format (str): One of EXPORT_FORMATS.
+    chunk_rows (int): The number of rows formatted at a time.
+    spool_bytes (int): The size above which the file moves to disk.
+    on_progress (callable): Called with (fraction, message) after every chunk.
+
+    Returns:
+    Export: The finished export.
+    """
+    file = tempfile.SpooledTemporaryFile(max_size=spool_bytes, prefix="viswalis-export-")
+    try:
+        write_export(df, file, export_format, chunk_rows, on_progress)
+    except BaseException:
+        file.close()
+        raise
+    return Export(file, export_format)
@@ -0,0 +1,282 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+def _numpy_values(series):
+    """
+    Return the NumPy array behind a column, or None for extension dtypes.
+    """
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy(copy=False)
+    return None
+
+
+def _same_data(old, new):
+    """
+    Return True if two columns are backed by the same, unmodified data.
+    """
+    if old is new:
+        return True
+    if len(old) != len(new) or old.dtype != new.dtype:
+        return False
+    old_values, new_values = _numpy_values(old), _numpy_values(new)
+    if old_values is None or new_values is None:
+        return old.array is new.array
+    return np.may_share_memory(old_values, new_values)
+
+
+def _detach(series):
+    """
+    Return a column that does not pin a larger 2-D block in memory.
+
+    Columns cut out of a consolidated block keep the whole block alive, so those
+    are copied on their own. Columns that already own their data are kept as is.
+    """
+    values = _numpy_values(series)
+    if values is not None and values.base is not None and values.base.size > values.size:
+        return series.copy()
+    return series
+
+
+class _Version:
+    """
+    One entry of the history: the columns of a frame, stored one Series per column.
+
+    A version with a content key can be spilled to a DatasetStore, which drops its
+    columns from memory; they are loaded back from the store the next time they are used.
+    Spilling and loading hold the history's lock, as another session's thread may spill.
+    """
+
+    def __init__(self, label, names, index, columns, key=None, steps=None, lock=None):
+        self.label = label
+        self.key = key
+        # The ReplayStep entries that produced this version from the previous one, if known.
+        self.steps = steps
+        self.names = names
+        self.index = index
+        self._columns = columns
+        self.store = None
+        self._lock = threading.RLock() if lock is None else lock
+
+    @property
+    def spilled(self):
+        return self._columns is None
+
+    @property
+    def columns(self):
+        with self._lock:
+            if self._columns is None:
+                df = self.store.load(self.key)
+                self.index = df.index
+                self._columns = [df.iloc[:, position] for position in range(df.shape[1])]
+            return self._columns
+
+    def spill(self, store):
+        """
+        Persist the version to a DatasetStore and drop its columns from memory.
+
+        Returns:
+        bool: True if the version was spilled; versions without a key, or that the
+        store cannot represent, stay in memory.
+        """
+        with self._lock:
+            if self._columns is None or self.key is None:
+                return False
+            if not store.put(self.key, self.to_frame(), owner=self if self.store is None else None):
+                return False
+            self.store = store
+            self._columns = None
+            return True
+
+    def to_frame(self):
+        """
+        Assemble the stored columns into a DataFrame without copying them.
+        """
+        with self._lock:
+            columns, index = self.columns, self.index
+        df = pd.DataFrame(dict(enumerate(columns)), index=index, copy=False)
+        df.columns = self.names
+        return df
+
+
+class CleaningHistory:
+    """
+    Undo/redo history of a DataFrame that shares unchanged columns between versions.
+
+    Each recorded version holds one Series per column. A column that an operation
+    did not touch is the same object as in the previous version, so keeping the
+    history only costs memory for the columns that actually changed. This relies on
+    pandas copy-on-write, which guarantees shared columns are never modified in place.
+    """
+
+    def __init__(self, df, label="Loaded data", max_versions=50, key=None):
+        """
+        Initialize the history with the original DataFrame.
+
+        Parameters:
+        df (pd.DataFrame): The initial version.
+        label (str): A description of the initial version.
+        max_versions (int): The maximum number of versions kept; the oldest are discarded first.
+        key (str): An optional content key identifying the initial version.
+        """
+        self.max_versions = max_versions
+        # Guards the versions against a DatasetStore spilling them from another session's thread.
+        self.lock = threading.RLock()
+        self.versions = [self._snapshot(df, label, None, key, steps=[])]
+        # Set once the initial version is discarded, after which the steps from it are no longer known.
+        self.truncated = False
+        self.position = 0
+        self.version_id = 0
+
+    def _snapshot(self, df, label, previous, key=None, steps=None):
+        """
+        Build a version from a DataFrame, reusing the previous version's unchanged columns.
+        """
+        same_index = previous is not None and (df.index is previous.index or df.index.equals(previous.index))
+        previous_columns = dict(zip(previous.names, previous.columns)) if same_index else {}
+        columns = []
+        for position, name in enumerate(df.columns):
+            series = df.iloc[:, position]
+            old = previous_columns.get(name)
+            if old is not None and _same_data(old, series):
+                columns.append(old)
+            else:
+                columns.append(_detach(series))
+        index = previous.index if same_index else df.index
+        return _Version(label, list(df.columns), index, columns, key, steps, self.lock)
+
+    @property
+    def current(self):
+        """
+        The version the history is currently positioned at.
+        """
+        return self.versions[self.position]
+
+    @property
+    def can_undo(self):
+        return self.position > 0
+
+    @property
+    def can_redo(self):
+        return self.position < len(self.versions) - 1
+
+    def record(self, df, label, key=None, steps=None):
+        """
+        Record a new version, discarding any versions that could have been redone.
+
+        Parameters:
+        df (pd.DataFrame): The new version of the data.
+        label (str): A description of the operation that produced it.
+        key (str): An optional content key identifying the new version.
+        steps (list): The ReplayStep entries that produced it, see DataCleaner.replay.
+
+        Returns:
+        pd.DataFrame: The recorded version, built from the shared columns.
+        """
+        with self.lock:
+            version = self._snapshot(df, label, self.current, key, steps)
+            unchanged = version.names == self.current.names and version.index is self.current.index and all(
+                new is old for new, old in zip(version.columns, self.current.columns)
+            )
+            if unchanged:
+                # The steps changed nothing here, but may still change appended rows.
+                if steps and self.current.steps is not None:
+                    self.current.steps = self.current.steps + steps
+                return self.current.to_frame()
+
+            del self.versions[self.position + 1:]
+            self.versions.append(version)
+            if len(self.versions) > self.max_versions:
+                del self.versions[0]
+                self.truncated = True
+            self.position = len(self.versions) - 1
+            self.version_id += 1
+            return version.to_frame()
+
+    def replay_log(self):
+        """
+        Return every step from the initial version to the current one, e.g. to replay them on appended rows.
+
+        Returns:
+        list: The ReplayStep entries in order, or None if the steps of some version are not known.
+        """
+        with self.lock:
+            if self.truncated:
+                return None
+            log = []
+            # The initial version has no steps of its own, but collects steps that left it unchanged.
+            for version in self.versions[:self.position + 1]:
+                if version.steps is None:
+                    return None
+                log.extend(version.steps)
+            return log
+
+    def undo(self):
+        """
+        Step back to the previous version.
+
+        Returns:
+        pd.DataFrame: The previous version of the data.
+        """
+        with self.lock:
+            if self.can_undo:
+                self.position -= 1
+                self.version_id += 1
+            return self.current.to_frame()
+
+    def redo(self):
+        """
+        Step forward to the next version.
+
+        Returns:
+        pd.DataFrame: The next version of the data.
+        """
+        with self.lock:
+            if self.can_redo:
+                self.position += 1
+                self.version_id += 1
+            return self.current.to_frame()
+
+    def labels(self):
+        """
+        Return the labels of all versions, oldest first.
+        """
+        return [version.label for version in self.versions]
+
+    def spill(self, store):
+        """
+        Spill every version to a DatasetStore, see _Version.spill.
+
+        Returns:
+        int: The number of versions spilled.
+        """
+        with self.lock:
+            return sum(version.spill(store) for version in self.versions)
+
+    def nbytes(self, seen=None, deep=False):
+        """
+        Return the memory held by the history, counting shared columns once.
+
+        Parameters:
+        seen (set): Identifiers of column data already counted, e.g. by other histories; updated in place.
+        deep (bool): Whether to include the Python objects referenced by object columns.
+
+        Returns:
+        int: The bytes held by columns in memory; spilled versions count as zero.
+        """
+        with self.lock:
+            seen = set() if seen is None else seen
+            total = 0
+            for version in self.versions:
+                for series in version._columns or ():
+                    values = _numpy_values(series)
+                    if values is None:
+                        key = id(series.array)
+                    else:
+                        key = id(values.base if values.base is not None else values)
+                    if key not in seen:
+                        seen.add(key)
+                        total += series.memory_usage(index=False, deep=deep)
+            return total
@@ -0,0 +1,310 @@
+import datetime
+import numbers
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils.shards import fill_partitions
+
+IMPUTATION_STRATEGIES = ("mean", "median", "mode", "fill")
+
+# Plan keys that select a group of columns by dtype rather than by name.
+DTYPE_GROUPS = {
+    "number": [np.number],
+    "datetime": ["datetime", "datetimetz"],
+    "timedelta": ["timedelta"],
+    "bool": ["bool"],
+    "category": ["category"],
+    "object": ["object", "string"],
+}
+
+
+def columns_of_dtype(df, include):
+    """
+    Return the names of the columns matching select_dtypes(include=...) without copying any data.
+    """
+    return df.iloc[:0].select_dtypes(include=include).columns
+
+
+def dense_columns(df):
+    """
+    Return the frame with any sparse columns converted to dense ones, for reductions sparse arrays lack.
+    """
+    sparse = [position for position, dtype in enumerate(df.dtypes) if isinstance(dtype, pd.SparseDtype)]
+    if not sparse:
+        return df
+    df = df.copy(deep=False)
+    for position in sparse:
+        df.isetitem(position, df.iloc[:, position].sparse.to_dense())
+    return df
+
+
+def _parse_strategy(key, value):
+    """
+    Normalize a plan entry to a (strategy, fill_value) pair.
+    """
+    if isinstance(value, (tuple, list)):
+        strategy, fill_value = value
+    else:
+        strategy, fill_value = value, None
+    if strategy not in IMPUTATION_STRATEGIES:
+        raise ValueError(f"Invalid imputation strategy {strategy!r} for {key!r}.")
+    if strategy == "fill" and fill_value is None:
+        raise ValueError(f"A fill value is required for {key!r}.")
+    return strategy, fill_value
+
+
+def resolve_plan(df, plan):
+    """
+    Expand an imputation plan into one (strategy, fill_value) pair per column.
+
+    Plan keys are column names or dtype groups ('number', 'datetime', 'timedelta',
+    'bool', 'category', 'object'). Values are 'mean', 'median', 'mode' or a
+    ('fill', value) tuple. Column names take precedence over dtype groups.
+
+    Parameters:
+    df (pd.DataFrame): The data the plan applies to.
+    plan (dict): The imputation plan.
+
+    Returns:
+    dict: Column name -> (strategy, fill_value), in column order.
+    """
+    resolved = {}
+    for key, value in plan.items():
+        if key in df.columns:
+            continue
+        if key not in DTYPE_GROUPS:
+            raise KeyError(f"{key!r} is neither a column nor a dtype group.")
+        entry = _parse_strategy(key, value)
+        for col in columns_of_dtype(df, DTYPE_GROUPS[key]):
+            resolved[col] = entry
+    for key, value in plan.items():
+        if key in df.columns:
+            resolved[key] = _parse_strategy(key, value)
+    return {col: resolved[col] for col in df.columns if col in resolved}
+
+
+def mode_value(series):
+    """
+    Return the most frequent non-missing value of a column using hash counting.
+
+    Values are counted in a single hash-table pass with value_counts, which avoids
+    building and sorting the full mode table. Ties go to the smallest value, like
+    Series.mode().
+
+    Parameters:
+    series (pd.Series): The column.
+
+    Returns:
+    any: The mode, or NaN if the column has no values.
+    """
+    return mode_of_counts(series.value_counts(sort=False, dropna=True))
+
+
+def mode_of_counts(counts):
+    """
+    Return the most frequent value given the value counts of a column, see mode_value.
+
+    Counts of separate parts of a column can be added up first, e.g. when rows are appended.
+    """
+    if len(counts) == 0:
+        return np.nan
+    candidates = counts.index[counts.to_numpy() == counts.max()]
+    if len(candidates) == 1:
+        return candidates[0]
+    try:
+        return candidates.sort_values()[0]
+    except TypeError:
+        return candidates[0]
+
+
+def arrow_fill_kind(arrow_type):
+    """
+    Return the kind of value an Arrow column holds, for coerce_fill_value; None if any value goes.
+    """
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    if pa.types.is_boolean(arrow_type):
+        return "bool"
+    if pa.types.is_integer(arrow_type):
+        return "integer"
+    if pa.types.is_floating(arrow_type):
+        return "float"
+    if pa.types.is_timestamp(arrow_type):
+        return "datetime"
+    if pa.types.is_duration(arrow_type):
+        return "timedelta"
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return "string"
+    return None
+
+
+# pd.api.types.infer_dtype result -> the kind of value an object column holds.
+_INFERRED_KINDS = {"string": "string", "boolean": "bool", "integer": "integer", "floating": "float",
+                   "mixed-integer-float": "float", "datetime64": "datetime", "datetime": "datetime",
+                   "timedelta64": "timedelta", "timedelta": "timedelta"}
+
+
+def fill_kind(series):
+    """
+    Return the kind of value a pandas column holds, for coerce_fill_value; None if any value goes.
+
+    Object columns are classified by their values, as Arrow types them when the
+    arrow backend converts the column.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        series, dtype = dtype.categories, dtype.categories.dtype
+    if isinstance(dtype, pd.ArrowDtype):
+        return arrow_fill_kind(dtype.pyarrow_dtype)
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "integer"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        return "timedelta"
+    if isinstance(dtype, pd.StringDtype):
+        return "string"
+    if dtype == object:
+        return _INFERRED_KINDS.get(pd.api.types.infer_dtype(series, skipna=True))
+    return None
+
+
+def coerce_fill_value(col, kind, value):
+    """
+    Convert a fill value to the kind of value its column holds, the same way for every backend.
+
+    Text is parsed: as a number for numeric columns, as a timestamp or duration
+    for datetime and timedelta columns, and 'true' or 'false' for boolean
+    columns. Other values must already be of the column's kind; text columns
+    only take text.
+
+    Parameters:
+    col (str): The column name, for the error message.
+    kind (str): The column's kind, see fill_kind.
+    value (any): The fill value.
+
+    Returns:
+    any: The converted value.
+    """
+    try:
+        if kind is None:
+            return value
+        if kind == "string":
+            if isinstance(value, str):
+                return value
+        elif kind == "bool":
+            if isinstance(value, (bool, np.bool_)):
+                return bool(value)
+            if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+                return value.strip().lower() == "true"
+        elif kind in ("integer", "float"):
+            if isinstance(value, str):
+                value = pd.to_numeric(value.strip())
+            if isinstance(value, numbers.Real) and not isinstance(value, (bool, np.bool_)):
+                if kind == "float" or float(value).is_integer():
+                    return value
+        elif kind == "datetime":
+            if isinstance(value, (str, datetime.datetime, np.datetime64)):
+                return pd.Timestamp(value)
+        elif isinstance(value, (str, datetime.timedelta, np.timedelta64)):
+            return pd.Timedelta(value)
+    except ValueError:
+        pass
+    raise TypeError(f"Cannot fill column {col!r} of {kind} values with {value!r}.")
+
+
+def compute_fill_values(df, resolved, max_workers=None):
+    """
+    Compute the fill value of every column in a resolved plan in one batched pass.
+
+    All mean columns share one DataFrame.mean() call and all median columns one
+    DataFrame.median() call; mode columns are counted individually. These tasks
+    are independent and run on a thread pool.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    resolved (dict): The output of resolve_plan.
+    max_workers (int): The thread pool size. If None, the executor default is used.
+
+    Returns:
+    dict: Column name -> fill value. Columns without a usable statistic are left out.
+    """
+    by_strategy = {strategy: [] for strategy in IMPUTATION_STRATEGIES}
+    for col, (strategy, _) in resolved.items():
+        by_strategy[strategy].append(col)
+
+    averageable = set(columns_of_dtype(df, [np.number, "datetime", "timedelta"]))
+    for strategy in ("mean", "median"):
+        invalid = [col for col in by_strategy[strategy] if col not in averageable]
+        if invalid:
+            raise ValueError(f"Cannot compute the {strategy} of non-numeric columns: {invalid}")
+
+    values = {
+        col: coerce_fill_value(col, fill_kind(df[col]), fill_value)
+        for col, (strategy, fill_value) in resolved.items()
+        if strategy == "fill"
+    }
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        batched = {
+            strategy: pool.submit(getattr(dense_columns(df[by_strategy[strategy]]), strategy))
+            for strategy in ("mean", "median")
+            if by_strategy[strategy]
+        }
+        modes = {col: pool.submit(mode_value, df[col]) for col in by_strategy["mode"]}
+        for future in batched.values():
+            values.update(future.result().to_dict())
+        values.update({col: future.result() for col, future in modes.items()})
+
+    return {col: value for col, value in values.items() if not (np.isscalar(value) and pd.isna(value))}
+
+
+def impute_columns(df, plan, max_workers=None, partitions=None):
+    """
+    Fill missing values column by column according to an imputation plan.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    plan (dict): The imputation plan, see resolve_plan.
+    max_workers (int): The thread pool size for computing statistics.
+    partitions (list): If given, row slices to fill in parallel, see shards.fill_partitions.
+        Statistics are still computed over all rows.
+
+    Returns:
+    pd.DataFrame: The imputed data. Columns without missing values are shared, not copied.
+    """
+    resolved = resolve_plan(df, plan)
+    # Only columns that actually have missing values need statistics or a fill.
+    missing = df[list(resolved)].isna().any()
+    resolved = {col: entry for col, entry in resolved.items() if missing[col]}
+    if not resolved:
+        return df
+    values = compute_fill_values(df, resolved, max_workers=max_workers)
+    widened = {col: _widen_for_fill(df[col], value) for col, value in values.items()}
+    widened = {col: series for col, series in widened.items() if series is not None}
+    if widened:
+        df = df.copy(deep=False)
+        for col, series in widened.items():
+            df[col] = series
+    # Object columns stay object, as they do with the arrow backend, rather than being downcast once filled.
+    with pd.option_context("future.no_silent_downcasting", True):
+        if partitions is not None:
+            return fill_partitions(df, values, partitions, max_workers=max_workers)
+        return df.fillna(values)
+
+
+def _widen_for_fill(series, value):
+    """
+    Return the column in a dtype that can hold the fill value, or None if it already can.
+
+    A categorical column gains the value as a category.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        return series.cat.add_categories([value])
+    return None
@@ -0,0 +1,309 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from utils.cleaning_plan import PlanStep
+from utils.dtypes import compact_column
+from utils.imputation import columns_of_dtype, mode_of_counts, resolve_plan
+from utils.quantile_sketch import KLLSketch, sketch_series
+from utils.result_cache import content_hash
+from utils.type_inference import parse_column
+
+# Steps whose effect on a row does not depend on any other row, so they replay as they are.
+ROW_LOCAL_STEPS = ("standardize_columns", "drop_columns")
+
+
+class FileFingerprint:
+    """
+    What is remembered of a loaded CSV file to recognize a later upload that only appends rows to it.
+    """
+
+    def __init__(self, data, rows):
+        """
+        Parameters:
+        data (bytes): The file's content.
+        rows (int): The number of rows parsed from it.
+        """
+        self.size = len(data)
+        self.key = content_hash(data)
+        self.rows = rows
+        self.complete_line = data[-1:] == b"\n"
+
+    def append_offset(self, data):
+        """
+        Return where the appended rows start if data is this file with rows added at the end.
+
+        The new content must be longer, and its first size bytes must hash to the
+        fingerprinted content. The old file must end with a line break, so no row
+        was cut off.
+
+        Parameters:
+        data (bytes): The content of the new upload.
+
+        Returns:
+        int: The byte offset of the first appended row, or None if data is not an append.
+        """
+        if not self.complete_line or len(data) <= self.size:
+            return None
+        if content_hash(memoryview(data)[:self.size]) != self.key:
+            return None
+        return self.size
+
+
+class ReplayStep:
+    """
+    An executed DataCleaner step, with the statistics of its input needed to replay it on appended rows.
+
+    The statistics are mergeable: sums and counts for means, KLL sketches for
+    medians and IQR bounds, value counts for modes, hashes of the kept rows for
+    de-duplication. Replaying the step on new rows merges their statistics in, so
+    the statistics always cover every row seen, without revisiting the old rows.
+    """
+
+    def __init__(self, step, state=None, incremental=True):
+        """
+        Parameters:
+        step (PlanStep): The executed step.
+        state (any): Its mergeable statistics; None for row-local steps.
+        incremental (bool): False if the step can only be replayed on the whole data.
+        """
+        self.step = step
+        self.state = state
+        self.incremental = incremental
+
+    def __repr__(self):
+        return f"ReplayStep({self.step!r}, incremental={self.incremental})"
+
+
+def row_hashes(df, subset=None):
+    """
+    Return a 64-bit hash of every row's values in the given columns.
+
+    Numbers are hashed as floats, so a row hashes the same whether its column
+    became float because appended rows brought missing values or not.
+    """
+    df = df if subset is None else df[subset]
+    numeric = [col for col, dtype in df.dtypes.items()
+               if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+               and not isinstance(dtype, pd.CategoricalDtype)]
+    if numeric:
+        df = df.astype(dict.fromkeys(numeric, "float64"))
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def first_new_rows(hashes, seen):
+    """
+    Return the mask of rows whose hash is neither among the seen hashes nor on an earlier row.
+
+    Parameters:
+    hashes (np.ndarray): The row hashes of the new rows, see row_hashes.
+    seen (np.ndarray): The sorted unique hashes of the rows kept so far.
+    """
+    first = np.zeros(len(hashes), dtype=bool)
+    first[np.unique(hashes, return_index=True)[1]] = True
+    return first & ~np.isin(hashes, seen, assume_unique=False)
+
+
+def _imputation_plan(step, df):
+    """
+    Return the imputation plan a missing-value step applies, mirroring DataCleaner._handle_missing_values.
+    """
+    if step.name == "impute":
+        return step.params["plan"]
+    strategy, columns = step.params["strategy"], step.params["columns"]
+    if columns is None and strategy in ("mean", "median"):
+        columns = columns_of_dtype(df, [np.number, "datetime", "timedelta"])
+    elif columns is None:
+        columns = df.columns
+    entry = ("fill", step.params["fill_value"]) if strategy == "fill" else strategy
+    return {col: entry for col in columns}
+
+
+def _imputation_state(plan, df):
+    """
+    Summarize every imputed column so its statistic can be updated with more rows.
+
+    Returns:
+    dict: Column name -> ('fill', value), ('mean', sum, count), ('median', KLLSketch)
+    or ('mode', value counts); None if a statistic cannot be merged.
+    """
+    summaries = {}
+    for col, (strategy, fill_value) in resolve_plan(df, plan).items():
+        series = df[col]
+        if strategy == "fill":
+            summaries[col] = ("fill", fill_value)
+        elif strategy == "mode":
+            summaries[col] = ("mode", series.value_counts(sort=False, dropna=True))
+        elif not pd.api.types.is_numeric_dtype(series.dtype):
+            # Means and medians of dates are not kept as mergeable sums and sketches.
+            return None
+        elif strategy == "mean":
+            summaries[col] = ("mean", float(series.sum()), int(series.count()))
+        else:
+            summaries[col] = ("median", sketch_series(series))
+    return summaries
+
+
+def _merge_imputation(summaries, df):
+    """
+    Add the rows of df to imputation summaries.
+
+    Returns:
+    tuple: The merged summaries, and the fill value of every column.
+    """
+    merged, values = {}, {}
+    for col, summary in summaries.items():
+        series = df[col]
+        if summary[0] == "fill":
+            merged[col] = summary
+            values[col] = summary[1]
+        elif summary[0] == "mode":
+            counts = summary[1].add(series.value_counts(sort=False, dropna=True), fill_value=0)
+            merged[col] = ("mode", counts)
+            values[col] = mode_of_counts(counts)
+        elif summary[0] == "mean":
+            total, count = summary[1] + float(series.sum()), summary[2] + int(series.count())
+            merged[col] = ("mean", total, count)
+            values[col] = total / count if count else np.nan
+        else:
+            sketch = KLLSketch(summary[1].k).merge(summary[1]).merge(sketch_series(series, summary[1].k))
+            merged[col] = ("median", sketch)
+            values[col] = sketch.quantile(0.5)
+    values = {col: value for col, value in values.items() if not (np.isscalar(value) and pd.isna(value))}
+    return merged, values
+
+
+def capture_step(step, before, after, rows=None, type_report=None):
+    """
+    Record an executed step with the mergeable statistics of its input.
+
+    Parameters:
+    step (PlanStep): The step.
+    before (pd.DataFrame): The data it was applied to.
+    after (pd.DataFrame): The data it produced.
+    rows (np.ndarray): For a fused row filter, the mask of the input rows it saw.
+    type_report (pd.DataFrame): For infer_types, the report of the run.
+
+    Returns:
+    ReplayStep: The step and its statistics.
+    """
+    name, params = step.name, step.params
+    if name in ROW_LOCAL_STEPS:
+        return ReplayStep(step)
+    if name == "handle_missing_values" and params["strategy"] == "drop":
+        return ReplayStep(step)
+    if name in ("handle_missing_values", "impute"):
+        summaries = _imputation_state(_imputation_plan(step, before), before)
+        return ReplayStep(step, summaries, incremental=summaries is not None)
+    if name == "remove_outliers":
+        if params.get("sketches") is not None:
+            # Sketched bounds are fixed already.
+            return ReplayStep(step)
+        columns = params["columns"]
+        if columns is None:
+            columns = columns_of_dtype(before, [np.number])
+        data = before if rows is None else before[rows]
+        return ReplayStep(step, {col: sketch_series(data[col]) for col in columns})
+    if name == "drop_duplicates" and params["keep"] == "first":
+        return ReplayStep(step, np.unique(row_hashes(after, params["subset"])))
+    if name == "infer_types" and type_report is not None:
+        converted = type_report[type_report["converted"]]
+        return ReplayStep(step, {col: (row["kind"], row["format"]) for col, row in converted.iterrows()})
+    if name == "optimize_dtypes" and not any(isinstance(dtype, pd.SparseDtype) for dtype in after.dtypes):
+        return ReplayStep(step, after.dtypes.to_dict())
+    return ReplayStep(step, incremental=False)
+
+
+def replay_step(entry, df):
+    """
+    Prepare one recorded step for the appended rows, merging their statistics into the step's.
+
+    Parameters:
+    entry (ReplayStep): The recorded step.
+    df (pd.DataFrame): The appended rows, as they are when the step runs.
+
+    Returns:
+    tuple: The PlanStep to run on the appended rows (None if the step is applied
+    by apply_replay instead) and the merged statistics.
+    """
+    step, state = entry.step, entry.state
+    if step.name in ("handle_missing_values", "impute") and state is not None:
+        merged, values = _merge_imputation(state, df)
+        return PlanStep("impute", plan={col: ("fill", value) for col, value in values.items()}, max_workers=None), merged
+    if step.name == "remove_outliers" and state is not None:
+        merged = {
+            col: KLLSketch(sketch.k).merge(sketch).merge(sketch_series(df[col], sketch.k))
+            for col, sketch in state.items()
+        }
+        return PlanStep("remove_outliers", columns=list(merged), sketches=merged), merged
+    if step.name in ("drop_duplicates", "infer_types", "optimize_dtypes"):
+        return None, state
+    return step, state
+
+
+def _replay_dtype(series, dtype):
+    """
+    Return the dtype an appended column is cast to when the old rows were optimized to dtype.
+
+    The old dtype is kept if it holds every new value exactly. Otherwise the
+    smallest dtype holding the old and the new values is returned, and append_rows
+    widens the old rows to it, so no value overflows or loses precision.
+    """
+    if not (isinstance(dtype, np.dtype) and isinstance(series.dtype, np.dtype)):
+        return dtype
+    if dtype.kind not in "iuf" or series.dtype.kind not in "iuf":
+        return dtype
+    values = series.to_numpy()
+    with np.errstate(all="ignore"):
+        narrow = values.astype(dtype)
+        exact = (narrow.astype(values.dtype) == values) | (pd.isna(values) & pd.isna(narrow))
+    if exact.all():
+        return dtype
+    return np.result_type(dtype, compact_column(series, sparse_threshold=2).dtype)
+
+
+def apply_replay(entry, df):
+    """
+    Apply a recorded de-duplication, type inference or dtype optimization to appended rows.
+
+    Rows duplicating a kept row, old or new, are dropped; columns are parsed with
+    the parsers chosen for the old rows; dtypes are cast to the old rows' dtypes,
+    or to wider ones where new values do not fit them, see _replay_dtype.
+
+    Returns:
+    tuple: The transformed rows and the merged statistics.
+    """
+    step, state = entry.step, entry.state
+    if step.name == "drop_duplicates":
+        hashes = row_hashes(df, step.params["subset"])
+        keep = first_new_rows(hashes, state)
+        return df[keep], np.union1d(state, hashes[keep])
+    if step.name == "infer_types":
+        df = df.copy(deep=False)
+        for col, (kind, date_format) in state.items():
+            df[col] = parse_column(df[col], kind, date_format)
+        return df, state
+    merged = {col: _replay_dtype(df[col], dtype) for col, dtype in state.items()}
+    # New rows may bring new categories; append_rows unions them with the old ones.
+    dtypes = {col: "category" if isinstance(dtype, pd.CategoricalDtype) else dtype for col, dtype in merged.items()}
+    return df.astype(dtypes), merged
+
+
+def append_rows(df, tail):
+    """
+    Concatenate cleaned appended rows to the cleaned old rows.
+
+    Categorical columns stay categorical, with the union of both sides' categories.
+
+    Returns:
+    pd.DataFrame: The combined rows.
+    """
+    if list(df.columns) != list(tail.columns):
+        raise ValueError("The appended rows do not have the same columns after cleaning.")
+    combined = pd.concat([df, tail])
+    for position, col in enumerate(df.columns):
+        old, new = df.iloc[:, position], tail.iloc[:, position]
+        if isinstance(old.dtype, pd.CategoricalDtype) and isinstance(new.dtype, pd.CategoricalDtype):
+            values = union_categoricals([old.array, new.array])
+            combined.isetitem(position, pd.Series(values, index=combined.index, name=col))
+    return combined
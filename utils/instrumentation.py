@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import resource
+import threading
+import time
+
+import pandas as pd
+
+logger = logging.getLogger("viswalis.cleaning")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_memory():
+    """
+    Return the resident memory of this process in bytes.
+
+    Read from /proc on Linux; elsewhere the peak resident memory is the best available estimate.
+    """
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class OperationTimer:
+    """
+    Measure the wall time, CPU time and resident memory change of a block of code.
+
+    CPU time is process-wide, so it includes worker threads the operation starts.
+    """
+
+    def __enter__(self):
+        self.memory = process_memory()
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall_seconds = time.perf_counter() - self.wall
+        self.cpu_seconds = time.process_time() - self.cpu
+        self.memory_delta = process_memory() - self.memory
+        return False
+
+
+def logging_hook(level=logging.INFO, log=logger):
+    """
+    Return a hook that logs every operation entry.
+    """
+    def hook(entry):
+        log.log(
+            level, "%s: %.3fs wall, %.3fs cpu, %+.1f MB, %s -> %s rows, %s cells modified%s",
+            entry["step"], entry["wall_seconds"], entry["cpu_seconds"], entry["memory_delta_mb"],
+            entry["rows_in"], entry["rows_out"], entry["cells_modified"], " (cached)" if entry["cached"] else "",
+        )
+    return hook
+
+
+class ProfileCollector:
+    """
+    A hook that keeps every operation entry in memory, e.g. for one app session.
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self.entries = []
+        self._lock = threading.Lock()
+
+    def __call__(self, entry):
+        with self._lock:
+            self.entries.append(entry)
+            del self.entries[:-self.max_entries]
+
+    def to_frame(self):
+        """
+        Return the entries as a DataFrame, one row per operation.
+        """
+        with self._lock:
+            return pd.DataFrame(self.entries)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+
+class JsonLinesHook:
+    """
+    A hook that appends every operation entry to a JSON-lines file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, entry):
+        line = json.dumps(entry, default=str)
+        with self._lock, open(self.path, "a") as handle:
+            handle.write(line + "\n")
@@ -0,0 +1,146 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job's work function when the job has been cancelled.
+    """
+
+
+class Job:
+    """
+    A unit of background work with its progress, result and the data version it belongs to.
+
+    The work function is called with an on_progress(fraction, message) callback.
+    Cancellation is cooperative: after cancel() the next progress report raises
+    JobCancelled inside the work function.
+    """
+
+    def __init__(self, job_id, label, version=None, kind=None):
+        self.id = job_id
+        self.label = label
+        self.version = version
+        self.kind = kind
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def report(self, fraction, message=None):
+        """
+        Record progress from inside the work function, and stop it if the job was cancelled.
+
+        Parameters:
+        fraction (float): The fraction of the work done, between 0 and 1.
+        message (str): What the job is doing.
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled(self.label)
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+    def cancel(self):
+        """
+        Ask the job to stop. A queued job never starts, a running one stops at its next progress report.
+        """
+        self._cancelled.set()
+        if self.future is not None and self.future.cancel():
+            self._finish("cancelled")
+
+    def _finish(self, status, result=None, error=None):
+        # The status is set last, so a job seen as finished always has its result.
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        self.status = status
+
+    def _run(self, function, args, kwargs):
+        if self._cancelled.is_set():
+            self._finish("cancelled")
+            return
+        self.status = "running"
+        try:
+            result = function(*args, on_progress=self.report, **kwargs)
+        except JobCancelled:
+            self._finish("cancelled")
+        except Exception as e:
+            self._finish("failed", error=e)
+        else:
+            self.progress = 1.0
+            self._finish("done", result=result)
+
+
+class JobQueue:
+    """
+    Runs jobs on a worker pool outside the Streamlit script thread and keeps track of them.
+
+    Several queues, e.g. one per session, can share one executor so the total
+    number of worker threads stays bounded.
+    """
+
+    def __init__(self, max_workers=None, executor=None):
+        """
+        Initialize the queue.
+
+        Parameters:
+        max_workers (int): The size of the worker pool created when no executor is given.
+        executor (concurrent.futures.Executor): A shared worker pool to submit jobs to.
+        """
+        self.executor = executor if executor is not None else ThreadPoolExecutor(max_workers=max_workers)
+        self.jobs = {}
+        self._ids = itertools.count(1)
+
+    def submit(self, function, *args, label="Job", version=None, kind=None, **kwargs):
+        """
+        Queue function(*args, on_progress=..., **kwargs) for execution.
+
+        Parameters:
+        function (callable): The work to do. It must accept an on_progress keyword argument.
+        label (str): A description shown to the user.
+        version (str): The data version the result belongs to, e.g. a history key.
+        kind (str): What the result is, so the caller knows how to use it.
+
+        Returns:
+        Job: The queued job.
+        """
+        job = Job(next(self._ids), label, version, kind)
+        self.jobs[job.id] = job
+        job.future = self.executor.submit(job._run, function, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def active(self):
+        """
+        Return the jobs that are queued or running, oldest first.
+        """
+        return [job for job in self.jobs.values() if not job.finished]
+
+    def finished(self):
+        """
+        Return the jobs that have finished, oldest first.
+        """
+        return [job for job in self.jobs.values() if job.finished]
+
+    def pop(self, job_id):
+        """
+        Stop tracking a job and return it.
+        """
+        return self.jobs.pop(job_id, None)
+
+    def cancel_all(self):
+        for job in self.active():
+            job.cancel()
@@ -0,0 +1,269 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 64
+SHINGLE_SIZE = 3
+# Rows are hashed in chunks of this many, so temporary arrays stay small.
+CHUNK_ROWS = 10_000
+# Within an LSH bucket, each row is paired with at most this many following rows. Consecutive
+# rows are always paired, so larger buckets are still connected as a chain.
+MAX_BUCKET_NEIGHBOURS = 16
+# Candidate pairs are verified this many at a time, bounding the signatures gathered at once.
+VERIFY_PAIRS = 65_536
+SEED = 20240601
+# Separates punctuation, symbols and whitespace runs, which all normalize to a single space.
+_SEPARATORS = r"[\s\p{P}\p{S}]+"
+
+
+def _as_text(values):
+    """
+    Return a pandas Series or Arrow array as a large_string Arrow array, keeping nulls.
+    """
+    if isinstance(values, pd.Series):
+        try:
+            values = pa.array(values, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError):
+            values = pa.array(values.astype(str).where(values.notna(), None), from_pandas=True)
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    if pa.types.is_dictionary(values.type):
+        values = values.dictionary_decode()
+    return pc.cast(values, pa.large_string())
+
+
+def normalized_text(columns):
+    """
+    Build one normalized string per row from several columns.
+
+    Text is lowercased, every run of whitespace, punctuation and symbols becomes a
+    single space, and the columns are joined with a space. Missing values count as
+    empty text.
+
+    Parameters:
+    columns (list): pandas Series or Arrow arrays of equal length.
+
+    Returns:
+    pa.LargeStringArray: The normalized text of every row.
+    """
+    texts = []
+    for values in columns:
+        text = pc.utf8_lower(_as_text(values))
+        text = pc.utf8_trim_whitespace(pc.replace_substring_regex(text, _SEPARATORS, " "))
+        texts.append(pc.fill_null(text, ""))
+    if len(texts) == 1:
+        return texts[0]
+    return pc.utf8_trim_whitespace(pc.binary_join_element_wise(*texts, pa.scalar(" ", pa.large_string())))
+
+
+def _hash_family(num_perm, seed=SEED):
+    """
+    Return the odd multipliers and the offsets of num_perm multiply-add hash functions modulo 2 ** 32.
+    """
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(0, 2 ** 32, num_perm, dtype=np.uint32) | np.uint32(1)
+    offsets = rng.integers(0, 2 ** 32, num_perm, dtype=np.uint32)
+    return multipliers, offsets
+
+
+def _shingles(offsets, data, shingle_size):
+    """
+    Return the byte shingles of a run of strings and the number of shingles in each string.
+    """
+    lengths = np.diff(offsets)
+    counts = np.maximum(lengths - shingle_size + 1, 0)
+    total = int(counts.sum())
+    first = np.cumsum(counts) - counts
+    starts = np.repeat(offsets[:-1], counts) + (np.arange(total) - np.repeat(first, counts))
+    shingles = np.zeros(total, dtype=np.uint64)
+    for byte in range(shingle_size):
+        shingles = (shingles << np.uint64(8)) | data[starts + byte].astype(np.uint64)
+    return shingles, counts
+
+
+def _signature_chunk(offsets, data, multipliers, hash_offsets, shingle_size):
+    shingles, counts = _shingles(offsets, data, shingle_size)
+    signatures = np.full((len(counts), len(multipliers)), np.iinfo(np.uint32).max, dtype=np.uint32)
+    present = counts > 0
+    if not present.any():
+        return signatures
+    # Mix the shingles into well-spread 32-bit values once; each hash function then only
+    # needs a 32-bit multiply and add, which wrap around, on a reused buffer.
+    mixed = ((shingles * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(32)).astype(np.uint32)
+    hashed = np.empty_like(mixed)
+    segment_starts = (np.cumsum(counts) - counts)[present]
+    for number, (multiplier, offset) in enumerate(zip(multipliers, hash_offsets)):
+        np.multiply(mixed, multiplier, out=hashed)
+        hashed += offset
+        signatures[present, number] = np.minimum.reduceat(hashed, segment_starts)
+    return signatures
+
+
+def minhash_signatures(text, num_perm=DEFAULT_NUM_PERM, shingle_size=SHINGLE_SIZE, chunk_rows=CHUNK_ROWS,
+                       max_workers=None):
+    """
+    Compute a MinHash signature of the byte shingles of every string.
+
+    Byte shingles are hashed straight from the Arrow buffers, a chunk of rows at a
+    time on a thread pool, with no Python-level loop over rows.
+
+    Parameters:
+    text (pa.LargeStringArray): The strings, e.g. from normalized_text.
+    num_perm (int): The number of hash functions, i.e. the signature length.
+    shingle_size (int): The number of bytes per shingle.
+    chunk_rows (int): The number of rows hashed at a time.
+    max_workers (int): The thread pool size. If None, the executor default is used.
+
+    Returns:
+    tuple: The (rows, num_perm) uint32 signatures, and a boolean array of the rows
+    with at least one shingle; shorter strings have no meaningful signature.
+    """
+    offsets = np.frombuffer(text.buffers()[1], dtype=np.int64)[text.offset:text.offset + len(text) + 1]
+    data = text.buffers()[2]
+    data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(0, dtype=np.uint8)
+    multipliers, hash_offsets = _hash_family(num_perm)
+    bounds = range(0, len(text), chunk_rows)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        chunks = pool.map(
+            lambda start: _signature_chunk(
+                offsets[start:start + chunk_rows + 1], data, multipliers, hash_offsets, shingle_size
+            ),
+            bounds,
+        )
+        signatures = list(chunks)
+    signatures = np.concatenate(signatures) if signatures else np.zeros((0, num_perm), dtype=np.uint32)
+    return signatures, np.diff(offsets) >= shingle_size
+
+
+def lsh_bands(threshold, num_perm):
+    """
+    Choose the number of LSH bands and rows per band for a similarity threshold.
+
+    Pairs become candidates with a probability that rises steeply around
+    (1 / bands) ** (1 / rows). The most selective split whose midpoint is still
+    at or below the threshold is chosen, so similar pairs are rarely missed.
+
+    Returns:
+    tuple: (bands, rows), with bands * rows == num_perm.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def candidate_pairs(signatures, valid, bands, rows, max_neighbours=MAX_BUCKET_NEIGHBOURS):
+    """
+    Find candidate pairs of rows whose signatures agree on every value of some band.
+
+    Parameters:
+    signatures (np.ndarray): The MinHash signatures.
+    valid (np.ndarray): The rows that can be matched.
+    bands (int): The number of bands.
+    rows (int): The signature values per band.
+    max_neighbours (int): How many following rows each row is paired with inside a bucket.
+
+    Returns:
+    tuple: Two arrays of row positions (first < second), each pair listed once.
+    """
+    positions = np.flatnonzero(valid)
+    firsts, seconds = [], []
+    for band in range(bands):
+        keys = np.zeros(len(positions), dtype=np.uint64)
+        for column in range(band * rows, (band + 1) * rows):
+            keys = keys * np.uint64(0x100000001B3) + signatures[positions, column].astype(np.uint64)
+        order = np.argsort(keys, kind="stable")
+        ordered_keys = keys[order]
+        ordered = positions[order]
+        for distance in range(1, max_neighbours + 1):
+            same = ordered_keys[:-distance] == ordered_keys[distance:]
+            if not same.any():
+                break
+            firsts.append(ordered[:-distance][same])
+            seconds.append(ordered[distance:][same])
+    if not firsts:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    first, second = np.concatenate(firsts), np.concatenate(seconds)
+    first, second = np.minimum(first, second), np.maximum(first, second)
+    codes = np.unique(first.astype(np.int64) * len(signatures) + second)
+    return codes // len(signatures), codes % len(signatures)
+
+
+def connected_components(n, first, second):
+    """
+    Label the connected components of a graph given as edge arrays.
+
+    Returns:
+    np.ndarray: For every node, the smallest node of its component.
+    """
+    labels = np.arange(n)
+    while len(first):
+        low = np.minimum(labels[first], labels[second])
+        np.minimum.at(labels, labels[first], low)
+        np.minimum.at(labels, labels[second], low)
+        # Point every node straight at its root.
+        while True:
+            jumped = labels[labels]
+            if (jumped == labels).all():
+                break
+            labels = jumped
+        if (labels[first] == labels[second]).all():
+            break
+    return labels
+
+
+def near_duplicate_roots(columns, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, max_workers=None):
+    """
+    Group rows whose normalized text is similar into clusters.
+
+    Rows with the same normalized text are grouped directly, and each distinct
+    text is hashed once. Texts are compared through MinHash signatures of their
+    shingles: LSH banding proposes candidate pairs in roughly linear time, and a
+    candidate is accepted when the fraction of equal signature values, an
+    estimate of the Jaccard similarity of the two shingle sets, is at least the
+    threshold. Accepted pairs are merged transitively into clusters. Rows whose
+    normalized text is too short to have a shingle, e.g. missing values, are
+    left in clusters of their own.
+
+    Parameters:
+    columns (list): The text columns to compare, as pandas Series or Arrow arrays.
+    threshold (float): The minimum estimated Jaccard similarity of two near-duplicates.
+    num_perm (int): The MinHash signature length; longer is more accurate and slower.
+    max_workers (int): The thread pool size for hashing.
+
+    Returns:
+    np.ndarray: For every row, the position of the first row of its cluster.
+    """
+    # Distinct texts are numbered in order of first appearance.
+    encoded = normalized_text(columns).dictionary_encode()
+    texts = pc.cast(encoded.dictionary, pa.large_string())
+    codes = encoded.indices.to_numpy(zero_copy_only=False).astype(np.int64)
+    signatures, valid = minhash_signatures(texts, num_perm, max_workers=max_workers)
+    first, second = candidate_pairs(signatures, valid, *lsh_bands(threshold, num_perm))
+    accepted = np.zeros(len(first), dtype=bool)
+    for start in range(0, len(first), VERIFY_PAIRS):
+        block = slice(start, start + VERIFY_PAIRS)
+        agreement = (signatures[first[block]] == signatures[second[block]]).mean(axis=1)
+        accepted[block] = agreement >= threshold
+    roots = connected_components(len(texts), first[accepted], second[accepted])
+    first_rows = np.unique(codes, return_index=True)[1]
+    if not len(codes):
+        return codes
+    # Rows without text to compare, e.g. missing or only punctuation, are never near-duplicates.
+    return np.where(valid[codes], first_rows[roots[codes]], np.arange(len(codes)))
+
+
+def cluster_ids(roots):
+    """
+    Number clusters 0, 1, ... in the order their first rows appear.
+    """
+    return pd.factorize(roots)[0]
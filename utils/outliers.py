@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+
+def iqr_bounds(df, columns, rows=None, factor=1.5):
+    """
+    Compute the IQR outlier bounds of several columns with a single quantile call.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    columns (list): The numeric columns to compute bounds for.
+    rows (np.ndarray): Optional boolean mask of the rows the quartiles are computed on.
+    factor (float): How many IQRs beyond the quartiles a value must be to count as an outlier.
+
+    Returns:
+    pd.DataFrame: One row per column with 'Q1', 'Q3', 'lower' and 'upper'.
+    """
+    data = df[columns] if rows is None or rows.all() else df.loc[rows, columns]
+    quartiles = data.quantile([0.25, 0.75]).T
+    quartiles.columns = ["Q1", "Q3"]
+    return _with_fences(quartiles, factor)
+
+
+def sketch_bounds(sketches, factor=1.5):
+    """
+    Compute IQR outlier bounds from quantile sketches instead of the data.
+
+    The sketches can cover more data than is in memory, e.g. a whole file
+    sketched chunk by chunk, so every chunk is filtered with the same bounds.
+
+    Parameters:
+    sketches (dict): Column name -> KLLSketch of the column.
+    factor (float): How many IQRs beyond the quartiles a value must be to count as an outlier.
+
+    Returns:
+    pd.DataFrame: One row per column with 'Q1', 'Q3', 'lower' and 'upper', like iqr_bounds.
+    """
+    quartiles = pd.DataFrame(
+        [sketch.quantile([0.25, 0.75]) for sketch in sketches.values()],
+        index=pd.Index(list(sketches)), columns=["Q1", "Q3"], dtype="float64",
+    )
+    return _with_fences(quartiles, factor)
+
+
+def _with_fences(quartiles, factor):
+    iqr = quartiles["Q3"] - quartiles["Q1"]
+    quartiles["lower"] = quartiles["Q1"] - factor * iqr
+    quartiles["upper"] = quartiles["Q3"] + factor * iqr
+    return quartiles
+
+
+def outlier_mask(df, bounds):
+    """
+    Build one combined mask of the rows that lie within the bounds of every column.
+
+    Missing values are never treated as outliers.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    bounds (pd.DataFrame): The bounds returned by iqr_bounds.
+
+    Returns:
+    tuple: The boolean keep mask (np.ndarray) and the number of outliers per column (pd.Series).
+    """
+    keep = np.ones(len(df), dtype=bool)
+    counts = {}
+    for col, lower, upper in zip(bounds.index, bounds["lower"].to_numpy(), bounds["upper"].to_numpy()):
+        values = df[col].to_numpy(dtype="float64", na_value=np.nan)
+        outside = (values < lower) | (values > upper)
+        counts[col] = int(outside.sum())
+        keep &= ~outside
+    return keep, pd.Series(counts, dtype="int64")
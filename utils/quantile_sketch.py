@@ -0,0 +1,231 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# With k = 200 a quantile's rank is off by at most about 1.3% of the count, with 99% confidence.
+DEFAULT_K = 200
+MIN_CAPACITY = 8
+CHUNK_ROWS = 1_000_000
+
+
+def _float_values(values):
+    """
+    Return the non-missing values of a Series or array as a float64 NumPy array.
+    """
+    if isinstance(values, pd.Series):
+        values = values.to_numpy(dtype="float64", na_value=np.nan)
+    values = np.asarray(values, dtype="float64").ravel()
+    return values[~np.isnan(values)]
+
+
+class KLLSketch:
+    """
+    A KLL quantile sketch: a bounded-size summary of a stream of numbers that answers quantile queries.
+
+    Values are kept in levels; a value on level h stands for 2 ** h original
+    values. When a level outgrows its capacity it is sorted and every other value,
+    starting at a random offset, is promoted to the next level. Capacities shrink
+    geometrically towards the lower levels, so the sketch holds about 3 * k values
+    however many it has seen.
+
+    Sketches built on separate chunks of the data, e.g. by different workers, can
+    be merged into a sketch of the whole. Until the first compaction the sketch is
+    exact, and its quantiles equal those of pandas with linear interpolation.
+
+    The random offsets come from a seeded generator, so the same updates in the
+    same order always give the same sketch.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        """
+        Initialize an empty sketch.
+
+        Parameters:
+        k (int): The capacity of the top level; larger is more accurate and takes more memory.
+        seed (int): The seed of the compaction offsets.
+        """
+        self.k = k
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def __repr__(self):
+        return f"KLLSketch(k={self.k}, count={self.count}, digest={self.digest()})"
+
+    @property
+    def rank_error(self):
+        """
+        The normalized rank error bound of a single quantile, with 99% confidence.
+
+        This is the empirical fit published for KLL sketches by Apache DataSketches.
+        """
+        return 2.296 / self.k ** 0.9723
+
+    @property
+    def exact(self):
+        """
+        True while no values have been compacted, so quantiles are exact.
+        """
+        return len(self._levels) == 1
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self._levels)
+
+    def digest(self):
+        """
+        Return a hash of the sketch's contents, e.g. to use the sketch in a cache key.
+        """
+        digest = hashlib.blake2b(digest_size=8)
+        for level in self._levels:
+            digest.update(np.sort(level).tobytes())
+            digest.update(b"|")
+        return digest.hexdigest()
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), MIN_CAPACITY)
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+            items = np.sort(items)
+            # With an odd number of values, the largest stays on this level.
+            paired = items[:len(items) - len(items) % 2]
+            promoted = paired[self._rng.integers(2)::2]
+            self._levels[level] = items[len(paired):]
+            self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+            # A new level lowers the capacities below it, so start over from the bottom.
+            level = 0
+
+    def update(self, values):
+        """
+        Add values to the sketch; missing values are ignored.
+
+        Parameters:
+        values (array-like): The values, e.g. one chunk of a column.
+
+        Returns:
+        KLLSketch: The sketch.
+        """
+        values = _float_values(values)
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Add everything another sketch with the same k has seen to this sketch.
+
+        Returns:
+        KLLSketch: This sketch.
+        """
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}.")
+        if not other.count:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """
+        Estimate one or more quantiles, interpolating linearly between values like pandas.
+
+        Parameters:
+        q (float or array-like): The quantiles, between 0 and 1.
+
+        Returns:
+        float or np.ndarray: The estimates, NaN for an empty sketch. The estimated
+        rank of each is within rank_error * count of the exact one.
+        """
+        scalar = np.ndim(q) == 0
+        q = np.atleast_1d(np.asarray(q, dtype="float64"))
+        if not self.count:
+            result = np.full(len(q), np.nan)
+        else:
+            values = np.concatenate(self._levels)
+            weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self._levels)])
+            order = np.argsort(values, kind="stable")
+            values, weights = values[order], weights[order]
+            # Each value stands for a run of ranks; place it at the middle of its run.
+            centers = np.cumsum(weights) - (weights + 1) / 2
+            result = np.interp(q * (self.count - 1), centers, values)
+            result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return float(result[0]) if scalar else result
+
+
+def sketch_series(series, k=DEFAULT_K, chunk_rows=CHUNK_ROWS, max_workers=None):
+    """
+    Build a sketch of a numeric column, one chunk of rows at a time on a thread pool.
+
+    Only one chunk per worker is converted to float64 at a time, so the extra
+    memory does not grow with the length of the column.
+
+    Parameters:
+    series (pd.Series): The column.
+    k (int): The sketch size, see KLLSketch.
+    chunk_rows (int): The number of rows sketched per task.
+    max_workers (int): The thread pool size. If None, the executor default is used.
+
+    Returns:
+    KLLSketch: The merged sketch.
+    """
+    starts = range(0, len(series), chunk_rows)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        parts = pool.map(
+            lambda start: KLLSketch(k, seed=start // chunk_rows).update(series.iloc[start:start + chunk_rows]),
+            starts,
+        )
+        sketch = KLLSketch(k)
+        for part in parts:
+            sketch.merge(part)
+    return sketch
+
+
+def sketch_chunks(chunks, columns=None, k=DEFAULT_K, max_workers=None):
+    """
+    Build one sketch per column over a stream of DataFrame chunks, e.g. from csv_loader.iter_csv_chunks.
+
+    Only the current chunk and the sketches are held in memory, so a file of any
+    size can be summarized in a single pass.
+
+    Parameters:
+    chunks (iterable): The DataFrames, all with the same columns.
+    columns (list): The numeric columns to sketch. If None, every numeric column of the first chunk.
+    k (int): The sketch size, see KLLSketch.
+    max_workers (int): The thread pool the columns of each chunk are sketched on.
+
+    Returns:
+    dict: Column name -> KLLSketch.
+    """
+    sketches = None
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for chunk in chunks:
+            if sketches is None:
+                if columns is None:
+                    columns = chunk.select_dtypes(include=[np.number]).columns
+                sketches = {col: KLLSketch(k) for col in columns}
+            list(pool.map(lambda col: sketches[col].update(chunk[col]), sketches))
+    return sketches if sketches is not None else {col: KLLSketch(k) for col in columns or []}
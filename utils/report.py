@@ -0,0 +1,248 @@
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from fpdf import FPDF
+from matplotlib.figure import Figure
+
+from utils.chart_data import pie_data, sample_positions
+from utils.column_stats import ColumnStatsIndex
+
+
+def _pie_chart(data):
+    column, counts = data
+    fig = px.pie(counts, names="value", values="count", title=f"Pie Chart of {column}")
+    return fig.to_image(format="png")
+
+
+def _area_plot(data):
+    # The object-oriented matplotlib API keeps no global state, so it is safe on a worker thread.
+    fig = Figure(figsize=(8, 4))
+    data.plot(kind="area", alpha=0.5, ax=fig.subplots())
+    fig.suptitle("Area Plot")
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def _donut_chart(averages):
+    donut_data = pd.DataFrame({"Metric": averages.index, "Value": averages.values})
+    fig = px.pie(donut_data, names="Metric", values="Value", hole=0.4, title="Donut Chart of Averages")
+    return fig.to_image(format="png")
+
+
+def _radar_chart(averages):
+    radar_data = averages.reset_index()
+    radar_data.columns = ["Metric", "Value"]
+    radar_data["Normalized"] = (radar_data["Value"] - radar_data["Value"].min()) / (
+        radar_data["Value"].max() - radar_data["Value"].min()
+    )
+    fig = px.line_polar(radar_data, r="Normalized", theta="Metric", line_close=True, title="Radar Chart of Averages")
+    return fig.to_image(format="png")
+
+
+def _gauge_chart(data):
+    column, value, maximum = data
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=value,
+        title={'text': f"Gauge of {column}"},
+        gauge={'axis': {'range': [0, maximum * 1.1]}}
+    ))
+    return fig.to_image(format="png")
+
+
+# Renderers that only use the object-oriented matplotlib API and can run on worker threads.
+THREAD_SAFE_RENDERERS = (_area_plot,)
+# Parts of the errors Plotly and Kaleido raise when images cannot be exported at all.
+EXPORT_UNAVAILABLE_MESSAGES = ("requires Google Chrome", "plotly_get_chrome", "requires the kaleido package")
+
+
+def _export_unavailable(error):
+    """
+    Return True if a Plotly export failed because Kaleido or its browser is missing, not because of the chart.
+    """
+    return isinstance(error, (RuntimeError, ValueError)) and any(
+        message in str(error) for message in EXPORT_UNAVAILABLE_MESSAGES
+    )
+
+
+def report_charts(dataframe, stats):
+    """
+    Return the report charts as (name, renderer, data) with their data already aggregated.
+
+    Every renderer gets a few dozen values at most, never the full frame.
+    """
+    numeric_columns = stats.columns_of_kind("numeric")
+    if not numeric_columns:
+        return []
+    first = numeric_columns[0]
+    averages = stats.aggregate(numeric_columns, "mean")
+    area = dataframe[numeric_columns].iloc[sample_positions(dataframe, numeric_columns)]
+    return [
+        ("pie chart", _pie_chart, (first, pie_data(stats[first].top_values, stats[first].count))),
+        ("area plot", _area_plot, area),
+        ("donut chart", _donut_chart, averages),
+        ("radar chart", _radar_chart, averages),
+        ("gauge chart", _gauge_chart, (first, stats[first].mean, stats[first].max)),
+    ]
+
+
+def render_charts(charts, max_workers=None, on_progress=None):
+    """
+    Render charts, the matplotlib ones concurrently on a thread pool.
+
+    Plotly charts are exported by Kaleido, which drives a browser and is not
+    known to be safe to call from several threads, so they are rendered one
+    after another on the calling thread while the matplotlib charts render on
+    the pool. If Kaleido cannot export images (e.g. Chrome is not installed),
+    the remaining Plotly charts are not attempted and are left out. Any other
+    error only affects its own chart, and is returned in its place.
+
+    Parameters:
+    charts (list): (name, renderer, data) tuples, as returned by report_charts.
+    max_workers (int): The thread pool size. If None, the executor default is used.
+    on_progress (callable): Called with the fraction of charts rendered and a message.
+        If it raises, charts not yet started are cancelled and the error propagates.
+
+    Returns:
+    list: (name, PNG bytes, the exception raised while rendering, or None if the chart
+    was left out) in chart order.
+    """
+    def render(chart):
+        name, renderer, data = chart
+        try:
+            return name, renderer(data)
+        except Exception as e:
+            return name, e
+
+    results = [None] * len(charts)
+    done = 0
+
+    def finish(number, result):
+        nonlocal done
+        results[number] = result
+        done += 1
+        if on_progress is not None:
+            on_progress(done / len(charts), f"{'Left out' if result[1] is None else 'Rendered'} {result[0]}")
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            pool.submit(render, chart): number
+            for number, chart in enumerate(charts) if chart[1] in THREAD_SAFE_RENDERERS
+        }
+        export_available = True
+        for number, chart in enumerate(charts):
+            if chart[1] in THREAD_SAFE_RENDERERS:
+                continue
+            result = render(chart) if export_available else (chart[0], None)
+            if _export_unavailable(result[1]):
+                export_available = False
+                result = chart[0], None
+            finish(number, result)
+        for future in as_completed(futures):
+            finish(futures[future], future.result())
+        return results
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def generate_pdf_report(dataframe, stats=None, max_workers=None, on_progress=None, validation=None):
+    """
+    Generates a PDF report for the given DataFrame with visualizations.
+
+    The charts are rendered (see render_charts) and embedded from memory, and the PDF
+    is returned as bytes, so nothing is written to disk.
+
+    Parameters:
+    dataframe (pd.DataFrame): The data to report on.
+    stats (ColumnStatsIndex): Column statistics of the data. Built if None.
+    max_workers (int): The number of charts rendered at once.
+    on_progress (callable): Called with the fraction of the report done and a message.
+    validation (pd.DataFrame): If given, a validation summary of the data (see
+        validation.ValidationReport.summary), listed with its violation counts.
+
+    Returns:
+    bytes: The PDF document.
+    """
+    if stats is None:
+        stats = ColumnStatsIndex(dataframe)
+    def chart_progress(fraction, message):
+        if on_progress is not None:
+            on_progress(0.9 * fraction, message)
+
+    chart_progress(0.0, "Aggregating chart data")
+    rendered = render_charts(report_charts(dataframe, stats), max_workers, chart_progress)
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    # Title Page
+    pdf.set_font("Arial", style="B", size=16)
+    pdf.cell(0, 10, txt="Data Report", ln=True, align="C")
+    pdf.ln(10)
+
+    # Summary Statistics
+    pdf.set_font("Arial", size=12)
+    pdf.cell(0, 10, txt="Summary Statistics:", ln=True)
+    pdf.ln(5)
+
+    try:
+        summary = dataframe.describe(include="all").transpose()
+        summary.reset_index(inplace=True)
+        summary.columns = ["Feature", "Count", "Mean", "Std", "Min", "25%", "50%", "75%", "Max"]
+
+        for _, row in summary.iterrows():
+            pdf.set_font("Courier", size=10)
+            pdf.cell(0, 10, txt=row.to_string(index=False), ln=True)
+        pdf.ln(10)
+    except Exception as e:
+        pdf.cell(0, 10, txt=f"Error generating summary: {e}", ln=True)
+        pdf.ln(10)
+
+    # Validation Rules
+    if validation is not None:
+        pdf.set_font("Arial", size=12)
+        pdf.cell(0, 10, txt="Validation Rules:", ln=True)
+        pdf.ln(5)
+        pdf.set_font("Courier", size=10)
+        for name, row in validation.iterrows():
+            pdf.cell(
+                0, 10, txt=f"{name}: {row['violations']:,} violations ({row['violation_rate']:.2%} of rows)", ln=True
+            )
+        pdf.ln(10)
+
+    # Data Preview
+    pdf.cell(0, 10, txt="Data Preview (First 5 Rows):", ln=True)
+    pdf.ln(5)
+    preview_text = dataframe.head().to_string(index=False)
+    pdf.set_font("Courier", size=10)
+    pdf.multi_cell(0, 10, txt=preview_text)
+    pdf.ln(10)
+
+    # Visualizations
+    pdf.cell(0, 10, txt="Visualizations:", ln=True)
+    pdf.ln(5)
+
+    left_out = [name for name, image in rendered if image is None]
+    if left_out:
+        pdf.cell(0, 10, txt=f"Left out, as chart image export is unavailable: {', '.join(left_out)}", ln=True)
+    for name, image in rendered:
+        if image is None:
+            continue
+        if isinstance(image, Exception):
+            pdf.cell(0, 10, txt=f"Error generating {name}: {image}", ln=True)
+            continue
+        pdf.image(io.BytesIO(image), x=10, y=pdf.get_y(), w=180)
+        pdf.ln(90)
+
+    report = bytes(pdf.output())
+    if on_progress is not None:
+        on_progress(1.0, "Report ready")
+    return report
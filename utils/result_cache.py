@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+DEFAULT_CACHE_DIR = os.environ.get("VISWALIS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "viswalis-cache"))
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+DEFAULT_MAX_ENTRIES = 256
+
+
+def content_hash(source, chunk_size=8 * 1024 * 1024):
+    """
+    Return a fast content hash of uploaded bytes, a file object or a file path.
+
+    Parameters:
+    source (bytes, str or file-like): The content to hash.
+    chunk_size (int): How many bytes are hashed at a time when reading a file.
+
+    Returns:
+    str: A 32-character hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+        return digest.hexdigest()
+
+    handle = open(source, "rb") if isinstance(source, str) else source
+    try:
+        if handle is source:
+            handle.seek(0)
+        for block in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(block)
+    finally:
+        if handle is not source:
+            handle.close()
+        else:
+            handle.seek(0)
+    return digest.hexdigest()
+
+
+def pandas_types(arrow_type):
+    """
+    Map Arrow types to the pandas dtypes they were stored from, as a to_pandas types_mapper.
+
+    Arrow-backed pandas strings are stored as large_string, while object columns
+    of text are stored as string, so large_string reads back as Arrow-backed
+    strings instead of Python objects.
+    """
+    if arrow_type == pa.large_string():
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def _exact_object_column(series):
+    """
+    Return False for an object column Arrow would convert to another type, e.g. dates and numbers mixed.
+    """
+    if series.dtype != object:
+        return True
+    return pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty")
+
+
+def canonical_step(step, backend=None):
+    """
+    Return a canonical text form of a plan step, independent of argument order.
+    """
+    form = {"op": step.name, "params": step.params}
+    if backend is not None:
+        form["backend"] = backend
+    return json.dumps(form, sort_keys=True, default=repr)
+
+
+def step_key(parent_key, step, backend=None):
+    """
+    Derive the key of the data produced by applying a step to the data with parent_key.
+
+    Keys are chained, so the key of a pipeline also identifies every prefix of it.
+
+    Parameters:
+    parent_key (str): The key of the input data.
+    step (PlanStep): The operation applied to it.
+    backend (str): The name of the backend that ran the step, so that results are
+        only served to the backend that computed them.
+
+    Returns:
+    str: The key of the result.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(parent_key.encode())
+    digest.update(canonical_step(step, backend).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    An on-disk cache of DataFrames keyed by content, stored as Feather files.
+
+    Entries are evicted least recently used first whenever the cache holds more
+    than max_entries files or max_bytes bytes. The file modification time records
+    the last access, so several processes can share one cache directory.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Parameters:
+        directory (str): Where the Feather files are kept. Created if missing.
+        max_bytes (int): The maximum total size of the cache.
+        max_entries (int): The maximum number of cached frames.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.feather")
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """
+        Return the cached frame for a key, or None if it is not cached.
+        """
+        path = self._path(key)
+        try:
+            table = feather.read_table(path, memory_map=True)
+            os.utime(path)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        return table.to_pandas(types_mapper=pandas_types)
+
+    def put(self, key, df):
+        """
+        Store a frame under a key and evict old entries if the cache is over its limits.
+
+        Frames Arrow cannot represent exactly (non-string or duplicate column
+        labels, object columns holding anything but text, or sparse columns) are
+        not cached, so get always returns a frame equal to the one stored.
+
+        Returns:
+        bool: True if the frame was stored.
+        """
+        if not all(isinstance(col, str) for col in df.columns) or df.columns.has_duplicates:
+            return False
+        if not all(_exact_object_column(df.iloc[:, position]) for position in range(df.shape[1])):
+            return False
+        try:
+            # A RangeIndex is kept in the metadata instead of being materialized as a column.
+            table = pa.Table.from_pandas(df, preserve_index=None)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError, ValueError):
+            return False
+
+        path = self._path(key)
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(handle)
+        try:
+            feather.write_feather(table, temporary)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self.evict()
+        return True
+
+    def longest_prefix(self, source_key, steps, backend=None):
+        """
+        Find the longest prefix of a pipeline whose result is cached.
+
+        Parameters:
+        source_key (str): The key of the input data.
+        steps (list): The PlanStep objects of the pipeline.
+        backend (str): The name of the backend running them, see step_key.
+
+        Returns:
+        tuple: The number of steps covered, the key after them and the cached frame
+        (None if no prefix is cached).
+        """
+        keys = [source_key]
+        for step in steps:
+            keys.append(step_key(keys[-1], step, backend))
+        for length in range(len(steps), 0, -1):
+            df = self.get(keys[length])
+            if df is not None:
+                return length, keys[length], df
+        return 0, source_key, None
+
+    def entries(self):
+        """
+        Return (path, size, last access time) for every cached frame, oldest first.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".feather"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is within its limits.
+        """
+        with self._lock:
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+                path, size, _ = entries.pop(0)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
@@ -0,0 +1,244 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils.csv_loader import DEFAULT_BLOCK_SIZE, _open_source, _total_size, open_csv_reader
+
+# The column recording which file every row of a sharded dataset came from; it is also the partition key.
+SOURCE_COLUMN = "source_file"
+
+
+def _shard_names(sources):
+    """
+    Return a display name per source: the file name, numbered when several files share one.
+    """
+    names = [os.path.basename(source) if isinstance(source, str) else getattr(source, "name", "shard")
+             for source in sources]
+    seen = {}
+    unique = []
+    for name in names:
+        seen[name] = seen.get(name, 0) + 1
+        unique.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+    return unique
+
+
+def _source_size(source):
+    return os.path.getsize(source) if isinstance(source, str) else _total_size(source)
+
+
+def read_shard(source, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Parse one CSV file into an Arrow table, see csv_loader.load_csv.
+
+    If a later block does not fit the types inferred from the first one, the file
+    is re-read by pandas with whole-file inference.
+
+    Parameters:
+    source (str or file-like): The CSV path or an uploaded file object.
+    block_size (int): The number of bytes parsed per block.
+
+    Returns:
+    tuple: The table and the size of the file in bytes.
+    """
+    size = _source_size(source)
+    handle, should_close = _open_source(source)
+    try:
+        try:
+            reader, _, _ = open_csv_reader(handle, block_size=block_size)
+            names = reader.schema.names
+            if len(set(names)) != len(names):
+                raise pa.ArrowInvalid("Duplicate column names in CSV header.")
+            return reader.read_all(), size
+        except pa.ArrowInvalid:
+            handle.seek(0)
+            return pa.Table.from_pandas(pd.read_csv(handle), preserve_index=False), size
+    finally:
+        if should_close:
+            handle.close()
+
+
+def _common_type(types):
+    """
+    Return the type that every one of several Arrow types converts to without losing values.
+    """
+    types = [t for t in types if not pa.types.is_null(t)]
+    if not types:
+        return pa.null()
+    if all(t == types[0] for t in types):
+        return types[0]
+    if all(pa.types.is_integer(t) for t in types):
+        return pa.int64()
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+        return pa.float64()
+    if all(pa.types.is_timestamp(t) for t in types) and len({t.tz for t in types}) == 1:
+        return pa.timestamp("ns", tz=types[0].tz)
+    if all(pa.types.is_string(t) or pa.types.is_large_string(t) for t in types):
+        return pa.large_string()
+    # Anything else can still be represented as text.
+    return pa.string()
+
+
+def reconcile_schemas(schemas, names):
+    """
+    Reconcile the schemas of several shards into one.
+
+    Columns are taken in order of first appearance. A column whose type differs
+    between shards gets the common type of all of them: integers are widened,
+    integers mixed with floats become floats, and otherwise the values become
+    text. A column that is entirely empty in a shard takes the type of the others.
+
+    Parameters:
+    schemas (list): The pa.Schema of every shard.
+    names (list): The shard names, for the report.
+
+    Returns:
+    tuple: The reconciled pa.Schema, and a DataFrame with one row per difference
+    found: the column, the file, and the issue.
+    """
+    types = {}
+    for schema in schemas:
+        for field in schema:
+            types.setdefault(field.name, []).append(field.type)
+    target = pa.schema([(column, _common_type(column_types)) for column, column_types in types.items()])
+    issues = []
+    for name, schema in zip(names, schemas):
+        for field in target:
+            if field.name not in schema.names:
+                issues.append((field.name, name, "missing; filled with missing values"))
+            elif not pa.types.is_null(schema.field(field.name).type) and schema.field(field.name).type != field.type:
+                issues.append((field.name, name, f"{schema.field(field.name).type} converted to {field.type}"))
+    return target, pd.DataFrame(issues, columns=["column", "file", "issue"])
+
+
+def _conform(table, schema):
+    """
+    Return a table with exactly the columns and types of a schema, adding missing columns as nulls.
+    """
+    columns = [
+        table.column(field.name).cast(field.type) if field.name in table.schema.names
+        else pa.nulls(table.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def load_shards(sources, max_workers=None, on_progress=None, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Load several CSV files sharing a schema into one DataFrame, partitioned by source file.
+
+    The files are parsed concurrently on a thread pool; Arrow's parser releases
+    the GIL. Their schemas are reconciled (see reconcile_schemas), and the rows
+    are concatenated in the given order, with a categorical SOURCE_COLUMN naming
+    the file each row came from. The rows of every file stay contiguous, so the
+    column splits the data into partitions for PartitionedPandasBackend.
+
+    Parameters:
+    sources (list): CSV paths or uploaded file objects.
+    max_workers (int): The thread pool size. If None, the executor default is used.
+    on_progress (callable): Called as on_progress(rows, bytes_read, total_bytes) as each file finishes.
+    block_size (int): The number of bytes parsed per block.
+
+    Returns:
+    tuple: The DataFrame, and the schema differences found, see reconcile_schemas.
+    """
+    names = _shard_names(sources)
+    total_bytes = sum(_source_size(source) for source in sources)
+    tables = [None] * len(sources)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(read_shard, source, block_size): number for number, source in enumerate(sources)}
+        rows = bytes_read = 0
+        # Progress is reported from this thread only, as each file finishes.
+        for future in as_completed(futures):
+            number = futures[future]
+            tables[number], size = future.result()
+            rows += tables[number].num_rows
+            bytes_read += size
+            if on_progress is not None:
+                on_progress(rows, bytes_read, total_bytes)
+    schema, issues = reconcile_schemas([table.schema for table in tables], names)
+    if SOURCE_COLUMN in schema.names:
+        raise ValueError(f"The files already have a {SOURCE_COLUMN!r} column.")
+    lengths = [table.num_rows for table in tables]
+    table = pa.concat_tables([_conform(table, schema) for table in tables])
+    del tables
+    df = table.to_pandas(
+        date_as_object=False,
+        coerce_temporal_nanoseconds=True,
+        split_blocks=True,
+        self_destruct=True,
+    )
+    del table
+    codes = np.repeat(np.arange(len(names), dtype=np.int32), lengths)
+    df[SOURCE_COLUMN] = pd.Categorical.from_codes(codes, categories=names)
+    return df, issues
+
+
+def partition_slices(series, max_rows=None):
+    """
+    Split rows into partitions: the runs of equal values of a partition column.
+
+    Parameters:
+    series (pd.Series): The partition column, e.g. SOURCE_COLUMN.
+    max_rows (int): If given, longer runs are split further into slices of at most this many rows.
+
+    Returns:
+    list: slice objects covering all rows in order.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+    else:
+        codes = pd.factorize(series)[0]
+    bounds = np.concatenate([[0], np.flatnonzero(codes[1:] != codes[:-1]) + 1, [len(codes)]])
+    slices = []
+    for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        step = max_rows or stop - start
+        slices.extend(slice(offset, min(offset + step, stop)) for offset in range(start, stop, step))
+    return slices
+
+
+def map_partitions(function, df, slices, max_workers=None):
+    """
+    Apply a function to every partition of a frame on a thread pool.
+
+    Returns:
+    list: The results, in partition order.
+    """
+    if len(slices) <= 1:
+        return [function(df.iloc[part]) for part in slices]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda part: function(df.iloc[part]), slices))
+
+
+def fill_partitions(df, values, slices, max_workers=None):
+    """
+    Fill missing values with fixed values per column, one partition at a time on a thread pool.
+
+    Only NumPy numeric, datetime and timedelta columns are filled per partition;
+    other columns, whose dtype a fill may change, are filled whole, so the result
+    equals df.fillna(values).
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    values (dict): Column name -> fill value.
+    slices (list): The partitions, see partition_slices.
+    max_workers (int): The thread pool size.
+
+    Returns:
+    pd.DataFrame: The filled data. Other columns are shared, not copied.
+    """
+    split = [col for col in values if isinstance(df[col].dtype, np.dtype) and df[col].dtype.kind in "iufmM"]
+    whole = {col: value for col, value in values.items() if col not in split}
+    if not split or len(slices) <= 1:
+        return df.fillna(values)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pieces = {
+            col: list(pool.map(lambda part, col=col: df[col].iloc[part].fillna(values[col]), slices))
+            for col in split
+        }
+        result = df.copy(deep=False)
+        for col in split:
+            result[col] = pd.concat(pieces[col])
+    return result.fillna(whole) if whole else result
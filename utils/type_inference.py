@@ -0,0 +1,187 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+SAMPLE_SIZE = 1000
+# A parser is chosen if it reads at least this share of a column's sampled values.
+MIN_SAMPLE_SUCCESS = 0.9
+# A column is only converted if at most this share of its values fail to parse.
+DEFAULT_MAX_FAILURE_RATE = 0.05
+SAMPLE_SEED = 0
+
+_CURRENCY_SYMBOLS = "$€£¥₹"
+# At least one digit is required, so a lone sign or exponent is not a number.
+_NUMBER = r"[-+]?(?:(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|\.\d+)(?:[eE][-+]?\d+)?"
+# The forms each numeric parser accepts, matched against whole stripped values, in the order they are tried.
+# Currency amounts may carry a symbol on either side and accounting negatives like '(1,200)'.
+NUMERIC_PATTERNS = {
+    "percent": rf"{_NUMBER}\s*%",
+    "number": _NUMBER,
+    "currency": rf"\(?[-+]?\s*[{_CURRENCY_SYMBOLS}]?\s*{_NUMBER}\s*[{_CURRENCY_SYMBOLS}]?\s*\)?",
+}
+# What remains of a parseable number once symbols and separators are stripped.
+_PLAIN_NUMBER = r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$"
+_PLAIN_INTEGER = r"^[-+]?\d{1,18}$"
+# Tried in order on the sample; the format that parses most sampled values wins, the first on ties.
+DATE_FORMATS = (
+    "ISO8601", "%m/%d/%Y", "%d/%m/%Y", "%m/%d/%Y %H:%M", "%d/%m/%Y %H:%M", "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S", "%m-%d-%Y", "%d-%m-%Y", "%d.%m.%Y", "%d.%m.%Y %H:%M", "%Y/%m/%d",
+    "%Y/%m/%d %H:%M:%S", "%b %d, %Y", "%d %b %Y", "%B %d, %Y", "%d %B %Y",
+)
+REPORT_COLUMNS = ["kind", "format", "sample_success", "parsed", "failed", "failure_rate", "converted"]
+
+
+def _sample(series, sample_size, seed=SAMPLE_SEED):
+    """
+    Return a reproducible random sample of a column's non-missing values as stripped text.
+    """
+    values = series.dropna()
+    if len(values) > sample_size:
+        values = values.sample(sample_size, random_state=seed)
+    return values.astype(str).astype(pd.StringDtype("pyarrow")).str.strip()
+
+
+def _parse_dates(series, date_format):
+    try:
+        return pd.to_datetime(series, format=date_format, errors="coerce")
+    except (TypeError, ValueError):
+        # Values with different UTC offsets only share a dtype in UTC.
+        return pd.to_datetime(series, format=date_format, errors="coerce", utc=True)
+
+
+def infer_column_type(series, sample_size=SAMPLE_SIZE, min_success=MIN_SAMPLE_SUCCESS):
+    """
+    Pick a parser for a text column from a sample of its values.
+
+    Percentages, currency amounts and plain numbers (with optional thousands
+    separators) are recognized by regular expressions on the whole value, unless
+    some values are zero-padded codes. Failing those, every date format in
+    DATE_FORMATS is tried on the sample, so the whole column can then be parsed
+    with one explicit format.
+
+    Parameters:
+    series (pd.Series): The column.
+    sample_size (int): The number of non-missing values inspected.
+    min_success (float): The share of sampled values a parser must read to be chosen.
+
+    Returns:
+    tuple: (kind, date format, share of the sample parsed), where kind is 'percent',
+    'currency', 'number' or 'datetime' and the format is None except for dates; or
+    None if no parser fits.
+    """
+    sample = _sample(series, sample_size)
+    sample = sample[sample != ""]
+    if sample.empty:
+        return None
+    # Zero-padded codes, like ZIP codes, would lose their meaning as numbers.
+    if not sample.str.match(r"[-+]?0\d").any():
+        for kind, pattern in NUMERIC_PATTERNS.items():
+            success = sample.str.fullmatch(pattern).mean()
+            if success >= min_success:
+                return kind, None, success
+    best = None
+    for date_format in DATE_FORMATS:
+        success = _parse_dates(sample, date_format).notna().mean()
+        if success >= min_success and (best is None or success > best[2]):
+            best = ("datetime", date_format, success)
+            if success == 1:
+                break
+    return best
+
+
+def parse_column(series, kind, date_format=None):
+    """
+    Convert a whole text column with one vectorized call.
+
+    Numbers have currency symbols, percent signs, thousands separators and spaces
+    stripped by regular expression, and accounting negatives like '(1,200)' made
+    negative, then are cast in one call. The string work runs in Arrow kernels.
+    Percentages are divided by 100. Values that do not parse become missing.
+
+    Parameters:
+    series (pd.Series): The column.
+    kind (str): 'percent', 'currency', 'number' or 'datetime', see infer_column_type.
+    date_format (str): The to_datetime format for dates.
+
+    Returns:
+    pd.Series: The parsed column: int64 for whole numbers without missing values,
+    otherwise float64, and datetime64 for dates.
+    """
+    if kind == "datetime":
+        return _parse_dates(series, date_format)
+    text = pc.utf8_trim_whitespace(pa.array(series.astype(pd.StringDtype("pyarrow"))))
+    text = pc.replace_substring_regex(text, r"^\((.*)\)$", r"-\1")
+    text = pc.replace_substring_regex(text, rf"[\s,%{_CURRENCY_SYMBOLS}]", "")
+    text = pc.if_else(pc.match_substring_regex(text, _PLAIN_NUMBER), text, pa.scalar(None, text.type))
+    integers = (
+        kind != "percent" and not text.null_count and pc.all(pc.match_substring_regex(text, _PLAIN_INTEGER)).as_py()
+    )
+    values = pc.cast(text, pa.int64() if integers else pa.float64())
+    values = values.to_numpy(zero_copy_only=False)
+    if kind == "percent":
+        values = values / 100
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def text_columns(df):
+    """
+    Return the names of the object and string columns of a frame.
+    """
+    return df.iloc[:0].select_dtypes(include=["object", "string"]).columns
+
+
+def _infer_and_parse(series, sample_size, max_failure_rate):
+    inferred = infer_column_type(series, sample_size)
+    if inferred is None:
+        return series, None
+    kind, date_format, sample_success = inferred
+    parsed = parse_column(series, kind, date_format)
+    present = int(series.notna().sum())
+    failed = int(present - parsed.notna().sum())
+    failure_rate = failed / present if present else 0.0
+    converted = failure_rate <= max_failure_rate
+    row = (kind, date_format, sample_success, present - failed, failed, failure_rate, converted)
+    return parsed if converted else series, row
+
+
+def infer_types(df, columns=None, sample_size=SAMPLE_SIZE, max_failure_rate=DEFAULT_MAX_FAILURE_RATE,
+                max_workers=None):
+    """
+    Detect text columns holding numbers, percentages, currency amounts or dates, and convert them.
+
+    Each column's parser is chosen once from a sample, then the column is parsed
+    in one vectorized call; columns are processed in parallel on a thread pool.
+    A column is only converted if the share of its values that fail to parse is
+    at most max_failure_rate, so a wrong guess cannot wipe out a column.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    columns (list): The columns to inspect. If None, every object and string column.
+    sample_size (int): The number of values sampled per column.
+    max_failure_rate (float): The largest share of unparseable values a converted column may have.
+    max_workers (int): The thread pool size. If None, the executor default is used.
+
+    Returns:
+    tuple: The converted DataFrame (other columns are shared, not copied) and a
+    report with one row per column a parser was found for: kind, format,
+    sample_success, parsed, failed, failure_rate and whether it was converted.
+    """
+    columns = text_columns(df) if columns is None else columns
+    positions = [df.columns.get_loc(col) for col in columns]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(
+            lambda position: _infer_and_parse(df.iloc[:, position], sample_size, max_failure_rate), positions
+        ))
+    result = df.copy(deep=False)
+    rows = {}
+    for position, (series, row) in zip(positions, results):
+        if row is None:
+            continue
+        rows[df.columns[position]] = row
+        if row[-1]:
+            result.isetitem(position, series)
+    report = pd.DataFrame.from_dict(rows, orient="index", columns=REPORT_COLUMNS)
+    report.index.name = "column"
+    return result, report
@@ -0,0 +1,294 @@
+import numbers
+import operator
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# The parameters every rule kind requires besides its column(s); 'name' is always optional.
+RULE_KINDS = {
+    "not_null": (),
+    "range": (),
+    "regex": ("pattern",),
+    "allowed": ("values",),
+    "unique": (),
+    "compare": ("op", "other"),
+}
+COMPARISONS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq,
+               "!=": operator.ne}
+SUMMARY_COLUMNS = ["rule", "columns", "violations", "violation_rate"]
+
+
+def _is_numeric(dtype):
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def _check_bounds(column, dtype, bounds):
+    """
+    Raise ValueError unless the bounds of a range rule compare with the column: numbers for numbers only.
+    """
+    bounds = [bound for bound in bounds if bound is not None]
+    numeric_bounds = [isinstance(bound, numbers.Real) and not isinstance(bound, bool) for bound in bounds]
+    if _is_numeric(dtype) and not all(numeric_bounds):
+        raise ValueError(f"Column {column!r} is numeric, so its range rule needs numeric bounds.")
+    if not _is_numeric(dtype) and any(numeric_bounds):
+        raise ValueError(f"Column {column!r} is not numeric ({dtype}), so its range rule cannot have numeric bounds.")
+
+
+class ValidationRule:
+    """
+    One compiled rule: which columns it checks and how.
+
+    Rules are declared as dicts naming the kind under 'rule', e.g.
+    {"rule": "range", "column": "age", "min": 0, "max": 120}. The kinds are:
+
+    - not_null: the column has no missing values.
+    - range: values lie between 'min' and 'max' (both inclusive, either optional).
+    - regex: text values fully match 'pattern'.
+    - allowed: values are among 'values'.
+    - unique: the 'columns' (or 'column') together identify every row.
+    - compare: the column relates to the 'other' column by 'op', one of COMPARISONS.
+
+    Only not_null rules flag missing values; the other rules skip them.
+    """
+
+    def __init__(self, spec, dtypes):
+        """
+        Check a declared rule against the columns of the data.
+
+        Parameters:
+        spec (dict): The rule, see the class docstring.
+        dtypes (pd.Series): The dtype of every column of the data, e.g. df.dtypes.
+        """
+        spec = dict(spec)
+        self.kind = spec.pop("rule", None)
+        if self.kind not in RULE_KINDS:
+            raise ValueError(f"Unknown rule {self.kind!r}. Options are {', '.join(RULE_KINDS)}.")
+        if "columns" in spec:
+            self.columns = list(spec.pop("columns"))
+        elif "column" in spec:
+            self.columns = [spec.pop("column")]
+        else:
+            raise ValueError(f"A {self.kind} rule needs a 'column'.")
+        if not self.columns:
+            raise ValueError(f"A {self.kind} rule needs at least one column.")
+        if self.kind != "unique" and len(self.columns) != 1:
+            raise ValueError(f"A {self.kind} rule checks a single column.")
+        self.name = spec.pop("name", None)
+        missing = [key for key in RULE_KINDS[self.kind] if key not in spec]
+        if missing:
+            raise ValueError(f"A {self.kind} rule needs {', '.join(map(repr, missing))}.")
+        if self.kind == "compare":
+            if spec["op"] not in COMPARISONS:
+                raise ValueError(f"Invalid comparison {spec['op']!r}. Options are {', '.join(COMPARISONS)}.")
+            self.columns.append(spec["other"])
+        if self.kind == "range" and spec.get("min") is None and spec.get("max") is None:
+            raise ValueError("A range rule needs a 'min' or a 'max'.")
+        unknown = [col for col in self.columns if col not in dtypes.index]
+        if unknown:
+            raise ValueError(f"Columns not found in the data: {unknown}")
+        if self.kind == "range":
+            _check_bounds(self.columns[0], dtypes[self.columns[0]], [spec.get("min"), spec.get("max")])
+        self.params = spec
+
+    def __repr__(self):
+        args = ", ".join(f"{key}={value!r}" for key, value in self.params.items() if key != "other")
+        return f"{self.kind}({', '.join(map(str, self.columns))}{', ' if args else ''}{args})"
+
+
+def compile_rules(rules, dtypes):
+    """
+    Check declared rules and group them for evaluation.
+
+    Rules on a single column are grouped by column, so each column is converted
+    once and all of its checks run together; unique and compare rules, which look
+    at several columns, are evaluated on their own. Unnamed rules are named after
+    their repr, numbered if the same rule is declared twice.
+
+    Parameters:
+    rules (list): The declared rules, see ValidationRule.
+    dtypes (pd.Series): The dtype of every column of the data, e.g. df.dtypes.
+
+    Returns:
+    tuple: The ValidationRule objects in declared order, and a list of tasks,
+    each a list of positions into the rules that are evaluated together.
+    """
+    compiled = [ValidationRule(rule, dtypes) for rule in rules]
+    seen = {}
+    for rule in compiled:
+        name = rule.name or repr(rule)
+        seen[name] = seen.get(name, 0) + 1
+        rule.name = name if seen[name] == 1 else f"{name} #{seen[name]}"
+    by_column, tasks = {}, []
+    for number, rule in enumerate(compiled):
+        if rule.kind in ("unique", "compare"):
+            tasks.append([number])
+        else:
+            by_column.setdefault(rule.columns[0], []).append(number)
+    return compiled, list(by_column.values()) + tasks
+
+
+def _numeric(series):
+    """
+    Return a numeric column as a float64 array with NaN for missing values, or None if it is not numeric.
+    """
+    if _is_numeric(series.dtype):
+        return series.to_numpy(dtype="float64", na_value=np.nan)
+    return None
+
+
+def _range_violations(series, values, low, high):
+    if values is None:
+        # Datetimes, strings and other ordered types are compared by pandas; missing values compare False.
+        values = series
+    outside = np.zeros(len(series), dtype=bool)
+    if low is not None:
+        outside |= np.asarray(values < low, dtype=bool)
+    if high is not None:
+        outside |= np.asarray(values > high, dtype=bool)
+    return outside
+
+
+def _regex_violations(series, pattern):
+    text = pa.array(series.astype(pd.StringDtype("pyarrow")))
+    matches = pc.match_substring_regex(text, f"^(?:{pattern})$")
+    return ~np.asarray(pc.fill_null(matches, True).to_numpy(zero_copy_only=False), dtype=bool)
+
+
+def _compare_violations(left, right, op):
+    comparison = COMPARISONS[op]
+    left_values, right_values = _numeric(left), _numeric(right)
+    if left_values is not None and right_values is not None:
+        with np.errstate(invalid="ignore"):
+            holds = comparison(left_values, right_values)
+        return ~holds & ~np.isnan(left_values) & ~np.isnan(right_values)
+    holds = np.asarray(comparison(left, right), dtype=bool)
+    return ~holds & left.notna().to_numpy() & right.notna().to_numpy()
+
+
+def _evaluate(df, rules):
+    """
+    Evaluate rules that share their columns and return a violation mask per rule.
+    """
+    first = rules[0]
+    if first.kind == "unique":
+        subset = df[first.columns]
+        return [subset.duplicated(keep=False).to_numpy() & subset.notna().all(axis=1).to_numpy()]
+    if first.kind == "compare":
+        return [_compare_violations(df[first.columns[0]], df[first.columns[1]], first.params["op"])]
+    series = df[first.columns[0]]
+    values = _numeric(series)
+    missing = series.isna().to_numpy()
+    masks = []
+    for rule in rules:
+        if rule.kind == "not_null":
+            masks.append(missing)
+        elif rule.kind == "range":
+            masks.append(_range_violations(series, values, rule.params.get("min"), rule.params.get("max")))
+        elif rule.kind == "regex":
+            masks.append(_regex_violations(series, rule.params["pattern"]))
+        else:
+            masks.append(~series.isin(rule.params["values"]).to_numpy() & ~missing)
+    return masks
+
+
+class ValidationReport:
+    """
+    The result of validating data against a rule set: the rows violating each rule.
+    """
+
+    def __init__(self, rules, positions, num_rows):
+        """
+        Parameters:
+        rules (list): The compiled ValidationRule objects.
+        positions (list): For every rule, a sorted int64 array of the positions of the rows violating it.
+        num_rows (int): The number of rows validated.
+        """
+        self.rules = rules
+        self.positions = dict(zip((rule.name for rule in rules), positions))
+        self.num_rows = num_rows
+
+    @property
+    def summary(self):
+        """
+        A DataFrame with one row per rule: its kind, columns, violations and the violating share of rows.
+        """
+        counts = [len(self.positions[rule.name]) for rule in self.rules]
+        return pd.DataFrame(
+            {
+                "rule": [rule.kind for rule in self.rules],
+                "columns": [", ".join(map(str, rule.columns)) for rule in self.rules],
+                "violations": np.asarray(counts, dtype="int64"),
+                "violation_rate": np.asarray(counts, dtype="float64") / max(self.num_rows, 1),
+            },
+            index=pd.Index([rule.name for rule in self.rules], name="name"),
+            columns=SUMMARY_COLUMNS,
+        )
+
+    @property
+    def passed(self):
+        return all(not len(positions) for positions in self.positions.values())
+
+    def rows(self, name):
+        """
+        Return the positions of the rows violating a rule.
+        """
+        return self.positions[name]
+
+    def violating_rows(self, df, name=None):
+        """
+        Return the rows of the validated data violating one rule, or any rule if name is None.
+        """
+        if name is not None:
+            return df.iloc[self.positions[name]]
+        positions = [positions for positions in self.positions.values() if len(positions)]
+        return df.iloc[np.unique(np.concatenate(positions))] if positions else df.iloc[:0]
+
+    def to_frame(self):
+        """
+        Return the violations in long form, one row per violating row and rule, e.g. for a ResultCache.
+        """
+        names = [rule.name for rule in self.rules]
+        lengths = [len(self.positions[name]) for name in names]
+        codes = np.repeat(np.arange(len(names), dtype=np.int32), lengths)
+        return pd.DataFrame({
+            "rule": pd.Categorical.from_codes(codes, categories=names) if names else pd.Categorical([]),
+            "row": np.concatenate([self.positions[name] for name in names]) if names else np.zeros(0, np.int64),
+        })
+
+    @classmethod
+    def from_frame(cls, rules, frame, num_rows):
+        """
+        Rebuild a report from to_frame() and the rules it was computed with.
+        """
+        rows = frame["row"].to_numpy(dtype="int64")
+        codes = frame["rule"].astype(pd.CategoricalDtype([rule.name for rule in rules])).cat.codes.to_numpy()
+        return cls(rules, [rows[codes == number] for number in range(len(rules))], num_rows)
+
+
+def validate(df, rules, max_workers=None):
+    """
+    Check data against declared rules in one vectorized pass.
+
+    The rules are compiled into groups (see compile_rules); every group is
+    evaluated with whole-column NumPy, pandas or Arrow operations, and the groups
+    run in parallel on a thread pool. No rule loops over rows in Python.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    rules (list): The declared rules, see ValidationRule.
+    max_workers (int): The thread pool size. If None, the executor default is used.
+
+    Returns:
+    ValidationReport: The violating rows of every rule.
+    """
+    compiled, tasks = compile_rules(rules, df.dtypes)
+    positions = [None] * len(compiled)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(lambda task: _evaluate(df, [compiled[number] for number in task]), tasks)
+        for task, masks in zip(tasks, results):
+            for number, mask in zip(task, masks):
+                positions[number] = np.flatnonzero(mask)
+    return ValidationReport(compiled, positions, len(df))